@@ -0,0 +1 @@
+"""Performance benchmarks for stackcoin-python, run with ``python -m benchmarks.run``."""
@@ -0,0 +1,191 @@
+"""REST client benchmarks against the in-process mock transport."""
+
+from __future__ import annotations
+
+import gc
+import os
+import tempfile
+import tracemalloc
+from typing import Any
+
+import httpx
+
+import stackcoin
+from stackcoin import _endpoints as api
+
+from .fake_server import EventStore, make_transaction, make_transport
+from .harness import Result, Timer, benchmark
+
+TOKEN = "bench-token"
+BASE_URL = "http://stackcoin.test"
+
+
+def make_client(
+    store: EventStore,
+    *,
+    latency: float = 0.0,
+    gzip_level: int | None = None,
+    **options: Any,
+) -> stackcoin.Client:
+    transport = make_transport(store, latency=latency, gzip_level=gzip_level)
+    return stackcoin.Client(TOKEN, base_url=BASE_URL, transport=transport, **options)
+
+
+@benchmark("client.get_events")
+async def bench_get_events() -> list[Result]:
+    """Pagination throughput of ``get_events`` over 10k events in 100-event pages."""
+    store = EventStore(count=10_000)
+    results = []
+    for latency in (0.0, 0.001):
+        async with make_client(store, latency=latency) as client:
+            await client.get_events(since_id=store.head_id - 1)  # warm up pool and schemas
+            with Timer() as t:
+                events = await client.get_events()
+        assert len(events) == store.count
+        pages = -(-store.count // store.page_size)
+        results.append(
+            Result(
+                f"client.get_events.throughput[latency={latency * 1000:g}ms]",
+                store.count / t.elapsed,
+                "events/s",
+                extra={"events": store.count, "pages": pages, "seconds": t.elapsed},
+            )
+        )
+    return results
+
+
+@benchmark("client.get_events_parallel")
+async def bench_get_events_parallel() -> list[Result]:
+    """Range-partitioned backfill (``head_id`` known) vs serial paging at 5ms RTT."""
+    store = EventStore(count=10_000)
+    results = []
+    async with make_client(store, latency=0.005) as client:
+        await client.get_events(since_id=store.head_id - 1)
+        for concurrency in (1, 8, 32):
+            with Timer() as t:
+                events = await client.get_events(head_id=store.head_id, concurrency=concurrency)
+            assert [e.id for e in events] == list(range(1, store.count + 1))
+            results.append(
+                Result(
+                    f"client.get_events.backfill[concurrency={concurrency}]",
+                    store.count / t.elapsed,
+                    "events/s",
+                    extra={"events": store.count, "seconds": t.elapsed},
+                )
+            )
+    return results
+
+
+@benchmark("client.get_events_paging")
+async def bench_get_events_paging() -> list[Result]:
+    """Backfill of 10k events at 5ms RTT: default pages vs. adaptive sizing, and gzip."""
+    store = EventStore(count=10_000)
+    configs: list[tuple[str, dict[str, Any]]] = [
+        ("default", {}),
+        ("adaptive", {"page_latency_target": 0.05}),
+        ("gzip", {"gzip_level": 6}),
+        ("adaptive+gzip", {"page_latency_target": 0.05, "gzip_level": 6}),
+    ]
+    results = []
+    for name, options in configs:
+        async with make_client(store, latency=0.005, **options) as client:
+            await client.get_events(since_id=store.head_id - 1)
+            before = client.transfer_stats.wire_bytes
+            with Timer() as t:
+                events = await client.get_events()
+            wire = client.transfer_stats.wire_bytes - before
+        assert len(events) == store.count
+        results.append(
+            Result(
+                f"client.get_events.paging[{name}]",
+                store.count / t.elapsed,
+                "events/s",
+                extra={"seconds": t.elapsed, "wire_bytes": wire, "page_size": client.page_size},
+            )
+        )
+    return results
+
+
+@benchmark("client.cache")
+async def bench_cache() -> list[Result]:
+    """Repeated ``get_user`` lookups at 1ms RTT: no cache, in-process LRU, shared mmap."""
+    store = EventStore()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = stackcoin.SharedMemoryCache(os.path.join(tmp, "cache"))
+        backends: list[tuple[str, stackcoin.CacheBackend | None]] = [
+            ("none", None),
+            ("memory", stackcoin.MemoryCache()),
+            ("shared", shared),
+        ]
+        for name, cache in backends:
+            async with make_client(store, latency=0.001, cache=cache) as client:
+                await client.get_user(1)
+                lookups = 2_000 if cache is not None else 200
+                with Timer() as t:
+                    for _ in range(lookups):
+                        await client.get_user(1)
+            results.append(
+                Result(f"client.get_user.cached[{name}]", lookups / t.elapsed, "lookups/s")
+            )
+        shared.close()
+    return results
+
+
+@benchmark("client.validation")
+async def bench_validation() -> list[Result]:
+    """Parse time per 10k rows of events and transactions pages, per validation mode."""
+    rows = 10_000
+    store = EventStore(count=rows)
+    pages = {
+        "events": (api.events_page(0), [store.page(i, 1000) for i in range(0, rows, 1000)]),
+        "transactions": (
+            api.get_transactions(),
+            [
+                {"transactions": [make_transaction(t) for t in range(i + 1, i + 1001)]}
+                for i in range(0, rows, 1000)
+            ],
+        ),
+    }
+    results = []
+    for kind, (call, bodies) in pages.items():
+        responses = [httpx.Response(200, json=body) for body in bodies]
+        for mode in ("full", "fast"):
+            async with make_client(store, validation=mode) as client:
+                client._parse(call, responses[0])  # build the core schemas
+                best = float("inf")
+                for _ in range(3):
+                    with Timer() as t:
+                        for resp in responses:
+                            client._parse(call, resp)
+                    best = min(best, t.elapsed)
+            results.append(
+                Result(
+                    f"client.parse.{kind}[validation={mode}]",
+                    best * 1000 * 10_000 / rows,
+                    "ms/10k rows",
+                    "lower",
+                )
+            )
+    return results
+
+
+@benchmark("client.memory")
+async def bench_memory() -> list[Result]:
+    """Retained and peak memory of ``get_events`` per 100k events."""
+    store = EventStore(count=100_000, page_size=1000)
+    async with make_client(store) as client:
+        await client.get_events(since_id=store.head_id - 1)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            events = await client.get_events()
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert len(events) == store.count
+    scale = 100_000 / store.count
+    return [
+        Result("client.get_events.retained_per_100k", retained * scale, "bytes", "lower"),
+        Result("client.get_events.peak_per_100k", peak * scale, "bytes", "lower"),
+    ]
@@ -0,0 +1,270 @@
+"""Gateway benchmarks: frame decoding, live dispatch and reconnect catch-up."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any
+
+import stackcoin
+
+from .bench_client import TOKEN, make_client
+from .fake_server import EventStore, FakeGatewayServer, make_event
+from .harness import Result, Timer, benchmark, percentile
+
+
+def make_frames(count: int, start: int = 1) -> list[str]:
+    """Return ``count`` raw Phoenix ``event`` frames, as received off the socket."""
+    return [
+        json.dumps([None, None, "user:self", "event", make_event(i)])
+        for i in range(start, start + count)
+    ]
+
+
+async def _run_gateway(gateway: stackcoin.Gateway) -> asyncio.Task[None]:
+    task = asyncio.create_task(gateway.connect())
+    await asyncio.sleep(0)
+    return task
+
+
+async def _stop_gateway(gateway: stackcoin.Gateway, task: asyncio.Task[None]) -> None:
+    gateway.stop()
+    try:
+        await asyncio.wait_for(task, timeout=5)
+    except (TimeoutError, asyncio.CancelledError):
+        task.cancel()
+
+
+@benchmark("gateway.decode")
+async def bench_decode() -> list[Result]:
+    """Rate of ``json.loads`` + ``_handle_message`` for raw event frames, no network."""
+    frames = make_frames(50_000)
+    gateway = stackcoin.Gateway(TOKEN)
+    seen = 0
+
+    async def handler(event: Any) -> None:
+        nonlocal seen
+        seen += 1
+
+    for event_type in ("transfer.completed", "request.created", "request.accepted"):
+        gateway.register_handler(event_type, handler)
+    gateway.register_handler("request.denied", handler)
+
+    warm_up = stackcoin.Gateway(TOKEN)  # fresh instance: ids are only dispatched once
+    for raw in frames[:1000]:  # warm up schema/validator caches
+        await warm_up._handle_message(json.loads(raw))
+    with Timer() as t:
+        for raw in frames:
+            await gateway._handle_message(json.loads(raw))
+    assert seen == len(frames)
+    return [
+        Result(
+            "gateway.handle_message.rate",
+            len(frames) / t.elapsed,
+            "msgs/s",
+            extra={"frames": len(frames), "seconds": t.elapsed},
+        )
+    ]
+
+
+@benchmark("gateway.memory")
+async def bench_memory() -> list[Result]:
+    """Peak decode memory and retained size of 100k dispatched events."""
+    count = 100_000
+    frames = make_frames(count)
+    gateway = stackcoin.Gateway(TOKEN)
+    retained: list[Any] = []
+
+    async def handler(event: Any) -> None:
+        retained.append(event)
+
+    for event_type in ("transfer.completed", "request.created", "request.accepted"):
+        gateway.register_handler(event_type, handler)
+    gateway.register_handler("request.denied", handler)
+
+    await stackcoin.Gateway(TOKEN)._handle_message(json.loads(frames[0]))  # warm up
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for raw in frames:
+            await gateway._handle_message(json.loads(raw))
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(retained) == count
+    return [
+        Result("gateway.events.retained_per_100k", current, "bytes", "lower"),
+        Result("gateway.events.peak_per_100k", peak, "bytes", "lower"),
+    ]
+
+
+@benchmark("gateway.dispatch_latency")
+async def bench_dispatch_latency() -> list[Result]:
+    """Burst throughput and per-event send-to-handler latency over a local WebSocket."""
+    burst = 5_000
+    pings = 1_000
+    store = EventStore()
+    latencies: list[float] = []
+    expected = 0
+    done = asyncio.Event()
+
+    async with FakeGatewayServer(store) as server:
+        gateway = stackcoin.Gateway(TOKEN, ws_url=server.ws_url)
+
+        @gateway.on("transfer.completed")
+        @gateway.on("request.created")
+        @gateway.on("request.accepted")
+        @gateway.on("request.denied")
+        async def handler(event: Any) -> None:
+            latencies.append(time.perf_counter() - server.sent_at[event.id])
+            if len(latencies) == expected:
+                done.set()
+
+        task = await _run_gateway(gateway)
+        await asyncio.wait_for(server.joined.wait(), timeout=5)
+
+        # Burst: everything queued at once, measures sustained dispatch rate.
+        expected = burst
+        with Timer() as t:
+            await server.publish(store.append(burst))
+            await asyncio.wait_for(done.wait(), timeout=60)
+
+        # Ping-pong: one event in flight at a time, measures pure latency.
+        latencies.clear()
+        for expected in range(1, pings + 1):
+            done.clear()
+            await server.publish(store.append(1))
+            await asyncio.wait_for(done.wait(), timeout=5)
+        await _stop_gateway(gateway, task)
+
+    return [
+        Result("gateway.dispatch.throughput", burst / t.elapsed, "events/s"),
+        Result("gateway.dispatch.latency_p50", percentile(latencies, 50) * 1e6, "us", "lower"),
+        Result("gateway.dispatch.latency_p99", percentile(latencies, 99) * 1e6, "us", "lower"),
+    ]
+
+
+@benchmark("gateway.catch_up")
+async def bench_catch_up() -> list[Result]:
+    """Time to reconnect and catch up on 10k missed events via REST."""
+    missed = 10_000
+    store = EventStore(count=missed)
+    done = asyncio.Event()
+    dispatched = 0
+
+    async with FakeGatewayServer(store) as server, make_client(store) as client:
+        gateway = stackcoin.Gateway(TOKEN, ws_url=server.ws_url, client=client, last_event_id=0)
+
+        @gateway.on("transfer.completed")
+        @gateway.on("request.created")
+        @gateway.on("request.accepted")
+        @gateway.on("request.denied")
+        async def handler(event: Any) -> None:
+            nonlocal dispatched
+            dispatched += 1
+            if event.id == store.head_id:
+                done.set()
+
+        with Timer() as t:
+            task = await _run_gateway(gateway)
+            await asyncio.wait_for(done.wait(), timeout=60)
+            await asyncio.wait_for(server.joined.wait(), timeout=5)
+        await _stop_gateway(gateway, task)
+
+    assert dispatched == missed
+    return [
+        Result(
+            "gateway.catch_up.seconds_per_10k",
+            t.elapsed,
+            "s",
+            "lower",
+            extra={"missed": missed, "joins": server.join_count},
+        )
+    ]
+
+
+@benchmark("gateway.decode_offload")
+async def bench_decode_offload() -> list[Result]:
+    """Event-loop stalls while a 20k-event burst is decoded inline vs in a thread pool."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    burst = 20_000
+    results: list[Result] = []
+    with ThreadPoolExecutor(1) as pool:
+        for mode, executor in (("inline", None), ("thread", pool)):
+            store = EventStore()
+            seen: list[int] = []
+            done = asyncio.Event()
+            stalls: list[float] = []
+
+            async with FakeGatewayServer(store) as server:
+                gateway = stackcoin.Gateway(TOKEN, ws_url=server.ws_url, decode_executor=executor)
+
+                @gateway.on("transfer.completed")
+                @gateway.on("request.created")
+                @gateway.on("request.accepted")
+                @gateway.on("request.denied")
+                async def handler(event: Any) -> None:
+                    seen.append(event.id)
+                    if len(seen) == burst:
+                        done.set()
+
+                async def ticker() -> None:
+                    # What a heartbeat or REST call on the same loop would wait.
+                    while not done.is_set():
+                        start = time.perf_counter()
+                        await asyncio.sleep(0.001)
+                        stalls.append(time.perf_counter() - start - 0.001)
+
+                task = await _run_gateway(gateway)
+                await asyncio.wait_for(server.joined.wait(), timeout=5)
+                with Timer() as t:
+                    await server.publish(store.append(burst))
+                    tick = asyncio.create_task(ticker())  # stalls caused by the client only
+                    await asyncio.wait_for(done.wait(), timeout=60)
+                await tick
+                await _stop_gateway(gateway, task)
+
+            assert seen == sorted(seen) and len(seen) == burst
+            results += [
+                Result(f"gateway.decode_{mode}.events_per_s", burst / t.elapsed, "events/s"),
+                Result(f"gateway.decode_{mode}.stall_max", max(stalls) * 1e3, "ms", "lower"),
+                Result(
+                    f"gateway.decode_{mode}.stall_p99",
+                    percentile(stalls, 99) * 1e3,
+                    "ms",
+                    "lower",
+                ),
+            ]
+    return results
+
+
+@benchmark("gateway.profiling")
+async def bench_profiling() -> list[Result]:
+    """``_handle_message`` rate without a profiler, fully profiled and sampled at 10%."""
+    frames = make_frames(50_000)
+    results: list[Result] = []
+    warm_up = stackcoin.Gateway(TOKEN)
+    for raw in frames[:1000]:
+        await warm_up._handle_message(json.loads(raw))
+    for mode, profiler in (
+        ("off", None),
+        ("full", stackcoin.Profiler()),
+        ("sampled", stackcoin.Profiler(sample_rate=0.1)),
+    ):
+        gateway = stackcoin.Gateway(TOKEN, profiler=profiler)
+
+        async def handler(event: Any) -> None:
+            pass
+
+        for event_type in ("transfer.completed", "request.created", "request.accepted"):
+            gateway.register_handler(event_type, handler)
+        gateway.register_handler("request.denied", handler)
+        with Timer() as t:
+            for raw in frames:
+                await gateway._handle_message(json.loads(raw))
+        results.append(Result(f"gateway.profiling_{mode}.rate", len(frames) / t.elapsed, "msgs/s"))
+    return results
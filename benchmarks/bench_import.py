@@ -0,0 +1,61 @@
+"""Cold import-time benchmarks, each measured in a fresh interpreter.
+
+Besides timing, :func:`bench_import` guards the lazy-loading contract of
+``stackcoin/__init__.py``: a bare ``import stackcoin`` must not pull in
+``httpx``, ``pydantic``, ``websockets`` or the generated models.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+from .harness import Result, benchmark, percentile
+
+RUNS = 7
+
+# Modules that must stay unloaded after a bare ``import stackcoin``.
+HEAVY_MODULES = ("httpx", "pydantic", "websockets", "stackcoin.models", "stackcoin.client")
+
+SCENARIOS = {
+    "import stackcoin": "import stackcoin",
+    "stackcoin.Client": "import stackcoin; stackcoin.Client",
+    "stackcoin.Gateway": "import stackcoin; stackcoin.Gateway",
+}
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _measure(code: str) -> tuple[float, list[str]]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(code=code)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    data = json.loads(out)
+    return data["seconds"], data["modules"]
+
+
+@benchmark("import")
+async def bench_import() -> list[Result]:
+    """Median cold import time of the package and its lazily loaded entry points."""
+    results = []
+    for name, code in SCENARIOS.items():
+        samples = []
+        for _ in range(RUNS):
+            seconds, modules = _measure(code)
+            samples.append(seconds)
+        if name == "import stackcoin":
+            loaded = [m for m in HEAVY_MODULES if m in modules]
+            if loaded:
+                raise AssertionError(f"`import stackcoin` eagerly imported {loaded}")
+        results.append(Result(f"import.{name}", percentile(samples, 50) * 1000, "ms", "lower"))
+    return results
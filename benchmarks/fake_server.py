@@ -0,0 +1,267 @@
+"""In-process fake StackCoin server for benchmarks.
+
+Provides two halves of a StackCoin deployment without a real Phoenix app:
+
+* :func:`make_transport` returns an ``httpx.MockTransport`` that answers the
+  REST endpoints the :class:`stackcoin.Client` talks to.
+* :class:`FakeGatewayServer` is a local WebSocket server speaking the Phoenix
+  channel protocol (``vsn=2.0.0`` array frames) used by :class:`stackcoin.Gateway`.
+
+Both are backed by an :class:`EventStore` of deterministic, generated events so
+results are comparable between runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+EVENT_TYPES = (
+    "transfer.completed",
+    "request.created",
+    "request.accepted",
+    "request.denied",
+)
+
+_EPOCH = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def make_event(event_id: int) -> dict[str, Any]:
+    """Return a generated event payload, cycling through the common event types."""
+    event_type = EVENT_TYPES[event_id % len(EVENT_TYPES)]
+    inserted_at = (_EPOCH + timedelta(seconds=event_id)).isoformat()
+    if event_type == "transfer.completed":
+        data: dict[str, Any] = {
+            "amount": 1 + event_id % 500,
+            "from_id": 1 + event_id % 17,
+            "to_id": 1 + event_id % 23,
+            "role": "sender" if event_id % 2 else "receiver",
+            "transaction_id": event_id,
+        }
+    elif event_type == "request.created":
+        data = {
+            "amount": 1 + event_id % 500,
+            "label": f"invoice {event_id}",
+            "request_id": event_id,
+            "requester_id": 1 + event_id % 17,
+            "responder_id": 1 + event_id % 23,
+        }
+    elif event_type == "request.accepted":
+        data = {
+            "amount": 1 + event_id % 500,
+            "request_id": event_id - 1,
+            "status": "accepted",
+            "transaction_id": event_id,
+        }
+    else:
+        data = {
+            "denied_by_id": 1 + event_id % 23,
+            "request_id": event_id - 2,
+            "status": "denied",
+        }
+    return {"id": event_id, "type": event_type, "inserted_at": inserted_at, "data": data}
+
+
+def make_transaction(transaction_id: int) -> dict[str, Any]:
+    """Return a generated transaction payload."""
+    return {
+        "id": transaction_id,
+        "amount": 1 + transaction_id % 500,
+        "from": {"id": 1 + transaction_id % 17, "username": f"user{transaction_id % 17}"},
+        "to": {"id": 1 + transaction_id % 23, "username": f"user{transaction_id % 23}"},
+        "label": f"txn {transaction_id}" if transaction_id % 3 else None,
+        "time": (_EPOCH + timedelta(seconds=transaction_id)).isoformat(),
+    }
+
+
+@dataclass
+class EventStore:
+    """Deterministic, append-only store of generated events."""
+
+    count: int = 0
+    page_size: int = 100
+    replay_limit: int = 100
+    _events: list[dict[str, Any]] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        self._events = [make_event(i) for i in range(1, self.count + 1)]
+
+    @property
+    def head_id(self) -> int:
+        return self._events[-1]["id"] if self._events else 0
+
+    def append(self, n: int = 1) -> list[dict[str, Any]]:
+        """Generate ``n`` new events and return them."""
+        start = self.head_id + 1
+        new = [make_event(i) for i in range(start, start + n)]
+        self._events.extend(new)
+        return new
+
+    def since(self, since_id: int) -> list[dict[str, Any]]:
+        """Return every event with ``id > since_id``."""
+        # Event ids are dense and start at 1, so the index is the cursor.
+        return self._events[max(since_id, 0) :]
+
+    def page(self, since_id: int, limit: int | None = None) -> dict[str, Any]:
+        """Return one ``/api/events`` response body."""
+        limit = limit or self.page_size
+        rest = self.since(since_id)
+        return {"events": rest[:limit], "has_more": len(rest) > limit}
+
+
+def _respond(request: httpx.Request, body: Any, *, gzip_level: int | None) -> httpx.Response:
+    if gzip_level is None or "gzip" not in request.headers.get("accept-encoding", ""):
+        return httpx.Response(200, json=body)
+    raw = json.dumps(body).encode()
+    return httpx.Response(
+        200,
+        content=gzip.compress(raw, compresslevel=gzip_level),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+
+
+def make_transport(
+    store: EventStore, *, latency: float = 0.0, gzip_level: int | None = None
+) -> httpx.MockTransport:
+    """Return an ``httpx.MockTransport`` serving the StackCoin REST API from ``store``.
+
+    ``latency`` adds a simulated round-trip delay (in seconds) to every request.
+    With ``gzip_level`` responses are gzip-compressed when the client accepts it.
+    """
+
+    me = {
+        "id": 1,
+        "username": "benchbot",
+        "balance": 1_000_000,
+        "admin": False,
+        "banned": False,
+        "inserted_at": _EPOCH.isoformat(),
+        "updated_at": _EPOCH.isoformat(),
+    }
+    transactions = [make_transaction(i) for i in range(1, 101)]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        path = request.url.path
+        params = request.url.params
+        if path == "/api/events":
+            since_id = int(params.get("since_id", 0))
+            limit = int(params["limit"]) if "limit" in params else None
+            return _respond(request, store.page(since_id, limit), gzip_level=gzip_level)
+        if path.startswith("/api/user/"):  # /me and /{id} both answer with the bot user
+            return httpx.Response(200, json=me)
+        if path == "/api/transactions":
+            return httpx.Response(200, json={"transactions": transactions})
+        return httpx.Response(404, json={"error": "not_found", "message": path})
+
+    return httpx.MockTransport(handler)
+
+
+class FakeGatewayServer:
+    """Local WebSocket server speaking the Phoenix channel protocol.
+
+    Replies to ``phx_join`` on ``user:self``, replays up to ``store.replay_limit``
+    missed events (rejecting the join with ``too_many_missed_events`` beyond
+    that), answers heartbeats and pushes events queued with :meth:`publish`.
+
+    Usage::
+
+        async with FakeGatewayServer(store) as server:
+            gateway = stackcoin.Gateway(token="t", ws_url=server.ws_url)
+            ...
+            await server.publish(store.append(1000))
+    """
+
+    def __init__(self, store: EventStore, *, host: str = "127.0.0.1") -> None:
+        self.store = store
+        self._host = host
+        self._server: Any = None
+        self._connections: set[Any] = set()
+        self.joined = asyncio.Event()
+        self.sent_at: dict[int, float] = {}
+        self.join_count = 0
+
+    @property
+    def ws_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://{self._host}:{port}/ws"
+
+    async def __aenter__(self) -> FakeGatewayServer:
+        from websockets.asyncio.server import serve
+
+        self._server = await serve(self._handle, self._host, 0)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def publish(self, events: list[dict[str, Any]]) -> None:
+        """Push ``events`` to every joined connection, recording send times."""
+        for event in events:
+            frame = json.dumps([None, None, "user:self", "event", event])
+            self.sent_at[event["id"]] = time.perf_counter()
+            for ws in list(self._connections):
+                await ws.send(frame)
+
+    async def disconnect_all(self) -> None:
+        """Drop every live connection, forcing clients to reconnect."""
+        for ws in list(self._connections):
+            await ws.close()
+
+    async def _handle(self, ws: Any) -> None:
+        from websockets.exceptions import ConnectionClosed
+
+        query = parse_qs(urlsplit(ws.request.path).query)
+        if not query.get("token"):
+            await ws.close(code=4001)
+            return
+        try:
+            async for raw in ws:
+                join_ref, ref, topic, event, payload = json.loads(raw)
+                if event == "heartbeat":
+                    await ws.send(json.dumps([None, ref, "phoenix", "phx_reply", _ok({})]))
+                elif event == "phx_join":
+                    await self._join(ws, join_ref, ref, topic, payload)
+        except ConnectionClosed:
+            pass
+        finally:
+            self._connections.discard(ws)
+
+    async def _join(
+        self, ws: Any, join_ref: Any, ref: Any, topic: str, payload: dict[str, Any]
+    ) -> None:
+        self.join_count += 1
+        last_event_id = payload.get("last_event_id")
+        missed = self.store.since(last_event_id) if last_event_id is not None else []
+        if len(missed) > self.store.replay_limit:
+            reply = {
+                "status": "error",
+                "response": {
+                    "reason": "too_many_missed_events",
+                    "missed_count": len(missed),
+                    "replay_limit": self.store.replay_limit,
+                    "message": "Too many missed events, catch up via REST",
+                },
+            }
+            await ws.send(json.dumps([join_ref, ref, topic, "phx_reply", reply]))
+            return
+
+        await ws.send(json.dumps([join_ref, ref, topic, "phx_reply", _ok({})]))
+        for event in missed:
+            await ws.send(json.dumps([None, None, topic, "event", event]))
+        self._connections.add(ws)
+        self.joined.set()
+
+
+def _ok(response: dict[str, Any]) -> dict[str, Any]:
+    return {"status": "ok", "response": response}
@@ -0,0 +1,64 @@
+"""Tiny benchmark registry and result format.
+
+Benchmarks are plain ``async def`` functions registered with :func:`benchmark`.
+Each returns a list of :class:`Result` rows; :mod:`benchmarks.run` collects them
+into a single JSON document so runs can be diffed and tracked over time.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+Better = Literal["higher", "lower"]
+BenchFunc = Callable[[], Awaitable[list["Result"]]]
+
+REGISTRY: dict[str, BenchFunc] = {}
+
+
+@dataclass
+class Result:
+    """A single measured metric."""
+
+    name: str
+    value: float
+    unit: str
+    better: Better = "higher"
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def benchmark(name: str) -> Callable[[BenchFunc], BenchFunc]:
+    """Register ``func`` under ``name`` in :data:`REGISTRY`."""
+
+    def decorator(func: BenchFunc) -> BenchFunc:
+        REGISTRY[name] = func
+        return func
+
+    return decorator
+
+
+class Timer:
+    """Context manager measuring wall time with ``perf_counter``."""
+
+    elapsed: float = 0.0
+
+    def __enter__(self) -> Timer:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.elapsed = time.perf_counter() - self._start
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile (0-100) of ``samples`` by nearest rank."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
@@ -0,0 +1,100 @@
+"""Run the benchmark suite and emit machine-readable results.
+
+Usage::
+
+    python -m benchmarks.run                       # run everything, JSON to stdout
+    python -m benchmarks.run -k gateway -o out.json
+    python -m benchmarks.run --compare baseline.json --threshold 0.1
+
+With ``--compare``, every metric is checked against the baseline file and the
+process exits non-zero if any regressed by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from datetime import UTC, datetime
+from importlib import metadata
+from typing import Any
+
+from . import bench_client, bench_gateway, bench_import  # noqa: F401 — registers benchmarks
+from .harness import REGISTRY, Result
+
+
+async def run(selected: list[str]) -> list[Result]:
+    results: list[Result] = []
+    for name in selected:
+        print(f"running {name}...", file=sys.stderr)
+        results.extend(await REGISTRY[name]())
+    return results
+
+
+def environment() -> dict[str, Any]:
+    try:
+        version = metadata.version("stackcoin")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {
+        "stackcoin": version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(UTC).isoformat(),
+    }
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> list[str]:
+    """Return a description of every metric that regressed beyond ``threshold``."""
+    previous = {r["name"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None or not before["value"]:
+            continue
+        change = (result["value"] - before["value"]) / before["value"]
+        if result["better"] == "lower":
+            change = -change
+        if change < -threshold:
+            regressions.append(
+                f"{result['name']}: {before['value']:.4g} -> {result['value']:.4g} "
+                f"{result['unit']} ({change:+.1%})"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="filter", help="only run benchmarks containing this string")
+    parser.add_argument("-o", "--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed regression")
+    args = parser.parse_args(argv)
+
+    selected = [name for name in REGISTRY if not args.filter or args.filter in name]
+    results = [r.to_dict() for r in asyncio.run(run(selected))]
+    document = {"environment": environment(), "results": results}
+
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,136 @@
-"""StackCoin Python library."""
-
-from .client import AnyEvent, Client
-from .errors import StackCoinError, TooManyMissedEventsError
-from .gateway import Gateway
-from .models import (
-    CreateRequestResponse,
-    DiscordGuild,
-    Event,
-    Request,
-    RequestAcceptedData,
-    RequestAcceptedEvent,
-    RequestActionResponse,
-    RequestCreatedData,
-    RequestCreatedEvent,
-    RequestDeniedData,
-    RequestDeniedEvent,
-    SendStkResponse,
-    Transaction,
-    TransferCompletedData,
-    TransferCompletedEvent,
-    User,
-)
+"""StackCoin Python library.
+
+Public names are loaded lazily (PEP 562): ``import stackcoin`` only imports
+this module and :mod:`stackcoin.errors`. The REST client, gateway, ``httpx``
+and the generated pydantic models are imported the first time one of their
+attributes is accessed, e.g. ``stackcoin.Client``.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .errors import InsufficientFundsError, StackCoinError, TooManyMissedEventsError
+
+if TYPE_CHECKING:
+    from .aggregates import RollingAggregates
+    from .broker import HostGateway
+    from .cache import CacheBackend, MemoryCache, SharedMemoryCache
+    from .client import AnyEvent, Client
+    from .deadletter import DeadLetter, DeadLetterStore
+    from .gateway import Gateway
+    from .handlers import HandlerPolicy, HandlerStats
+    from .history import HistoryStore
+    from .models import (
+        CreateRequestResponse,
+        DiscordGuild,
+        Event,
+        Request,
+        RequestAcceptedData,
+        RequestAcceptedEvent,
+        RequestActionResponse,
+        RequestCreatedData,
+        RequestCreatedEvent,
+        RequestDeniedData,
+        RequestDeniedEvent,
+        SendStkResponse,
+        Transaction,
+        TransferCompletedData,
+        TransferCompletedEvent,
+        User,
+    )
+    from .polling import PollingEventSource
+    from .profiling import Profiler
+    from .replay import Recorder, Replayer
+    from .scheduler import TransferScheduler
+    from .stream import EventStream
+    from .sync_client import SyncClient
+    from .tracker import RequestHandle, RequestOutcome, RequestTracker
+
+# Public attribute -> submodule that defines it.
+_LAZY: dict[str, str] = {
+    "AnyEvent": "._endpoints",
+    "CacheBackend": ".cache",
+    "Client": ".client",
+    "DeadLetter": ".deadletter",
+    "DeadLetterStore": ".deadletter",
+    "EventStream": ".stream",
+    "MemoryCache": ".cache",
+    "Gateway": ".gateway",
+    "HandlerPolicy": ".handlers",
+    "HandlerStats": ".handlers",
+    "HistoryStore": ".history",
+    "HostGateway": ".broker",
+    "PollingEventSource": ".polling",
+    "Profiler": ".profiling",
+    "RollingAggregates": ".aggregates",
+    "Recorder": ".replay",
+    "Replayer": ".replay",
+    "RequestHandle": ".tracker",
+    "RequestOutcome": ".tracker",
+    "RequestTracker": ".tracker",
+    "SharedMemoryCache": ".cache",
+    "SyncClient": ".sync_client",
+    "TransferScheduler": ".scheduler",
+    **{
+        name: ".models"
+        for name in (
+            "CreateRequestResponse",
+            "DiscordGuild",
+            "Event",
+            "Request",
+            "RequestAcceptedData",
+            "RequestAcceptedEvent",
+            "RequestActionResponse",
+            "RequestCreatedData",
+            "RequestCreatedEvent",
+            "RequestDeniedData",
+            "RequestDeniedEvent",
+            "SendStkResponse",
+            "Transaction",
+            "TransferCompletedData",
+            "TransferCompletedEvent",
+            "User",
+        )
+    },
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
+
 
 __all__ = [
     "AnyEvent",
+    "CacheBackend",
     "Client",
     "CreateRequestResponse",
+    "DeadLetter",
+    "DeadLetterStore",
     "DiscordGuild",
     "Event",
+    "EventStream",
     "Gateway",
+    "HandlerPolicy",
+    "HandlerStats",
+    "HistoryStore",
+    "HostGateway",
+    "InsufficientFundsError",
+    "MemoryCache",
+    "PollingEventSource",
+    "Profiler",
+    "Recorder",
+    "Replayer",
     "Request",
     "RequestAcceptedData",
     "RequestAcceptedEvent",
@@ -37,11 +139,18 @@ __all__ = [
     "RequestCreatedEvent",
     "RequestDeniedData",
     "RequestDeniedEvent",
+    "RequestHandle",
+    "RequestOutcome",
+    "RequestTracker",
+    "RollingAggregates",
     "SendStkResponse",
+    "SharedMemoryCache",
     "StackCoinError",
+    "SyncClient",
     "TooManyMissedEventsError",
     "Transaction",
     "TransferCompletedData",
     "TransferCompletedEvent",
+    "TransferScheduler",
     "User",
 ]
@@ -0,0 +1,248 @@
+"""State and response handling shared by :class:`Client` and :class:`SyncClient`."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Literal
+
+import httpx
+
+from ._conditional import ValidatorCache, cache_key, last_unchanged
+from ._endpoints import Call
+from ._paging import PageSizer
+from .errors import StackCoinError
+from .profiling import HEADERS_AT, route
+
+if TYPE_CHECKING:
+    from .cache import CacheBackend
+    from .profiling import Profiler
+    from .replay import Recorder
+
+type ValidationMode = Literal["full", "fast"]
+
+# Returned by _conditional_result when a 304 arrived for an evicted entry.
+_RETRY = object()
+# Returned by _cached_result when the response cache has no usable entry.
+_MISS = object()
+
+
+def _accept_encoding() -> str:
+    """Content codings ``httpx`` can decode in this environment, best first.
+
+    ``br`` and ``zstd`` need the optional ``brotli``/``zstandard`` packages
+    (``pip install stackcoin[compression]``).
+    """
+    encodings = []
+    if find_spec("zstandard") is not None:
+        encodings.append("zstd")
+    if find_spec("brotli") is not None or find_spec("brotlicffi") is not None:
+        encodings.append("br")
+    encodings += ["gzip", "deflate"]
+    return ", ".join(encodings)
+
+
+@dataclass
+class TransferStats:
+    """Response byte counts since the client was created."""
+
+    responses: int = 0
+    wire_bytes: int = 0  # as received, before content decoding
+    decoded_bytes: int = 0  # after decompression
+
+    @property
+    def compression_ratio(self) -> float:
+        """Decoded bytes per byte on the wire (``1.0`` when uncompressed)."""
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+
+class BaseClient:
+    """Configuration, error mapping and parsing common to every client flavour.
+
+    Subclasses own the actual ``httpx`` client and implement ``_request`` /
+    ``_call`` for their concurrency model; everything that does not touch I/O
+    lives here so the sync and async clients behave identically.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        base_url: str,
+        timeout: float,
+        conditional: bool = False,
+        page_size: int | None = None,
+        page_latency_target: float | None = None,
+        compression: bool = True,
+        cache: CacheBackend | None = None,
+        cache_ttl: float = 60.0,
+        validation: ValidationMode = "full",
+        recorder: Recorder | None = None,
+        profiler: Profiler | None = None,
+    ) -> None:
+        if validation not in ("full", "fast"):
+            raise ValueError(f"unknown validation mode {validation!r}")
+        self._base_url = base_url
+        self._timeout = timeout
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+            "Accept-Encoding": _accept_encoding() if compression else "identity",
+        }
+        self._validators = ValidatorCache() if conditional else None
+        self._pages: PageSizer | None = None
+        if page_latency_target is not None:
+            initial = page_size or 100
+            self._pages = PageSizer(
+                initial=initial,
+                minimum=min(10, initial),
+                maximum=max(1000, initial),
+                target=page_latency_target,
+            )
+        elif page_size is not None:
+            self._pages = PageSizer(initial=page_size, minimum=page_size, maximum=page_size)
+        self._transfer = TransferStats()
+        self._transfer_lock = threading.Lock()
+        self._cache = cache
+        self._cache_ttl = cache_ttl
+        # Scope shared cache entries to this server and token, so bots sharing
+        # a backend never see each other's responses.
+        scope = f"{base_url}\0{token}".encode()
+        self._cache_scope = hashlib.blake2b(scope, digest_size=8).hexdigest()
+        self._fast_validation = validation == "fast"
+        self._recorder = recorder
+        self._profiler = profiler
+
+    @property
+    def last_unchanged(self) -> bool:
+        """Whether the last read in this task/thread was served from the validator cache.
+
+        Only meaningful with ``conditional=True``. ``True`` means the server
+        answered ``304 Not Modified`` (or an identical body) and the method
+        returned the very same object as the previous call, so a polling loop
+        can skip its work. Every call resets it, including ones that are not
+        conditional or are answered from ``cache``::
+
+            requests = await client.get_requests(status="pending")
+            if client.last_unchanged:
+                continue
+        """
+        return last_unchanged.get()
+
+    @property
+    def transfer_stats(self) -> TransferStats:
+        """Bytes received on the wire vs. after decompression, across all responses."""
+        return self._transfer
+
+    @property
+    def page_size(self) -> int | None:
+        """The ``limit`` the next events page will use, or ``None`` for the server default."""
+        return self._pages.size if self._pages is not None else None
+
+    def _http_options(self) -> dict[str, Any]:
+        """Keyword arguments for constructing the underlying ``httpx`` client."""
+        return {"base_url": self._base_url, "headers": self._headers, "timeout": self._timeout}
+
+    @staticmethod
+    def _transport_error(exc: httpx.HTTPError) -> StackCoinError:
+        """Wrap a transport-level ``httpx`` failure in a :class:`StackCoinError`."""
+        return StackCoinError(
+            StackCoinError.TRANSPORT_STATUS,
+            StackCoinError.TRANSPORT_ERROR,
+            repr(exc),
+        )
+
+    @staticmethod
+    def _raise_for_error(resp: httpx.Response) -> None:
+        """Raise :class:`StackCoinError` on any 4xx/5xx response."""
+        if resp.status_code >= 400:
+            try:
+                body = resp.json()
+            except Exception:
+                body = {}
+            error = body.get("error", f"http_{resp.status_code}")
+            message = body.get("message")
+            raise StackCoinError(resp.status_code, error, message)
+
+    def _record_transfer(self, resp: httpx.Response) -> None:
+        # Transports that hand httpx a pre-read body (e.g. MockTransport) leave
+        # num_bytes_downloaded at zero; Content-Length is the wire size then.
+        wire = resp.num_bytes_downloaded or int(resp.headers.get("content-length", 0))
+        with self._transfer_lock:
+            self._transfer.responses += 1
+            self._transfer.wire_bytes += wire
+            self._transfer.decoded_bytes += len(resp.content)
+
+    def _parse[T](self, call: Call[T], resp: httpx.Response) -> T:
+        """Turn a successful response into the call's typed result."""
+        profiler = self._profiler
+        if profiler is None or not profiler.sampled():
+            return call.parse(resp.content if self._fast_validation else resp.json())
+        started = time.perf_counter_ns()
+        result = call.parse(resp.content if self._fast_validation else resp.json())
+        elapsed = time.perf_counter_ns() - started
+        profiler.add(("client", route(call.method, call.url), "parse"), elapsed)
+        return result
+
+    def _sample_request(self) -> int:
+        """Start time of a request to profile, or 0 when it is not timed."""
+        profiler = self._profiler
+        return time.perf_counter_ns() if profiler is not None and profiler.sampled() else 0
+
+    def _profile_request(self, method: str, url: str, started: int, resp: httpx.Response) -> None:
+        """Record a timed request as send (until headers) and receive (the body)."""
+        assert self._profiler is not None
+        ended = time.perf_counter_ns()
+        headers_at = resp.extensions.get(HEADERS_AT, ended)
+        name = route(method, url)
+        self._profiler.add(("client", name, "send"), headers_at - started)
+        self._profiler.add(("client", name, "receive"), ended - headers_at)
+
+    @staticmethod
+    def _mark_headers(resp: httpx.Response) -> None:
+        """``httpx`` response hook: note when the headers arrived, before the body is read."""
+        resp.extensions[HEADERS_AT] = time.perf_counter_ns()
+
+    def _is_cached(self, call: Call[Any]) -> bool:
+        return self._cache is not None and call.cacheable
+
+    def _response_cache_key(self, call: Call[Any]) -> str:
+        params = "&".join(f"{k}={v}" for k, v in sorted((call.params or {}).items()))
+        return f"stackcoin:{self._cache_scope}:{call.method} {call.url}?{params}"
+
+    def _cached_result(self, call: Call[Any]) -> Any:
+        """Parse the cached body for ``call``, or return ``_MISS``."""
+        assert self._cache is not None
+        body = self._cache.get(self._response_cache_key(call))
+        if body is None:
+            return _MISS
+        return call.parse(body if self._fast_validation else json.loads(body))
+
+    def _cache_response(self, call: Call[Any], resp: httpx.Response) -> None:
+        assert self._cache is not None
+        self._cache.set(self._response_cache_key(call), resp.content, self._cache_ttl)
+
+    def _is_conditional(self, call: Call[Any]) -> bool:
+        return self._validators is not None and call.conditional
+
+    def _conditional_headers(self, call: Call[Any]) -> dict[str, str]:
+        """The call's headers plus any ``If-None-Match``/``If-Modified-Since``."""
+        assert self._validators is not None
+        key = cache_key(call.method, call.url, call.params)
+        return {**(call.headers or {}), **self._validators.request_headers(key)}
+
+    def _conditional_result(self, call: Call[Any], resp: httpx.Response) -> Any:
+        """Resolve a conditional response, or return ``_RETRY`` to re-request."""
+        assert self._validators is not None
+        key = cache_key(call.method, call.url, call.params)
+        resolved = self._validators.resolve(key, resp, partial(self._parse, call))
+        if resolved is None:
+            return _RETRY
+        value, unchanged = resolved
+        last_unchanged.set(unchanged)
+        return value
@@ -0,0 +1,97 @@
+"""Per-URL validator cache backing conditional GET requests."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+# Whether the most recent conditional call in the current task/thread was
+# served from the validator cache. A ContextVar keeps concurrent asyncio tasks
+# and SyncClient threads from seeing each other's results.
+last_unchanged: ContextVar[bool] = ContextVar("stackcoin_last_unchanged", default=False)
+
+
+@dataclass(slots=True)
+class _Entry:
+    etag: str | None
+    last_modified: str | None
+    digest: bytes
+    value: Any
+
+
+def cache_key(method: str, url: str, params: dict[str, Any] | None) -> tuple[Any, ...]:
+    return (method, url, tuple(sorted((params or {}).items())))
+
+
+class ValidatorCache:
+    """Bounded LRU of ``ETag``/``Last-Modified`` validators and parsed results.
+
+    For each request key it remembers the validators the server sent, a digest
+    of the raw body and the parsed value. :meth:`request_headers` turns that into
+    ``If-None-Match`` / ``If-Modified-Since`` headers, and :meth:`resolve` maps
+    the response back to a value: a ``304`` — or a ``200`` whose body hashes to
+    the stored digest, for servers that send no validators — returns the
+    previously parsed object without touching JSON or pydantic.
+
+    Thread-safe, so one instance can back a :class:`SyncClient` shared across
+    threads.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple[Any, ...], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def request_headers(self, key: tuple[Any, ...]) -> dict[str, str]:
+        """Return the conditional headers to send for ``key``, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def resolve(
+        self, key: tuple[Any, ...], resp: httpx.Response, parse: Callable[[httpx.Response], Any]
+    ) -> tuple[Any, bool] | None:
+        """Return ``(value, unchanged)`` for ``resp``.
+
+        Returns ``None`` for a ``304`` whose entry has since been evicted; the
+        caller must then repeat the request unconditionally.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if resp.status_code == httpx.codes.NOT_MODIFIED:
+            return None if entry is None else (entry.value, True)
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        digest = hashlib.blake2b(resp.content, digest_size=16).digest()
+        if entry is not None and entry.digest == digest:
+            entry.etag, entry.last_modified = etag, last_modified
+            return entry.value, True
+
+        value = parse(resp)
+        with self._lock:
+            self._entries[key] = _Entry(etag, last_modified, digest, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,99 @@
+"""Constant-memory sliding window of recently seen event ids."""
+
+from __future__ import annotations
+
+import os
+import struct
+
+_HEADER = struct.Struct("<4sQQ")  # magic, base, size
+_MAGIC = b"SCDW"
+
+
+class EventIdWindow:
+    """A ring bitmap remembering which of the last ``size`` event ids were seen.
+
+    The window covers ids ``[base, base + size)``. Seeing an id beyond the top
+    slides the window forward, forgetting the oldest ids; ids that fall below
+    ``base`` are treated as already seen, so delivery is at-most-once even for
+    very late duplicates. Memory is ``size / 8`` bytes regardless of traffic.
+    """
+
+    def __init__(self, size: int = 65_536, *, floor: int = 0) -> None:
+        if size <= 0 or size % 8:
+            raise ValueError("size must be a positive multiple of 8")
+        self._size = size
+        self._bits = bytearray(size // 8)
+        self._base = floor + 1  # ids <= floor count as seen (e.g. the saved cursor)
+
+    @property
+    def base(self) -> int:
+        return self._base
+
+    def add(self, event_id: int) -> bool:
+        """Mark ``event_id`` as seen; return ``False`` if it already was."""
+        if event_id < self._base:
+            return False
+        if event_id >= self._base + self._size:
+            self._advance(event_id - self._size + 1)
+        pos = event_id % self._size
+        byte, mask = pos >> 3, 1 << (pos & 7)
+        if self._bits[byte] & mask:
+            return False
+        self._bits[byte] |= mask
+        return True
+
+    def _advance(self, new_base: int) -> None:
+        """Slide the window so it starts at ``new_base``, clearing evicted ids."""
+        old_base, self._base = self._base, new_base
+        if new_base - old_base >= self._size:
+            self._bits[:] = bytes(len(self._bits))
+            return
+        start, end = old_base % self._size, new_base % self._size
+        if start < end:
+            self._clear(start, end)
+        else:  # evicted range wraps around the end of the ring
+            self._clear(start, self._size)
+            self._clear(0, end)
+
+    def _clear(self, lo: int, hi: int) -> None:
+        """Clear bit positions ``[lo, hi)``."""
+        while lo < hi and lo & 7:
+            self._bits[lo >> 3] &= ~(1 << (lo & 7)) & 0xFF
+            lo += 1
+        whole_end = hi & ~7
+        if lo < whole_end:
+            self._bits[lo >> 3 : whole_end >> 3] = bytes((whole_end - lo) >> 3)
+            lo = whole_end
+        while lo < hi:
+            self._bits[lo >> 3] &= ~(1 << (lo & 7)) & 0xFF
+            lo += 1
+
+    def save(self, path: str) -> None:
+        """Atomically write the window to ``path``."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self._base, self._size))
+            f.write(self._bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, *, size: int = 65_536, floor: int = 0) -> EventIdWindow:
+        """Load a window saved by :meth:`save`, or start a fresh one.
+
+        A missing or unreadable file, or one saved with a different ``size``,
+        yields an empty window starting above ``floor``. A saved window is
+        slid forward so nothing at or below ``floor`` is delivered again.
+        """
+        window = cls(size, floor=floor)
+        try:
+            with open(path, "rb") as f:
+                magic, base, saved_size = _HEADER.unpack(f.read(_HEADER.size))
+                bits = f.read()
+        except (OSError, struct.error):
+            return window
+        if magic != _MAGIC or saved_size != size or len(bits) != size // 8:
+            return window
+        window._base, window._bits = base, bytearray(bits)
+        if floor + 1 > base:
+            window._advance(floor + 1)
+        return window
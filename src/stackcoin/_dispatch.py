@@ -0,0 +1,256 @@
+"""Handler registry and event dispatch shared by every event source."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, Any, TypeVar, overload
+
+from ._dedup import EventIdWindow
+from ._endpoints import AnyEvent
+from .handlers import DeadLetterSink, EventHandler, HandlerPolicy, HandlerRunner, HandlerStats
+from .stream import EventStream, Overflow
+
+if TYPE_CHECKING:
+    from .profiling import Profiler
+
+# Handler errors have always been logged under the gateway; keep that name so
+# existing logging configuration still applies.
+logger = logging.getLogger("stackcoin.gateway")
+
+# TypeVar for the @gateway.on() decorator so it preserves the caller's
+# narrowed signature (e.g. async def f(event: RequestAcceptedEvent)).
+_F = TypeVar("_F", bound=Callable[..., Awaitable[None]])
+
+# How many newly seen ids between saves of a persistent de-dup window.
+_DEDUP_SAVE_EVERY = 1000
+
+
+class EventDispatcher:
+    """Base for :class:`Gateway` and :class:`PollingEventSource`.
+
+    Owns the ``on()``/``register_handler`` registry and the event cursor, so
+    handlers behave identically whichever transport delivered the event.
+
+    Each event id is dispatched at most once per session: server replay on
+    rejoin, REST catch-up and live frames may overlap, and duplicates are
+    dropped using a sliding bitmap over the last ``dedup_window`` ids (8 KiB
+    by default; ``None`` disables it). Ids at or below the starting
+    ``last_event_id`` count as already seen. With ``dedup_path`` the window is
+    saved periodically and on :meth:`stop`, so the guarantee also survives
+    process restarts.
+
+    Each handler runs under a :class:`HandlerPolicy` (``handler_policy`` by
+    default, or one passed to :meth:`on`): a timeout (30 seconds unless set)
+    and a circuit breaker that parks a handler after repeated failures.
+    Handlers for the same event run concurrently, but events are dispatched
+    one after another, so the slowest handler sets the pace until its
+    timeout cancels it; a handler that keeps timing out is parked and then
+    costs nothing. Events a handler failed on, timed out on or skipped are
+    passed to ``dead_letter(event, handler_name, exc)``, and per-handler
+    latency and error counters are available from :meth:`handler_stats`.
+    """
+
+    # First element of this source's profiling stacks.
+    _profile_root = "events"
+
+    def __init__(
+        self,
+        *,
+        last_event_id: int | None = None,
+        on_event_id: Callable[[int], None] | None = None,
+        dedup_window: int | None = 65_536,
+        dedup_path: str | None = None,
+        handler_policy: HandlerPolicy | None = None,
+        dead_letter: DeadLetterSink | None = None,
+        profiler: Profiler | None = None,
+    ) -> None:
+        self._handlers: dict[str, list[HandlerRunner]] = {}
+        self._handler_policy = handler_policy or HandlerPolicy()
+        self._dead_letter = dead_letter
+        self._last_event_id = last_event_id
+        self._on_event_id = on_event_id  # callback to persist cursor position
+        self._seen: EventIdWindow | None = None
+        self._dedup_path = dedup_path
+        self._unsaved = 0
+        self.duplicates = 0  # events dropped as already dispatched
+        if dedup_window is not None:
+            floor = last_event_id or 0
+            if dedup_path is not None:
+                self._seen = EventIdWindow.load(dedup_path, size=dedup_window, floor=floor)
+            else:
+                self._seen = EventIdWindow(dedup_window, floor=floor)
+        self._running = False
+        self._stopped = asyncio.Event()
+        self._streams: list[EventStream[Any]] = []
+        self._profiler = profiler
+
+    @property
+    def last_event_id(self) -> int | None:
+        return self._last_event_id
+
+    def on(self, event_type: str, *, policy: HandlerPolicy | None = None) -> Callable[[_F], _F]:
+        """Decorator to register an event handler."""
+
+        def decorator(func: _F) -> _F:
+            self.register_handler(event_type, func, policy=policy)  # type: ignore[arg-type]
+            return func
+
+        return decorator
+
+    def register_handler(
+        self, event_type: str, handler: EventHandler, *, policy: HandlerPolicy | None = None
+    ) -> None:
+        """Register an event handler programmatically.
+
+        ``policy`` overrides the dispatcher's ``handler_policy`` for this handler.
+        """
+        if event_type not in self._handlers:
+            self._handlers[event_type] = []
+        self._handlers[event_type].append(
+            HandlerRunner(event_type, handler, policy or self._handler_policy, self._dead_letter)
+        )
+
+    def handler_stats(self) -> dict[str, HandlerStats]:
+        """Latency, error and circuit state per handler, keyed ``"<type>:<qualname>"``."""
+        return {
+            runner.stats.name: runner.stats
+            for runners in self._handlers.values()
+            for runner in runners
+        }
+
+    @overload
+    def events(
+        self,
+        types: Iterable[str] | None = None,
+        *,
+        batch_size: None = None,
+        max_latency: float | None = None,
+        maxsize: int = 10_000,
+        overflow: Overflow = "block",
+        spill_dir: str | None = None,
+    ) -> EventStream[AnyEvent]: ...
+
+    @overload
+    def events(
+        self,
+        types: Iterable[str] | None = None,
+        *,
+        batch_size: int,
+        max_latency: float | None = None,
+        maxsize: int = 10_000,
+        overflow: Overflow = "block",
+        spill_dir: str | None = None,
+    ) -> EventStream[list[AnyEvent]]: ...
+
+    def events(
+        self,
+        types: Iterable[str] | None = None,
+        *,
+        batch_size: int | None = None,
+        max_latency: float | None = None,
+        maxsize: int = 10_000,
+        overflow: Overflow = "block",
+        spill_dir: str | None = None,
+    ) -> EventStream[Any]:
+        """Consume events with ``async for`` instead of (or alongside) handlers.
+
+        Returns an :class:`EventStream` that starts queueing immediately; run
+        :meth:`connect` in another task. With ``batch_size`` the stream yields
+        lists, e.g. to write a whole batch per database transaction::
+
+            asyncio.create_task(gateway.connect())
+            async for batch in gateway.events(batch_size=500, max_latency=0.5):
+                await save_all(batch)
+
+        See :class:`EventStream` for the ``maxsize``/``overflow`` policies.
+        """
+        stream: EventStream[Any] = EventStream(
+            types=types,
+            batch_size=batch_size,
+            max_latency=max_latency,
+            maxsize=maxsize,
+            overflow=overflow,
+            spill_dir=spill_dir,
+        )
+        self._streams.append(stream)
+        return stream
+
+    def _start(self) -> None:
+        self._running = True
+        self._stopped.clear()
+
+    def stop(self) -> None:
+        """Signal the event source to stop."""
+        self._running = False
+        self._stopped.set()
+        self._save_dedup()
+        for stream in self._streams:
+            stream.close()
+        self._streams.clear()
+
+    async def _dispatch_event(self, typed_event: AnyEvent) -> None:
+        """Dispatch a typed event to registered handlers and update the cursor."""
+        profiler = self._profiler
+        started = time.perf_counter_ns() if profiler is not None and profiler.sampled() else 0
+
+        if self._seen is not None and typed_event.id > 0:
+            if not self._seen.add(typed_event.id):
+                self.duplicates += 1
+                return
+            self._unsaved += 1
+            if self._unsaved >= _DEDUP_SAVE_EVERY:
+                self._save_dedup()
+
+        if self._last_event_id is None or typed_event.id > self._last_event_id:
+            self._last_event_id = typed_event.id
+
+        runners = self._handlers.get(typed_event.type)
+        if runners:
+            if started:
+                if len(runners) == 1:
+                    await self._timed(runners[0], typed_event)
+                else:
+                    await asyncio.gather(*(self._timed(r, typed_event) for r in runners))
+            elif len(runners) == 1:
+                await runners[0](typed_event)
+            else:
+                # Runners never raise. The next event waits for the slowest
+                # handler, which its policy timeout bounds.
+                await asyncio.gather(*(runner(typed_event) for runner in runners))
+
+        for stream in self._streams:
+            await stream.put(typed_event)
+
+        if typed_event.id > 0 and self._on_event_id:
+            persisted = time.perf_counter_ns() if started else 0
+            try:
+                self._on_event_id(typed_event.id)
+            except Exception:
+                logger.exception("Error in on_event_id callback for event %s", typed_event.id)
+            if persisted:
+                self._span("on_event_id", time.perf_counter_ns() - persisted)
+
+        if started:
+            assert profiler is not None
+            profiler.add((self._profile_root, "dispatch"), time.perf_counter_ns() - started)
+
+    async def _timed(self, runner: HandlerRunner, event: AnyEvent) -> None:
+        started = time.perf_counter_ns()
+        await runner(event)
+        self._span(runner.stats.name, time.perf_counter_ns() - started)
+
+    def _span(self, stage: str, nanoseconds: int) -> None:
+        assert self._profiler is not None
+        self._profiler.add((self._profile_root, "dispatch", stage), nanoseconds)
+
+    def _save_dedup(self) -> None:
+        if self._seen is None or self._dedup_path is None or not self._unsaved:
+            return
+        try:
+            self._seen.save(self._dedup_path)
+            self._unsaved = 0
+        except OSError:
+            logger.exception("Failed to save de-dup window to %s", self._dedup_path)
@@ -0,0 +1,413 @@
+"""Transport-independent request builders for the StackCoin REST API.
+
+Every endpoint is described once here as a :class:`Call` — the HTTP request to
+make plus how to turn the decoded JSON body into a typed result. :class:`Client`
+and :class:`SyncClient` only differ in how they execute a ``Call``, so the two
+can never drift apart.
+
+Multi-request operations (pagination) are written as *flows*: generators that
+yield ``Call`` objects, receive each parsed result back via ``send()`` and
+finally return the combined value; each client drives flows with its own I/O.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Generator
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ._paging import PageSizer
+from .models import (
+    CreateRequestResponse,
+    DiscordBotResponse,
+    DiscordGuild,
+    DiscordGuildsResponse,
+    EventsResponse,
+    PreauthApprovedEvent,
+    PreauthCreatedEvent,
+    PreauthRevokedEvent,
+    Request,
+    RequestAcceptedEvent,
+    RequestActionResponse,
+    RequestCreatedEvent,
+    RequestDeniedEvent,
+    RequestsResponse,
+    SendStkResponse,
+    Transaction,
+    TransactionsResponse,
+    TransferCompletedEvent,
+    User,
+    UsersResponse,
+)
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+# Union of all concrete event types (unwrapped from Event RootModel)
+AnyEvent = (
+    TransferCompletedEvent
+    | RequestCreatedEvent
+    | RequestAcceptedEvent
+    | RequestDeniedEvent
+    | PreauthCreatedEvent
+    | PreauthApprovedEvent
+    | PreauthRevokedEvent
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Call[T]:
+    """A single REST request and the parser for its JSON response body."""
+
+    method: str
+    url: str
+    # Receives the decoded JSON body, or the raw bytes from a client created
+    # with validation="fast".
+    parse: Callable[[Any], T]
+    params: dict[str, Any] | None = None
+    json: Any = None
+    headers: dict[str, str] | None = None
+    # Safe to revalidate with If-None-Match when the client has conditional
+    # requests enabled; set on idempotent reads only.
+    conditional: bool = False
+    # Slowly changing reference data a client ``cache`` may serve for its TTL.
+    cacheable: bool = False
+
+
+# A multi-request operation: yields calls, receives their results, returns R.
+type Flow[R] = Generator[Call[Any], Any, R]
+
+
+class EventsPage(NamedTuple):
+    events: list[AnyEvent]
+    has_more: bool
+
+
+def _raw(body: Any) -> Any:
+    return json.loads(body) if isinstance(body, bytes) else body
+
+
+@cache
+def _model[M: BaseModel](model: type[M]) -> Callable[[Any], M]:
+    """Parser for ``model`` accepting decoded JSON or, in fast mode, the raw body.
+
+    Bytes are validated by pydantic-core straight from JSON, without first
+    building the intermediate dicts and lists.
+    """
+
+    def parse(body: Any) -> M:
+        if isinstance(body, bytes):
+            return model.model_validate_json(body)
+        return model.model_validate(body)
+
+    return parse
+
+
+def _idempotency(idempotency_key: str | None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if idempotency_key is not None:
+        headers["Idempotency-Key"] = idempotency_key
+    return headers
+
+
+def get_me() -> Call[User]:
+    return Call("GET", "/api/user/me", _model(User), conditional=True)
+
+
+def get_user(user_id: int) -> Call[User]:
+    return Call("GET", f"/api/user/{user_id}", _model(User), conditional=True, cacheable=True)
+
+
+def get_users(discord_id: str | None) -> Call[list[User]]:
+    params: dict[str, Any] = {}
+    if discord_id is not None:
+        params["discord_id"] = discord_id
+    return Call(
+        "GET",
+        "/api/users",
+        lambda data: _model(UsersResponse)(data).users or [],
+        params=params,
+        conditional=True,
+        cacheable=True,
+    )
+
+
+def send(
+    to_user_id: int, amount: int, label: str | None, idempotency_key: str | None
+) -> Call[SendStkResponse]:
+    body: dict[str, Any] = {"amount": amount}
+    if label is not None:
+        body["label"] = label
+    return Call(
+        "POST",
+        f"/api/user/{to_user_id}/send",
+        _model(SendStkResponse),
+        json=body,
+        headers=_idempotency(idempotency_key),
+    )
+
+
+def create_request(
+    to_user_id: int,
+    amount: int,
+    label: str | None,
+    idempotency_key: str | None,
+    use_preauth: bool,
+) -> Call[CreateRequestResponse]:
+    body: dict[str, Any] = {"amount": amount}
+    if label is not None:
+        body["label"] = label
+    if use_preauth:
+        body["use_preauth"] = True
+    return Call(
+        "POST",
+        f"/api/user/{to_user_id}/request",
+        _model(CreateRequestResponse),
+        json=body,
+        headers=_idempotency(idempotency_key),
+    )
+
+
+def create_preauth(user_id: int, max_amount: int, window_hours: int) -> Call[dict]:
+    return Call(
+        "POST",
+        f"/api/user/{user_id}/preauth",
+        _raw,
+        json={"max_amount": max_amount, "window_hours": window_hours},
+    )
+
+
+def get_preauth(preauth_id: int) -> Call[dict]:
+    return Call("GET", f"/api/preauth/{preauth_id}", _raw, conditional=True)
+
+
+def revoke_preauth(preauth_id: int) -> Call[dict]:
+    return Call("POST", f"/api/preauth/{preauth_id}/revoke", _raw)
+
+
+def get_preauths(user_id: int | None) -> Call[list[dict]]:
+    params: dict[str, Any] = {}
+    if user_id is not None:
+        params["user_id"] = user_id
+    return Call(
+        "GET",
+        "/api/preauths",
+        lambda body: _raw(body).get("preauths", []),
+        params=params,
+        conditional=True,
+    )
+
+
+def get_request(request_id: int) -> Call[Request]:
+    return Call("GET", f"/api/request/{request_id}", _model(Request), conditional=True)
+
+
+def _page_params(page: int | None, limit: int | None) -> dict[str, Any]:
+    params: dict[str, Any] = {}
+    if page is not None:
+        params["page"] = page
+    if limit is not None:
+        params["limit"] = limit
+    return params
+
+
+def get_requests(
+    status: str | None, *, page: int | None = None, limit: int | None = None
+) -> Call[list[Request]]:
+    params = _page_params(page, limit)
+    if status is not None:
+        params["status"] = status
+    return Call(
+        "GET",
+        "/api/requests",
+        lambda data: _model(RequestsResponse)(data).requests or [],
+        params=params,
+        conditional=True,
+    )
+
+
+def accept_request(request_id: int) -> Call[RequestActionResponse]:
+    return Call("POST", f"/api/requests/{request_id}/accept", _model(RequestActionResponse))
+
+
+def deny_request(request_id: int) -> Call[RequestActionResponse]:
+    return Call("POST", f"/api/requests/{request_id}/deny", _model(RequestActionResponse))
+
+
+def get_transactions(
+    *, page: int | None = None, limit: int | None = None
+) -> Call[list[Transaction]]:
+    return Call(
+        "GET",
+        "/api/transactions",
+        lambda data: _model(TransactionsResponse)(data).transactions or [],
+        params=_page_params(page, limit),
+        conditional=True,
+    )
+
+
+def get_transaction(transaction_id: int) -> Call[Transaction]:
+    return Call("GET", f"/api/transaction/{transaction_id}", _model(Transaction), conditional=True)
+
+
+def _parse_events_page(data: Any) -> EventsPage:
+    wrapper = _model(EventsResponse)(data)
+    return EventsPage([e.root for e in wrapper.events], wrapper.has_more)
+
+
+def events_page(
+    since_id: int, *, limit: int | None = None, conditional: bool = False
+) -> Call[EventsPage]:
+    params: dict[str, Any] = {}
+    if since_id > 0:
+        params["since_id"] = since_id
+    if limit is not None:
+        params["limit"] = limit
+    return Call("GET", "/api/events", _parse_events_page, params=params, conditional=conditional)
+
+
+def _sized_page(
+    cursor: int, pages: PageSizer | None, *, conditional: bool = False
+) -> Flow[EventsPage]:
+    """Fetch one events page at the sizer's current size and report its timing.
+
+    The flow is suspended for exactly the duration of the request, so timing
+    across the ``yield`` measures the round trip whichever client drives it.
+    """
+    if pages is None:
+        return (yield events_page(cursor, conditional=conditional))
+    limit = pages.size
+    start = time.perf_counter()
+    page: EventsPage = yield events_page(cursor, limit=limit, conditional=conditional)
+    pages.observe(time.perf_counter() - start, full=page.has_more and len(page.events) >= limit)
+    return page
+
+
+def get_events(
+    since_id: int, *, revalidate_first: bool = False, pages: PageSizer | None = None
+) -> Flow[list[AnyEvent]]:
+    """Paginate through every event after ``since_id``.
+
+    With ``revalidate_first`` the first page is fetched conditionally, so a
+    poller re-asking for the same cursor gets a cheap ``304`` when idle.
+    Later pages are never cached: each cursor is only visited once. ``pages``
+    sets the ``limit`` of each page.
+    """
+    all_events: list[AnyEvent] = []
+    cursor = since_id
+    conditional = revalidate_first
+
+    while True:
+        page = yield from _sized_page(cursor, pages, conditional=conditional)
+        all_events.extend(page.events)
+        conditional = False
+
+        if not page.has_more or not page.events:
+            break
+        cursor = page.events[-1].id
+
+    return all_events
+
+
+def get_events_range(
+    since_id: int, until_id: int | None, *, pages: PageSizer | None = None
+) -> Flow[list[AnyEvent]]:
+    """Paginate through the events with ``since_id < id <= until_id``.
+
+    ``until_id=None`` leaves the range open-ended, like :func:`get_events`.
+    The last page may run past ``until_id``; those events are discarded.
+    """
+    events: list[AnyEvent] = []
+    cursor = since_id
+    while True:
+        page = yield from _sized_page(cursor, pages)
+        events.extend(page.events)
+        if not page.has_more or not page.events:
+            break
+        cursor = page.events[-1].id
+        if until_id is not None and cursor >= until_id:
+            break
+    if until_id is not None:
+        while events and events[-1].id > until_id:
+            events.pop()
+    return events
+
+
+# More ranges than workers, so one dense range does not leave the others idle.
+_RANGES_PER_WORKER = 4
+
+
+def event_ranges(since_id: int, head_id: int, workers: int) -> list[tuple[int, int | None]]:
+    """Split ``(since_id, head_id]`` into contiguous id ranges for ``workers``.
+
+    Returns ``(since_id, until_id)`` pairs for :func:`get_events_range`. The
+    last range is open-ended so events newer than ``head_id`` are not lost.
+    """
+    span = head_id - since_id
+    parts = max(1, min(workers * _RANGES_PER_WORKER, span))
+    bounds = [since_id + span * i // parts for i in range(parts)]
+    return list(zip(bounds, [*bounds[1:], None], strict=True))
+
+
+# First distance probed past a known event id when searching for the head.
+_HEAD_PROBE_STEP = 1024
+
+
+def latest_event_id(since_id: int) -> Flow[int]:
+    """Return the newest event id after ``since_id`` (or ``since_id`` if there is none).
+
+    Each probe asks for the single event after some id. Probes gallop ever
+    further past the newest id known to exist until one comes back empty,
+    then bisect the gap, so a history of ``n`` events costs ``O(log n)``
+    one-event requests rather than a walk through every page.
+    """
+    head = since_id  # an existing event id, or the starting point
+    step = _HEAD_PROBE_STEP
+    while True:
+        page = yield events_page(head + step, limit=1)
+        if not page.events:
+            break
+        head = page.events[0].id
+        step *= 2
+    ceiling = head + step  # no events after this id
+    while head < ceiling:
+        middle = (head + ceiling) // 2
+        page = yield events_page(middle, limit=1)
+        if page.events:
+            head = page.events[0].id
+        else:
+            ceiling = middle
+    return head
+
+
+def get_discord_bot_id() -> Call[str]:
+    return Call(
+        "GET",
+        "/api/discord/bot",
+        lambda data: _model(DiscordBotResponse)(data).discord_id,
+        conditional=True,
+        cacheable=True,
+    )
+
+
+def get_discord_guilds() -> Call[list[DiscordGuild]]:
+    return Call(
+        "GET",
+        "/api/discord/guilds",
+        lambda data: _model(DiscordGuildsResponse)(data).guilds or [],
+        conditional=True,
+        cacheable=True,
+    )
+
+
+def get_discord_guild(snowflake: str) -> Call[DiscordGuild]:
+    return Call(
+        "GET",
+        f"/api/discord/guild/{snowflake}",
+        _model(DiscordGuild),
+        conditional=True,
+        cacheable=True,
+    )
@@ -0,0 +1,14 @@
+"""Base class for the generated API models."""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class StackCoinModel(BaseModel):
+    """Base for every model in :mod:`stackcoin.models`.
+
+    Core schemas are built on first validation rather than at import time
+    (``defer_build``), so importing the package does not pay for dozens of
+    models that a given program never touches.
+    """
+
+    model_config = ConfigDict(defer_build=True)
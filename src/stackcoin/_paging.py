@@ -0,0 +1,43 @@
+"""Page-size selection for cursor-paginated endpoints."""
+
+from __future__ import annotations
+
+import threading
+
+
+class PageSizer:
+    """Chooses the ``limit`` for each ``/api/events`` page.
+
+    With only ``initial`` the size is fixed. With ``target`` (seconds) the
+    size adapts to how long full pages take: it doubles while a page takes
+    less than half the target and halves when one takes longer than the
+    target, within ``[minimum, maximum]``. Short final pages say nothing
+    about throughput and are ignored. One sizer is shared by every flow of a
+    client, so what a backfill learns carries over to the next one.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 100,
+        minimum: int = 10,
+        maximum: int = 1000,
+        target: float | None = None,
+    ) -> None:
+        if not 0 < minimum <= initial <= maximum:
+            raise ValueError("page sizes must satisfy 0 < minimum <= initial <= maximum")
+        self.size = initial
+        self._minimum = minimum
+        self._maximum = maximum
+        self._target = target
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *, full: bool) -> None:
+        """Record that a page of the current size took ``seconds``."""
+        if self._target is None or not full:
+            return
+        with self._lock:
+            if seconds < self._target / 2:
+                self.size = min(self.size * 2, self._maximum)
+            elif seconds > self._target:
+                self.size = max(self.size // 2, self._minimum)
@@ -0,0 +1,156 @@
+"""Reordering stage that emits gateway events in id order and backfills gaps."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from ._endpoints import AnyEvent
+from .errors import StackCoinError
+
+logger = logging.getLogger("stackcoin.gateway")
+
+Emit = Callable[[AnyEvent], Awaitable[None]]
+Backfill = Callable[[int], Awaitable[list[AnyEvent]]]
+
+
+@dataclass
+class ReorderStats:
+    """Counters describing how often the event stream needed repair."""
+
+    gaps_detected: int = 0  # an event arrived ahead of the next expected id
+    backfills: int = 0  # REST backfills issued after a gap outlived the wait
+    backfilled_events: int = 0  # missing events recovered by those backfills
+    backfill_errors: int = 0
+    skipped_ids: int = 0  # ids never seen, even after backfill (not ours, or lost)
+    late_events: int = 0  # arrived after later ids had already been emitted
+    max_buffered: int = 0
+
+
+class ReorderBuffer:
+    """Holds events briefly so they are emitted in strictly increasing id order.
+
+    Events at the next expected id are emitted immediately. An event further
+    ahead opens a *gap*: it is held, and if the gap is still open ``wait``
+    seconds later the buffer asks ``backfill(since_id)`` (normally
+    ``Client.get_events``) for the authoritative events after the last emitted
+    id, merges the missing ones and emits everything held in order. Ids that
+    REST does not know about either are skipped and counted.
+
+    Batches that are already known to be complete — REST catch-up — go
+    through :meth:`push_complete`, which closes any gap they cover at once.
+    """
+
+    def __init__(
+        self,
+        emit: Emit,
+        *,
+        wait: float,
+        backfill: Backfill | None = None,
+        last_id: int | None = None,
+    ) -> None:
+        self._emit = emit
+        self._wait = wait
+        self._backfill = backfill
+        self._next = None if last_id is None else last_id + 1
+        self._heap: list[tuple[int, AnyEvent]] = []
+        self._held: set[int] = set()
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task[None] | None = None
+        self.stats = ReorderStats()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def push(self, event: AnyEvent) -> None:
+        """Accept a live event, emitting whatever has become contiguous."""
+        async with self._lock:
+            if self._next is None:
+                self._next = event.id
+            if event.id < self._next:
+                self.stats.late_events += 1
+                await self._emit(event)
+                return
+            self._hold(event)
+            await self._drain()
+            if self._heap and self._timer is None:
+                self.stats.gaps_detected += 1
+                self._timer = asyncio.create_task(self._expire())
+
+    async def push_complete(self, events: list[AnyEvent], since_id: int) -> None:
+        """Accept every event after ``since_id`` in one authoritative batch."""
+        async with self._lock:
+            if self._next is None:
+                self._next = since_id + 1
+            for event in events:
+                if event.id < self._next:
+                    await self._emit(event)  # already passed; de-dup decides
+                else:
+                    self._hold(event)
+            await self._release(events[-1].id if events else since_id)
+
+    async def flush(self) -> None:
+        """Emit everything held, in order, without waiting for gaps to fill."""
+        async with self._lock:
+            self._cancel_timer()
+            if self._heap:
+                await self._release(max(self._held))
+
+    def _hold(self, event: AnyEvent) -> None:
+        if event.id in self._held:
+            return
+        self._held.add(event.id)
+        heapq.heappush(self._heap, (event.id, event))
+        self.stats.max_buffered = max(self.stats.max_buffered, len(self._heap))
+
+    async def _drain(self) -> None:
+        """Emit held events while they continue the sequence without a gap."""
+        while self._heap and self._heap[0][0] == self._next:
+            event_id, event = heapq.heappop(self._heap)
+            self._held.discard(event_id)
+            self._next = event_id + 1
+            await self._emit(event)
+        if not self._heap:
+            self._cancel_timer()
+
+    async def _release(self, upto: int) -> None:
+        """Emit every held event with ``id <= upto``, treating gaps below as closed."""
+        assert self._next is not None
+        while self._heap and self._heap[0][0] <= upto:
+            event_id, event = heapq.heappop(self._heap)
+            self._held.discard(event_id)
+            self.stats.skipped_ids += event_id - self._next
+            self._next = event_id + 1
+            await self._emit(event)
+        self._next = max(self._next, upto + 1)
+        await self._drain()
+
+    async def _expire(self) -> None:
+        await asyncio.sleep(self._wait)
+        async with self._lock:
+            self._timer = None
+            if not self._heap:
+                return
+            assert self._next is not None
+            target = max(self._held)
+            if self._backfill is not None:
+                self.stats.backfills += 1
+                try:
+                    events = await self._backfill(self._next - 1)
+                except StackCoinError as exc:
+                    self.stats.backfill_errors += 1
+                    logger.warning("Gap backfill after event %s failed: %s", self._next - 1, exc)
+                    events = []
+                for event in events:
+                    if self._next <= event.id < target and event.id not in self._held:
+                        self.stats.backfilled_events += 1
+                        self._hold(event)
+            await self._release(target)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
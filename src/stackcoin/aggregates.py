@@ -0,0 +1,312 @@
+"""Rolling per-user transfer totals over sliding time windows.
+
+:class:`RollingAggregates` consumes ``transfer.completed`` events (or
+:class:`Transaction` history) and keeps, for each configured window, every
+user's STK sent and received plus the top senders and receivers, without
+ever re-reading history.
+
+Each window is a ring of time buckets: ``Window("1h", 3600, 60)`` keeps sixty
+one-minute buckets, so totals slide forward a minute at a time. An update
+touches one bucket and the running totals; a bucket leaving the window is
+subtracted from the totals once. Memory per window is bounded by the bucket
+count times the users active within the window. Top-K queries read lazy
+max-heaps, so they cost ``O(k log n)`` rather than a scan of every user.
+
+State can be saved with :meth:`RollingAggregates.save` and restored with
+:meth:`RollingAggregates.load`; resume the event source from
+:attr:`~RollingAggregates.last_event_id` to pick up where it stopped.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from ._dispatch import EventDispatcher
+    from .models import Transaction, TransferCompletedEvent
+
+Direction = Literal["sent", "received"]
+
+_SNAPSHOT_VERSION = 1
+_SENT, _RECEIVED = 0, 1
+
+
+@dataclass(frozen=True, slots=True)
+class Window:
+    """A sliding window of ``span`` seconds, tracked in ``buckets`` steps."""
+
+    name: str
+    span: float
+    buckets: int
+
+    @property
+    def width(self) -> float:
+        """Seconds per bucket: the granularity at which the window slides."""
+        return self.span / self.buckets
+
+
+DEFAULT_WINDOWS = (
+    Window("1h", 3600, 60),  # 1 minute buckets
+    Window("24h", 86_400, 96),  # 15 minutes
+    Window("7d", 604_800, 84),  # 2 hours
+)
+
+
+@dataclass(frozen=True, slots=True)
+class UserTotals:
+    """STK a user sent and received within one window."""
+
+    sent: int = 0
+    received: int = 0
+
+
+class _WindowState:
+    """Bucket ring, running totals and lazy top-K heaps for one window."""
+
+    def __init__(self, window: Window) -> None:
+        self.window = window
+        self.width = window.width
+        self.head: int | None = None  # newest bucket number seen
+        # slots[n % buckets] holds bucket n as (n, {user: [sent, received]}).
+        self.slots: list[tuple[int, dict[int, list[int]]] | None] = [None] * window.buckets
+        self.totals: dict[int, list[int]] = {}
+        # Max-heaps of (-total, user). Entries go stale when a user's total
+        # changes; each change pushes a fresh entry and queries skip stale ones.
+        self.heaps: tuple[list[tuple[int, int]], list[tuple[int, int]]] = ([], [])
+
+    def add(self, user: int, direction: int, amount: int, bucket: int) -> bool:
+        if self.head is None or bucket > self.head:
+            self.advance(bucket)
+        elif bucket <= self.head - self.window.buckets:
+            return False  # older than the window
+        index = bucket % self.window.buckets
+        slot = self.slots[index]
+        if slot is None:
+            slot = self.slots[index] = (bucket, {})
+        entry = slot[1].get(user)
+        if entry is None:
+            entry = slot[1][user] = [0, 0]
+        entry[direction] += amount
+        total = self.totals.get(user)
+        if total is None:
+            total = self.totals[user] = [0, 0]
+        total[direction] += amount
+        self._push(direction, total[direction], user)
+        return True
+
+    def advance(self, bucket: int) -> None:
+        """Slide the window so ``bucket`` is the newest, evicting older buckets."""
+        if self.head is not None and bucket <= self.head:
+            return
+        size = self.window.buckets
+        start = bucket - size + 1 if self.head is None else max(self.head + 1, bucket - size + 1)
+        for n in range(start, bucket + 1):
+            slot = self.slots[n % size]
+            if slot is not None:
+                self._evict(slot[1])
+                self.slots[n % size] = None
+        self.head = bucket
+
+    def _evict(self, entries: dict[int, list[int]]) -> None:
+        for user, (sent, received) in entries.items():
+            total = self.totals[user]
+            total[_SENT] -= sent
+            total[_RECEIVED] -= received
+            if total[_SENT] == 0 and total[_RECEIVED] == 0:
+                del self.totals[user]
+                continue
+            if sent:
+                self._push(_SENT, total[_SENT], user)
+            if received:
+                self._push(_RECEIVED, total[_RECEIVED], user)
+
+    def _push(self, direction: int, value: int, user: int) -> None:
+        heap = self.heaps[direction]
+        heapq.heappush(heap, (-value, user))
+        if len(heap) > 4 * len(self.totals) + 64:
+            self._rebuild(direction)
+
+    def _rebuild(self, direction: int) -> None:
+        heap = [
+            (-total[direction], user) for user, total in self.totals.items() if total[direction]
+        ]
+        heapq.heapify(heap)
+        self.heaps[direction][:] = heap
+
+    def top(self, direction: int, k: int) -> list[tuple[int, int]]:
+        heap = self.heaps[direction]
+        found: list[tuple[int, int]] = []
+        valid: list[tuple[int, int]] = []
+        while heap and len(found) < k:
+            item = heapq.heappop(heap)
+            value, user = -item[0], item[1]
+            total = self.totals.get(user)
+            if total is None or total[direction] != value or (user, value) in found:
+                continue  # stale, or a duplicate of a current entry
+            found.append((user, value))
+            valid.append(item)
+        for item in valid:
+            heapq.heappush(heap, item)
+        return found
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "name": self.window.name,
+            "span": self.window.span,
+            "buckets": self.window.buckets,
+            "head": self.head,
+            "slots": [
+                [slot[0], [[user, sent, received] for user, (sent, received) in slot[1].items()]]
+                for slot in self.slots
+                if slot is not None
+            ],
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        self.head = data["head"]
+        for bucket, entries in data["slots"]:
+            self.slots[bucket % self.window.buckets] = (
+                bucket,
+                {user: [sent, received] for user, sent, received in entries},
+            )
+            for user, sent, received in entries:
+                total = self.totals.setdefault(user, [0, 0])
+                total[_SENT] += sent
+                total[_RECEIVED] += received
+        self._rebuild(_SENT)
+        self._rebuild(_RECEIVED)
+
+
+class RollingAggregates:
+    """Per-user sent/received totals and top-K over sliding windows.
+
+    Usage::
+
+        aggregates = stackcoin.RollingAggregates()
+        aggregates.attach(gateway)
+        ...
+        aggregates.totals(user_id, "24h")         # UserTotals(sent=..., received=...)
+        aggregates.top("1h", k=10)                # [(user_id, sent), ...]
+
+    Bucket times come from each event's ``inserted_at``. Queries first slide
+    the windows to ``now`` (default: the current time), so totals decay even
+    when no events arrive; pass ``now`` explicitly when analysing history.
+    Transfers older than every window when they arrive are counted in
+    :attr:`late` and otherwise ignored.
+    """
+
+    def __init__(self, windows: tuple[Window, ...] = DEFAULT_WINDOWS) -> None:
+        if len({window.name for window in windows}) != len(windows):
+            raise ValueError("window names must be unique")
+        self._windows = {window.name: _WindowState(window) for window in windows}
+        self.last_event_id: int | None = None
+        self.late = 0
+
+    @property
+    def windows(self) -> tuple[Window, ...]:
+        return tuple(state.window for state in self._windows.values())
+
+    def attach(self, source: EventDispatcher) -> None:
+        """Consume ``transfer.completed`` events from a gateway or polling source."""
+        source.register_handler("transfer.completed", self.on_transfer)  # type: ignore[arg-type]
+
+    async def on_transfer(self, event: TransferCompletedEvent) -> None:
+        """Event handler recording one completed transfer."""
+        self.add_event(event)
+
+    def add_event(self, event: TransferCompletedEvent) -> None:
+        data = event.data
+        self.record(data.from_id, data.to_id, data.amount, event.inserted_at)
+        if self.last_event_id is None or event.id > self.last_event_id:
+            self.last_event_id = event.id
+
+    def add_transaction(self, transaction: Transaction) -> None:
+        """Record a transaction from :meth:`Client.get_transactions` history."""
+        self.record(transaction.from_.id, transaction.to.id, transaction.amount, transaction.time)
+
+    def record(self, from_id: int, to_id: int, amount: int, at: datetime | float) -> None:
+        """Record ``amount`` sent from ``from_id`` to ``to_id`` at ``at``."""
+        ts = at.timestamp() if isinstance(at, datetime) else at
+        counted = False
+        for state in self._windows.values():
+            bucket = int(ts // state.width)
+            counted |= state.add(from_id, _SENT, amount, bucket)
+            state.add(to_id, _RECEIVED, amount, bucket)
+        if not counted:
+            self.late += 1
+
+    def totals(
+        self, user_id: int, window: str, *, now: datetime | float | None = None
+    ) -> UserTotals:
+        """STK ``user_id`` sent and received within ``window``."""
+        state = self._advanced(window, now)
+        total = state.totals.get(user_id)
+        return UserTotals(*total) if total is not None else UserTotals()
+
+    def top(
+        self,
+        window: str,
+        k: int = 10,
+        *,
+        by: Direction = "sent",
+        now: datetime | float | None = None,
+    ) -> list[tuple[int, int]]:
+        """The ``k`` users with the largest totals in ``window``, as ``(user_id, amount)``."""
+        direction = _SENT if by == "sent" else _RECEIVED
+        return self._advanced(window, now).top(direction, k)
+
+    def _advanced(self, window: str, now: datetime | float | None) -> _WindowState:
+        try:
+            state = self._windows[window]
+        except KeyError:
+            raise ValueError(f"unknown window {window!r}") from None
+        ts = time.time() if now is None else now.timestamp() if isinstance(now, datetime) else now
+        state.advance(int(ts // state.width))
+        return state
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serialisable state, restorable with :meth:`from_snapshot`."""
+        return {
+            "version": _SNAPSHOT_VERSION,
+            "last_event_id": self.last_event_id,
+            "windows": [state.snapshot() for state in self._windows.values()],
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> RollingAggregates:
+        if data.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported aggregates snapshot version {data.get('version')!r}")
+        windows = tuple(Window(w["name"], w["span"], w["buckets"]) for w in data["windows"])
+        aggregates = cls(windows)
+        for state, saved in zip(aggregates._windows.values(), data["windows"], strict=True):
+            state.restore(saved)
+        aggregates.last_event_id = data["last_event_id"]
+        return aggregates
+
+    def save(self, path: str) -> None:
+        """Atomically write a snapshot to ``path``."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, windows: tuple[Window, ...] = DEFAULT_WINDOWS) -> RollingAggregates:
+        """Restore a snapshot saved by :meth:`save`, or start empty if there is none.
+
+        A snapshot taken with different windows is discarded.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                aggregates = cls.from_snapshot(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return cls(windows)
+        if aggregates.windows != windows:
+            return cls(windows)
+        return aggregates
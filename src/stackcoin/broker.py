@@ -0,0 +1,346 @@
+"""One gateway connection per host, shared by every local process."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import stat
+import struct
+import tempfile
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Literal
+
+from ._dispatch import EventDispatcher
+from ._endpoints import AnyEvent
+from .gateway import Gateway
+from .handlers import DeadLetterSink, HandlerPolicy
+from .models import Event
+
+if TYPE_CHECKING:
+    from .client import Client
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct("<I")
+_PEERCRED = struct.Struct("3i")  # struct ucred: pid, uid, gid
+# A subscriber this far behind is disconnected; it recovers from the replay ring.
+_MAX_SUBSCRIBER_BUFFER = 16 * 1024 * 1024
+# Larger frames are treated as a broken peer rather than buffered.
+_MAX_FRAME = 4 * 1024 * 1024
+
+Role = Literal["leader", "subscriber"]
+
+
+def _frame(body: bytes) -> bytes:
+    return _LENGTH.pack(len(body)) + body
+
+
+def _hello(cursor: int | None) -> bytes:
+    """The one message each side sends first: a cursor, or the ring floor."""
+    return _frame(json.dumps(cursor).encode())
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if length > _MAX_FRAME:
+        raise ConnectionError(f"host gateway frame of {length} bytes")
+    return await reader.readexactly(length)
+
+
+def _private_dir() -> str:
+    """A directory only the current user can write, for the default lock and socket.
+
+    ``$XDG_RUNTIME_DIR`` when set, otherwise a per-user directory under the
+    temporary directory. Either way its owner and mode are checked, so another
+    local user cannot have planted it.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        path = os.path.join(runtime, "stackcoin")
+    else:
+        path = os.path.join(tempfile.gettempdir(), f"stackcoin-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(
+            f"{path} must be a directory owned by uid {os.getuid()} with mode 0700; "
+            "remove it or pass lock_path and socket_path"
+        )
+    return path
+
+
+def _same_user(writer: asyncio.StreamWriter) -> bool:
+    """Whether the process at the other end of a Unix socket runs as this user."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True  # no peer credentials on this platform; the 0700 directory guards it
+    sock = writer.get_extra_info("socket")
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)
+    _, uid, _ = _PEERCRED.unpack(creds)
+    return uid == os.getuid()
+
+
+class HostGateway(EventDispatcher):
+    """A :class:`Gateway` that is connected once per host, not once per process.
+
+    Construct one in every worker process exactly as you would a ``Gateway``.
+    The processes elect a leader with an exclusive lock on ``lock_path``; the
+    leader holds the only WebSocket connection, decodes each frame once and
+    re-publishes the typed events to the other processes over a Unix socket
+    at ``socket_path``. Every process, leader included, runs its own handlers,
+    cursor (``last_event_id``/``on_event_id``) and de-duplication.
+
+    The leader keeps the last ``replay_buffer`` events. A subscriber that
+    (re)connects with a cursor receives the events after it from that ring;
+    if its cursor is older than the ring and a ``client`` was given, it first
+    catches up via :meth:`Client.get_events`. When the leader exits, the lock
+    is released and one subscriber takes over, reconnecting the WebSocket
+    from its own cursor.
+
+    Both paths default to a private directory (``$XDG_RUNTIME_DIR/stackcoin``,
+    or ``stackcoin-<uid>`` under the temporary directory, created with mode
+    0700), keyed by the token, so workers of the same bot find each other.
+    Events travel as JSON; on Linux both ends also check that the peer runs as
+    the same user.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        ws_url: str = "wss://stackcoin.world/ws",
+        client: Client | None = None,
+        lock_path: str | None = None,
+        socket_path: str | None = None,
+        replay_buffer: int = 10_000,
+        last_event_id: int | None = None,
+        on_event_id: Callable[[int], None] | None = None,
+        dedup_window: int | None = 65_536,
+        dedup_path: str | None = None,
+        handler_policy: HandlerPolicy | None = None,
+        dead_letter: DeadLetterSink | None = None,
+        fallback_after: int | None = None,
+        reorder_wait: float | None = None,
+    ):
+        super().__init__(
+            last_event_id=last_event_id,
+            on_event_id=on_event_id,
+            dedup_window=dedup_window,
+            dedup_path=dedup_path,
+            handler_policy=handler_policy,
+            dead_letter=dead_letter,
+        )
+        if lock_path is None or socket_path is None:
+            stem = os.path.join(
+                _private_dir(), hashlib.blake2b(token.encode(), digest_size=6).hexdigest()
+            )
+            lock_path = lock_path or f"{stem}.lock"
+            socket_path = socket_path or f"{stem}.sock"
+        self._token = token
+        self._ws_url = ws_url
+        self._client = client
+        self._lock_path = lock_path
+        self._socket_path = socket_path
+        self._gateway_options: dict[str, Any] = {
+            "fallback_after": fallback_after,
+            "reorder_wait": reorder_wait,
+        }
+        self._role: Role | None = None
+        self._lock_fd: int | None = None
+        self._gateway: Gateway | None = None
+        self._ring: deque[AnyEvent] = deque(maxlen=replay_buffer)
+        self._ring_floor: int | None = None  # the ring holds every event after this id
+        self._subscribers: set[asyncio.StreamWriter] = set()
+        self._upstream: asyncio.StreamWriter | None = None
+
+    @property
+    def role(self) -> Role | None:
+        """``"leader"`` while this process holds the connection, else ``"subscriber"``."""
+        return self._role
+
+    async def connect(self) -> None:
+        """Lead or subscribe until :meth:`stop` is called, failing over as needed."""
+        self._start()
+        while self._running:
+            if self._acquire_lock():
+                try:
+                    await self._lead()
+                finally:
+                    self._release_lock()
+                continue
+            try:
+                await self._follow()
+            except PermissionError as exc:
+                if not self._running:
+                    break
+                logger.warning("Refusing host gateway leader: %s; retrying", exc)
+                await self._pause(random.uniform(0.1, 0.5))
+            except (OSError, asyncio.IncompleteReadError) as exc:
+                if not self._running:
+                    break
+                logger.debug("No host gateway leader reachable (%s); retrying", exc)
+                await self._pause(random.uniform(0.1, 0.5))
+        self._role = None
+
+    def stop(self) -> None:
+        """Stop receiving events; a leader hands its connection over to a subscriber."""
+        super().stop()
+        if self._gateway is not None:
+            self._gateway.stop()
+        if self._upstream is not None:
+            self._upstream.close()
+
+    # Leader
+
+    def _acquire_lock(self) -> bool:
+        import fcntl
+
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # closing the descriptor drops the flock
+            self._lock_fd = None
+
+    async def _lead(self) -> None:
+        self._role = "leader"
+        self._ring.clear()
+        self._ring_floor = self._last_event_id
+        if os.path.lexists(self._socket_path):
+            os.unlink(self._socket_path)  # left by a leader that died; we hold the lock
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)  # bind the socket as 0600, with no window before a chmod
+        try:
+            sock.bind(self._socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        server = await asyncio.start_unix_server(self._serve, sock=sock)
+        logger.info("Host gateway leader (pid %d) serving %s", os.getpid(), self._socket_path)
+
+        self._gateway = Gateway(
+            self._token,
+            ws_url=self._ws_url,
+            client=self._client,
+            last_event_id=self._last_event_id,
+            **self._gateway_options,
+        )
+        stream = self._gateway.events()
+        task = asyncio.create_task(self._gateway.connect())
+        task.add_done_callback(lambda _: stream.close())
+        try:
+            async for event in stream:
+                await self._publish(event)
+        finally:
+            self._gateway.stop()
+            self._gateway = None
+            server.close()
+            for writer in self._subscribers:
+                writer.close()
+            self._subscribers.clear()
+            if os.path.lexists(self._socket_path):
+                os.unlink(self._socket_path)
+            await server.wait_closed()
+            await task  # re-raises a fatal gateway error, e.g. TooManyMissedEventsError
+
+    async def _publish(self, event: AnyEvent) -> None:
+        if self._ring_floor is None:
+            self._ring_floor = event.id - 1
+        if len(self._ring) == self._ring.maxlen:
+            self._ring_floor = max(self._ring_floor, self._ring[0].id)
+        self._ring.append(event)
+        frame = _frame(event.model_dump_json().encode())
+        for writer in list(self._subscribers):
+            self._send(writer, frame)
+        await self._dispatch_event(event)
+
+    def _send(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        if writer.transport.get_write_buffer_size() > _MAX_SUBSCRIBER_BUFFER:
+            logger.warning("Dropping a host gateway subscriber that stopped reading")
+            self._subscribers.discard(writer)
+            writer.close()
+            return
+        writer.write(frame)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            if not _same_user(writer):
+                logger.warning("Rejected a host gateway subscriber running as another user")
+                return
+            cursor = json.loads(await _read_frame(reader))
+            if cursor is not None and not isinstance(cursor, int):
+                return
+            # No awaits from here to add(): the backlog and live frames must
+            # not interleave.
+            writer.write(_hello(self._ring_floor))
+            if cursor is not None:
+                for event in self._ring:
+                    if event.id > cursor:
+                        writer.write(_frame(event.model_dump_json().encode()))
+            self._subscribers.add(writer)
+            await reader.read()  # subscribers only talk once; wait for them to leave
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    # Subscriber
+
+    async def _follow(self) -> None:
+        reader, writer = await asyncio.open_unix_connection(self._socket_path)
+        if not _same_user(writer):
+            writer.close()
+            raise PermissionError(f"{self._socket_path} is served by another user")
+        self._upstream = writer
+        self._role = "subscriber"
+        try:
+            writer.write(_hello(self._last_event_id))
+            floor = json.loads(await _read_frame(reader))
+            cursor = self._last_event_id
+            if cursor is not None and (floor is None or cursor < floor):
+                await self._catch_up(cursor)
+            while True:
+                event = Event.model_validate_json(await _read_frame(reader)).root
+                await self._dispatch_event(event)
+        except asyncio.IncompleteReadError:
+            if self._running:
+                logger.info("Host gateway leader went away; electing a new one")
+        finally:
+            self._upstream = None
+            writer.close()
+
+    async def _catch_up(self, since_id: int) -> None:
+        """Fetch events the leader's ring no longer holds; the live stream is de-duplicated."""
+        if self._client is None:
+            logger.warning(
+                "Cursor %s is older than the host gateway's replay ring and no client "
+                "was given; events in between are skipped",
+                since_id,
+            )
+            return
+        for event in await self._client.get_events(since_id=since_id):
+            await self._dispatch_event(event)
+
+    async def _pause(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopped.wait(), seconds)
+        except TimeoutError:
+            pass
@@ -0,0 +1,173 @@
+"""Response cache backends for slowly changing lookups (users, guilds).
+
+A client created with ``cache=`` serves cacheable reads from the backend for
+``cache_ttl`` seconds before asking the server again. Backends store the raw
+JSON body, so any process that can reach the backend can reuse a response:
+
+* :class:`MemoryCache` — an LRU inside one process.
+* :class:`SharedMemoryCache` — an ``mmap``-backed table that every process on
+  the host shares, so N workers make one request instead of N.
+* anything implementing :class:`CacheBackend`, e.g. a thin Redis wrapper.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Protocol, runtime_checkable
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """Storage for cached response bodies.
+
+    Called synchronously from both clients, so implementations should be
+    fast (local memory, a socket round trip) and thread-safe.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        """Return the stored body, or ``None`` if absent or expired."""
+        ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds."""
+        ...
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        ...
+
+
+class MemoryCache:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# File header: magic, slot count, slot size.
+_FILE_HEADER = struct.Struct("<4sII")
+_MAGIC = b"SCSC"
+# Slot header: key digest, wall-clock expiry, value length, CRC32 of the value.
+_SLOT_HEADER = struct.Struct("<16sdII")
+
+
+class SharedMemoryCache:
+    """A fixed-size hash table in a memory-mapped file, shared across processes.
+
+    Every process that opens the same ``path`` (put it on ``/dev/shm`` for a
+    RAM-backed file) sees the others' entries. The table has ``slots``
+    direct-mapped slots of ``slot_size`` bytes each; a key that hashes to an
+    occupied slot replaces its entry, and values larger than a slot are not
+    cached. The file is sparse, so untouched slots cost no memory.
+
+    Writers lock only the slot they write (``fcntl`` record locks, which
+    belong to the process, so a thread lock also serialises writers sharing
+    this instance, e.g. the threads of one :class:`SyncClient`). Readers
+    take no lock and instead check each value's CRC32, so a read racing a
+    write is a miss rather than corrupt data. Expiry uses wall-clock time,
+    which every process agrees on.
+    """
+
+    def __init__(self, path: str, *, slots: int = 1024, slot_size: int = 32 * 1024) -> None:
+        import fcntl  # POSIX only; imported here so the module loads everywhere
+
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError(f"slot_size must be larger than {_SLOT_HEADER.size} bytes")
+        self._fcntl = fcntl
+        self._slots = slots
+        self._slot_size = slot_size
+        self._capacity = slot_size - _SLOT_HEADER.size
+        total = _FILE_HEADER.size + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _FILE_HEADER.size, 0)
+        try:
+            header = os.pread(self._fd, _FILE_HEADER.size, 0)
+            if len(header) < _FILE_HEADER.size or header[:4] != _MAGIC:
+                os.ftruncate(self._fd, total)
+                os.pwrite(self._fd, _FILE_HEADER.pack(_MAGIC, slots, slot_size), 0)
+            else:
+                _, saved_slots, saved_size = _FILE_HEADER.unpack(header)
+                if (saved_slots, saved_size) != (slots, slot_size):
+                    raise ValueError(
+                        f"{path} was created with slots={saved_slots}, slot_size={saved_size}"
+                    )
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _FILE_HEADER.size, 0)
+        self._map = mmap.mmap(self._fd, total)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    def _locate(self, key: str) -> tuple[bytes, int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        slot = int.from_bytes(digest[:8], "little") % self._slots
+        return digest, _FILE_HEADER.size + slot * self._slot_size
+
+    def get(self, key: str) -> bytes | None:
+        digest, offset = self._locate(key)
+        stored, expires, length, crc = _SLOT_HEADER.unpack_from(self._map, offset)
+        if stored != digest or expires <= time.time() or length > self._capacity:
+            return None
+        start = offset + _SLOT_HEADER.size
+        value = self._map[start : start + length]
+        if zlib.crc32(value) != crc:
+            return None  # torn read: a writer is replacing this slot
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self._capacity:
+            return
+        digest, offset = self._locate(key)
+        header = _SLOT_HEADER.pack(digest, time.time() + ttl, len(value), zlib.crc32(value))
+        start = offset + _SLOT_HEADER.size
+        with self._lock:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, self._slot_size, offset)
+            try:
+                # Invalidate first so a concurrent reader never pairs the new
+                # header with a half-written value that happens to pass the CRC.
+                self._map[offset : offset + 16] = bytes(16)
+                self._map[start : start + len(value)] = value
+                self._map[offset : offset + _SLOT_HEADER.size] = header
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, self._slot_size, offset)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in range(self._slots):
+                offset = _FILE_HEADER.size + slot * self._slot_size
+                self._map[offset : offset + _SLOT_HEADER.size] = bytes(_SLOT_HEADER.size)
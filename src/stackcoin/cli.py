@@ -0,0 +1,341 @@
+"""``stackcoin`` command-line tool."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import pkgutil
+import sys
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .export import ExportProgress
+    from .replay import ReplayServer
+
+
+def _add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("path", help="dead-letter database file")
+    parser.add_argument("--handler", help="only entries recorded for this handler name")
+    parser.add_argument("--type", dest="event_type", help="only events of this type")
+
+
+def _deadletter_list(args: argparse.Namespace) -> int:
+    from .deadletter import DeadLetterStore
+
+    with DeadLetterStore(args.path) as store:
+        letters = store.entries(handler=args.handler, event_type=args.event_type, limit=args.limit)
+        for letter in letters:
+            failed_at = datetime.fromtimestamp(letter.last_failed_at, UTC).isoformat(
+                timespec="seconds"
+            )
+            print(
+                f"{letter.event.id}\t{letter.event.type}\t{letter.handler}\t"
+                f"x{letter.attempts}\t{failed_at}\t{letter.error_type}: {letter.error}"
+            )
+        print(f"({len(letters)} shown, {store.count()} stored)", file=sys.stderr)
+    return 0
+
+
+def _deadletter_replay(args: argparse.Namespace) -> int:
+    from .deadletter import DeadLetterStore
+
+    handler = pkgutil.resolve_name(args.to)
+    with DeadLetterStore(args.path) as store:
+        result = asyncio.run(
+            store.replay(
+                handler,
+                only_handler=args.handler,
+                event_type=args.event_type,
+                limit=args.limit,
+                concurrency=args.concurrency,
+                timeout=args.timeout,
+            )
+        )
+    for event_id, exc in result.errors:
+        print(f"event {event_id} failed again: {exc!r}", file=sys.stderr)
+    print(f"replayed {result.replayed}, failed {result.failed}")
+    return 1 if result.failed else 0
+
+
+def _deadletter_purge(args: argparse.Namespace) -> int:
+    from .deadletter import DeadLetterStore
+
+    with DeadLetterStore(args.path) as store:
+        print(f"removed {store.purge(handler=args.handler, event_type=args.event_type)}")
+    return 0
+
+
+def _speed(value: str) -> float | None:
+    if value == "max":
+        return None
+    speed = float(value.removesuffix("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive")
+    return speed
+
+
+def _handler_spec(value: str) -> tuple[str | None, str]:
+    """``[TYPE=]MODULE:FUNC``; without a type the handler gets every event."""
+    event_type, _, target = value.rpartition("=")
+    return event_type or None, target
+
+
+async def _drive(
+    server: ReplayServer, handlers: list[tuple[str | None, str]], client: Client | None
+) -> int:
+    """Serve ``server``; with handlers, also consume it in-process and report throughput."""
+    from .gateway import Gateway
+    from .replay import EVENT_TYPES
+
+    async with server:
+        if not handlers:
+            print(f"serving on {server.ws_url} (Ctrl-C to stop)", file=sys.stderr)
+            await asyncio.Event().wait()
+
+        handled = 0
+
+        def count(_: int) -> None:
+            nonlocal handled
+            handled += 1
+
+        gateway = Gateway("replay", ws_url=server.ws_url, client=client, on_event_id=count)
+        for event_type, target in handlers:
+            handler = pkgutil.resolve_name(target)
+            for name in [event_type] if event_type else EVENT_TYPES:
+                gateway.register_handler(name, handler)
+        started = time.perf_counter()
+        task = asyncio.create_task(gateway.connect())
+        await server.finished.wait()
+        sent_in = time.perf_counter() - started
+        while (gateway.last_event_id or 0) < server.last_event_id and not task.done():
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        gateway.stop()
+        await task
+
+    print(f"sent {server.frames_sent} frames in {sent_in:.2f}s")
+    print(f"handled {handled} events in {elapsed:.2f}s: {handled / elapsed:,.0f} events/s")
+    for stats in gateway.handler_stats().values():
+        print(
+            f"  {stats.name}: {stats.calls} calls, {stats.errors} errors, "
+            f"{stats.timeouts} timeouts, mean {stats.mean_seconds * 1000:.2f}ms, "
+            f"max {stats.max_seconds * 1000:.2f}ms"
+        )
+    return 0
+
+
+def _run_server(server: ReplayServer, args: argparse.Namespace, client: Any = None) -> int:
+    try:
+        return asyncio.run(_drive(server, args.handler, client))
+    except KeyboardInterrupt:
+        return 0
+
+
+def _replay(args: argparse.Namespace) -> int:
+    from .replay import Replayer
+
+    replayer = Replayer(args.path, speed=args.speed)
+    print(
+        f"{len(replayer.frames)} frames, {len(replayer.exchanges)} REST exchanges",
+        file=sys.stderr,
+    )
+    client = None
+    if replayer.exchanges and args.handler:
+        from .client import Client
+
+        client = Client("replay", base_url="http://replay", transport=replayer.transport())
+    server = replayer.serve(host=args.host, port=args.port)
+    return _run_server(server, args, client)
+
+
+def _loadgen(args: argparse.Namespace) -> int:
+    from .replay import EVENT_TYPES, ReplayServer, synthesize, write_frames
+
+    def frames() -> Any:
+        types = args.types or EVENT_TYPES
+        return synthesize(args.rate, args.duration, types=types, seed=args.seed)
+
+    if args.output:
+        print(f"wrote {write_frames(args.output, frames())} frames to {args.output}")
+        return 0
+    server = ReplayServer(frames, speed=1.0, host=args.host, port=args.port)
+    return _run_server(server, args)
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def _export_line(report: ExportProgress) -> str:
+    return (
+        f"{report.resource}: {report.rows:,} rows, {_size(report.bytes)}, "
+        f"{report.rows_per_second:,.0f} rows/s, cursor {report.cursor}"
+    )
+
+
+def _export(args: argparse.Namespace) -> int:
+    from .client import Client
+    from .errors import StackCoinError
+    from .export import export
+
+    token = args.token or os.environ.get("STACKCOIN_BOT_TOKEN")
+    if not token:
+        print("no token: pass --token or set STACKCOIN_BOT_TOKEN", file=sys.stderr)
+        return 2
+    interactive = sys.stderr.isatty()
+    last_report = 0.0
+
+    def progress(report: ExportProgress) -> None:
+        nonlocal last_report
+        if interactive:
+            print(f"\r{_export_line(report)}\033[K", end="", file=sys.stderr, flush=True)
+        elif report.elapsed - last_report >= 5:
+            last_report = report.elapsed
+            print(_export_line(report), file=sys.stderr)
+
+    async def run() -> ExportProgress:
+        async with Client(token, base_url=args.base_url) as client:
+            return await export(
+                client,
+                args.resource,
+                args.output,
+                format=args.format,
+                cursor=args.cursor,
+                resume=args.resume,
+                page_size=args.page_size,
+                progress=progress,
+            )
+
+    try:
+        result = asyncio.run(run())
+    except (ValueError, RuntimeError) as exc:
+        print(f"\n{exc}" if interactive else exc, file=sys.stderr)
+        return 2
+    except StackCoinError as exc:
+        print(f"\n{exc}; continue with --resume", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("\ninterrupted; continue with --resume", file=sys.stderr)
+        return 130
+    if interactive:
+        print(file=sys.stderr)
+    print(
+        f"wrote {result.new_rows:,} rows ({result.rows:,} total) to {args.output}: "
+        f"{_size(result.bytes)} in {result.elapsed:.1f}s, {result.rows_per_second:,.0f} rows/s"
+    )
+    return 0
+
+
+def _add_serving(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--handler",
+        action="append",
+        type=_handler_spec,
+        default=[],
+        metavar="[TYPE=]MODULE:FUNC",
+        help="consume the stream in-process with this handler and report throughput "
+        "(repeatable); without one, serve the stream for an external bot",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="listen port (default: any free)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="stackcoin", description="StackCoin tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    deadletter = commands.add_parser("deadletter", help="inspect and replay failed events")
+    actions = deadletter.add_subparsers(dest="action", required=True)
+
+    list_ = actions.add_parser("list", help="show stored failures")
+    _add_filters(list_)
+    list_.add_argument("--limit", type=int)
+    list_.set_defaults(func=_deadletter_list)
+
+    replay = actions.add_parser("replay", help="re-run stored events through a handler")
+    _add_filters(replay)
+    replay.add_argument(
+        "--to",
+        required=True,
+        metavar="MODULE:FUNC",
+        help="async handler to replay through, e.g. mybot.handlers:on_transfer",
+    )
+    replay.add_argument("--limit", type=int)
+    replay.add_argument("--concurrency", type=int, default=8)
+    replay.add_argument("--timeout", type=float, help="seconds allowed per event")
+    replay.set_defaults(func=_deadletter_replay)
+
+    purge = actions.add_parser("purge", help="delete stored failures")
+    _add_filters(purge)
+    purge.set_defaults(func=_deadletter_purge)
+
+    replay_ = commands.add_parser("replay", help="serve a traffic recording back")
+    replay_.add_argument("path", help="file written by stackcoin.replay.Recorder")
+    replay_.add_argument(
+        "--speed",
+        type=_speed,
+        default=1.0,
+        help="1 for recorded timing, N (or Nx) for N times faster, max for no delays",
+    )
+    _add_serving(replay_)
+    replay_.set_defaults(func=_replay)
+
+    loadgen = commands.add_parser("loadgen", help="stream synthetic events at a fixed rate")
+    loadgen.add_argument("--rate", type=float, required=True, help="events per second")
+    loadgen.add_argument("--duration", type=float, default=10.0, help="seconds (default: 10)")
+    loadgen.add_argument(
+        "--type", dest="types", action="append", help="event type to emit (repeatable)"
+    )
+    loadgen.add_argument("--seed", type=int, default=0)
+    loadgen.add_argument(
+        "-o", "--output", help="write the stream to this recording file instead of serving it"
+    )
+    _add_serving(loadgen)
+    loadgen.set_defaults(func=_loadgen)
+
+    from .export import FORMATS, RESOURCES
+
+    export = commands.add_parser("export", help="dump events, transactions or requests to a file")
+    export.add_argument("resource", choices=RESOURCES)
+    export.add_argument("-o", "--output", required=True, help="output file")
+    export.add_argument(
+        "--format", choices=FORMATS, help="default: from the output extension, else ndjson"
+    )
+    export.add_argument(
+        "--cursor",
+        type=int,
+        help="event id to start after (events) or page to start at (transactions, requests)",
+    )
+    export.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the checkpoint saved next to the output (ndjson and csv)",
+    )
+    export.add_argument("--page-size", type=int, default=500, help="rows per request")
+    export.add_argument("--token", help="bot token (default: $STACKCOIN_BOT_TOKEN)")
+    export.add_argument(
+        "--base-url",
+        default=os.environ.get("STACKCOIN_BASE_URL", "https://stackcoin.world"),
+        help="API base URL (default: $STACKCOIN_BASE_URL or https://stackcoin.world)",
+    )
+    export.set_defaults(func=_export)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Durable SQLite dead-letter store for events that handlers failed to process."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+import traceback
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from ._endpoints import AnyEvent
+from .handlers import EventHandler
+from .models import Event
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    id INTEGER PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    handler TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    error_type TEXT NOT NULL,
+    error TEXT NOT NULL,
+    traceback TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    first_failed_at REAL NOT NULL,
+    last_failed_at REAL NOT NULL,
+    UNIQUE (event_id, handler)
+);
+CREATE INDEX IF NOT EXISTS dead_letters_handler ON dead_letters (handler, event_id);
+"""
+
+_COLUMNS = (
+    "id, event_id, handler, payload, error_type, error, traceback, attempts,"
+    " first_failed_at, last_failed_at"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DeadLetter:
+    """One stored failure: the event, which handler failed on it, and why."""
+
+    id: int
+    event: AnyEvent
+    handler: str
+    error_type: str
+    error: str
+    traceback: str | None
+    attempts: int
+    first_failed_at: float
+    last_failed_at: float
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of :meth:`DeadLetterStore.replay`."""
+
+    replayed: int = 0  # succeeded and removed from the store
+    failed: int = 0  # failed again; kept with an updated error and attempt count
+    errors: list[tuple[int, BaseException]] = field(default_factory=list)  # (event id, exc)
+
+
+class DeadLetterStore:
+    """Keeps failed events in a local SQLite database until they are replayed.
+
+    An instance is a ``dead_letter`` sink, so it plugs straight into an event
+    source::
+
+        dead_letters = stackcoin.DeadLetterStore("dead_letters.db")
+        gateway = stackcoin.Gateway(token="...", dead_letter=dead_letters)
+
+    Events are keyed by ``(event id, handler name)``: a repeat failure updates
+    the stored error and bumps ``attempts`` instead of adding a row. After a
+    fix is deployed, :meth:`replay` re-runs the stored events through a
+    handler (or use ``stackcoin deadletter replay`` from the shell).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: AnyEvent, handler: str, exc: BaseException) -> None:
+        self.add(event, handler, exc)
+
+    def __enter__(self) -> DeadLetterStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def add(self, event: AnyEvent, handler: str, exc: BaseException) -> None:
+        """Record that ``handler`` failed on ``event`` with ``exc``."""
+        tb = "".join(traceback.format_exception(exc)) if exc.__traceback__ else None
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO dead_letters (event_id, event_type, handler, payload, error_type,"
+                " error, traceback, first_failed_at, last_failed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (event_id, handler) DO UPDATE SET"
+                " error_type = excluded.error_type, error = excluded.error,"
+                " traceback = excluded.traceback, attempts = attempts + 1,"
+                " last_failed_at = excluded.last_failed_at",
+                (
+                    event.id,
+                    event.type,
+                    handler,
+                    event.model_dump_json(),
+                    type(exc).__name__,
+                    str(exc),
+                    tb,
+                    now,
+                    now,
+                ),
+            )
+
+    def count(self, *, handler: str | None = None) -> int:
+        """Number of stored failures, optionally only those of ``handler``."""
+        sql, args = self._where(handler, None)
+        with self._lock:
+            (n,) = self._db.execute(f"SELECT COUNT(*) FROM dead_letters{sql}", args).fetchone()
+        return n
+
+    def entries(
+        self,
+        *,
+        handler: str | None = None,
+        event_type: str | None = None,
+        limit: int | None = None,
+    ) -> list[DeadLetter]:
+        """Stored failures in event id order, optionally filtered."""
+        sql, args = self._where(handler, event_type)
+        sql = f"SELECT {_COLUMNS} FROM dead_letters{sql} ORDER BY event_id, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [
+            DeadLetter(
+                id=row[0],
+                event=Event.model_validate_json(row[3]).root,
+                handler=row[2],
+                error_type=row[4],
+                error=row[5],
+                traceback=row[6],
+                attempts=row[7],
+                first_failed_at=row[8],
+                last_failed_at=row[9],
+            )
+            for row in rows
+        ]
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Remove the entries with the given :attr:`DeadLetter.id` values."""
+        with self._lock:
+            cur = self._db.executemany("DELETE FROM dead_letters WHERE id = ?", [(i,) for i in ids])
+        return cur.rowcount
+
+    def purge(self, *, handler: str | None = None, event_type: str | None = None) -> int:
+        """Remove every entry, or only those matching the filters."""
+        sql, args = self._where(handler, event_type)
+        with self._lock:
+            cur = self._db.execute(f"DELETE FROM dead_letters{sql}", args)
+        return cur.rowcount
+
+    async def replay(
+        self,
+        handler: EventHandler,
+        *,
+        only_handler: str | None = None,
+        event_type: str | None = None,
+        limit: int | None = None,
+        concurrency: int = 8,
+        timeout: float | None = None,
+    ) -> ReplayResult:
+        """Re-run stored events through ``handler``, up to ``concurrency`` at a time.
+
+        ``only_handler`` selects the entries recorded for one handler name
+        (as in :meth:`Gateway.handler_stats`). Entries
+        that succeed are deleted; entries that fail again stay in the store
+        with their error and attempt count updated. Each call gets at most
+        ``timeout`` seconds.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        letters = self.entries(handler=only_handler, event_type=event_type, limit=limit)
+        semaphore = asyncio.Semaphore(concurrency)
+        result = ReplayResult()
+        done: list[int] = []
+
+        async def run(letter: DeadLetter) -> None:
+            async with semaphore:
+                try:
+                    async with asyncio.timeout(timeout):
+                        await handler(letter.event)
+                except Exception as exc:
+                    result.failed += 1
+                    result.errors.append((letter.event.id, exc))
+                    self.add(letter.event, letter.handler, exc)
+                else:
+                    result.replayed += 1
+                    done.append(letter.id)
+
+        await asyncio.gather(*(run(letter) for letter in letters))
+        self.delete(done)
+        return result
+
+    @staticmethod
+    def _where(handler: str | None, event_type: str | None) -> tuple[str, list[object]]:
+        clauses, args = [], []
+        if handler is not None:
+            clauses.append("handler = ?")
+            args.append(handler)
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            args.append(event_type)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
@@ -32,3 +32,16 @@ class TooManyMissedEventsError(StackCoinError):
         super().__init__(status_code=0, error="too_many_missed_events", message=message)
         self.missed_count = missed_count
         self.replay_limit = replay_limit
+
+
+class InsufficientFundsError(StackCoinError):
+    """Raised by :class:`TransferScheduler` when a send would overdraw the local balance.
+
+    No request reaches the server. ``available`` is the balance not yet
+    reserved by other in-flight sends at the time of rejection.
+    """
+
+    def __init__(self, amount: int, available: int, message: str):
+        super().__init__(status_code=0, error="insufficient_funds", message=message)
+        self.amount = amount
+        self.available = available
@@ -0,0 +1,366 @@
+"""Stream events, transactions or requests from the REST API to a file.
+
+:func:`export` walks one endpoint page by page and appends each page to an
+NDJSON, CSV or Parquet file as it arrives, so memory stays bounded by one
+page (one row group for Parquet) however long the history is. After every
+page it saves a checkpoint next to the output (``<path>.cursor``);
+``resume=True`` truncates the output to the last checkpoint and carries on
+from its cursor. Parquet needs the optional ``pyarrow`` package
+(``pip install stackcoin[parquet]``).
+
+``stackcoin export`` wraps this for the shell.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from .client import Client
+
+type Resource = Literal["events", "transactions", "requests"]
+type Format = Literal["ndjson", "csv", "parquet"]
+
+RESOURCES: tuple[Resource, ...] = ("events", "transactions", "requests")
+FORMATS: tuple[Format, ...] = ("ndjson", "csv", "parquet")
+
+# Flat column layout for CSV and Parquet; NDJSON keeps the API's own shape.
+COLUMNS: dict[Resource, tuple[str, ...]] = {
+    "events": ("id", "type", "inserted_at", "data"),
+    "transactions": (
+        "id",
+        "time",
+        "amount",
+        "from_id",
+        "from_username",
+        "to_id",
+        "to_username",
+        "label",
+    ),
+    "requests": (
+        "id",
+        "requested_at",
+        "resolved_at",
+        "status",
+        "amount",
+        "label",
+        "requester_id",
+        "requester_username",
+        "responder_id",
+        "responder_username",
+        "transaction_id",
+    ),
+}
+
+_CHECKPOINT_VERSION = 2
+# Rows buffered per Parquet row group.
+_ROW_GROUP = 50_000
+
+
+@dataclass(frozen=True, slots=True)
+class ExportProgress:
+    """Counters reported after each page and returned by :func:`export`."""
+
+    resource: Resource
+    rows: int  # rows in the output, including those from resumed runs
+    new_rows: int  # rows written by this run
+    bytes: int  # size of the output so far
+    elapsed: float  # seconds in this run
+    cursor: int  # last event id, or next page number
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.new_rows / self.elapsed if self.elapsed else 0.0
+
+
+def format_for(path: str) -> Format:
+    """Guess the output format from ``path``'s extension, defaulting to NDJSON."""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".parquet", ".pq")):
+        return "parquet"
+    return "ndjson"
+
+
+def _row(resource: Resource, item: Any) -> tuple[Any, ...]:
+    if resource == "events":
+        return (item.id, item.type, item.inserted_at, item.data.model_dump_json())
+    if resource == "transactions":
+        return (
+            item.id,
+            item.time,
+            item.amount,
+            item.from_.id,
+            item.from_.username,
+            item.to.id,
+            item.to.username,
+            item.label,
+        )
+    return (
+        item.id,
+        item.requested_at,
+        item.resolved_at,
+        item.status,
+        item.amount,
+        item.label,
+        item.requester.id,
+        item.requester.username,
+        item.responder.id,
+        item.responder.username,
+        item.transaction_id,
+    )
+
+
+class _Writer(ABC):
+    """Appends pages to the output; ``tell()`` is its size once flushed."""
+
+    resumable = True
+
+    def __init__(self, path: str, resource: Resource, offset: int | None) -> None:
+        self.resource = resource
+        if offset is None:
+            self._file: IO[Any] = open(path, "w", encoding="utf-8", newline="")
+        else:
+            self._file = open(path, "r+", encoding="utf-8", newline="")
+            self._file.truncate(offset)  # drop anything written after the checkpoint
+            self._file.seek(offset)
+
+    @abstractmethod
+    def write(self, items: list[BaseModel]) -> None: ...
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _NdjsonWriter(_Writer):
+    def write(self, items: list[BaseModel]) -> None:
+        self._file.writelines(item.model_dump_json(by_alias=True) + "\n" for item in items)
+
+
+class _CsvWriter(_Writer):
+    def __init__(self, path: str, resource: Resource, offset: int | None) -> None:
+        super().__init__(path, resource, offset)
+        self._csv = csv.writer(self._file)
+        if offset is None:
+            self._csv.writerow(COLUMNS[resource])
+
+    def write(self, items: list[BaseModel]) -> None:
+        self._csv.writerows(
+            [
+                [value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+                for row in (_row(self.resource, item) for item in items)
+            ]
+        )
+
+
+class _ParquetWriter(_Writer):
+    resumable = False  # a Parquet file is unreadable until its footer is written
+
+    def __init__(self, path: str, resource: Resource, offset: int | None) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Parquet output needs pyarrow: pip install stackcoin[parquet]"
+            ) from None
+        self.resource = resource
+        self._pa = pa
+        timestamp = pa.timestamp("us", tz="UTC")
+        types = {
+            "id": pa.int64(),
+            "type": pa.string(),
+            "inserted_at": timestamp,
+            "data": pa.string(),
+            "time": timestamp,
+            "requested_at": timestamp,
+            "resolved_at": timestamp,
+            "status": pa.string(),
+            "label": pa.string(),
+        }
+        self._schema = pa.schema(
+            [
+                (name, types.get(name, pa.string() if name.endswith("username") else pa.int64()))
+                for name in COLUMNS[resource]
+            ]
+        )
+        self._file = open(path, "wb")
+        self._writer = pq.ParquetWriter(self._file, self._schema)
+        self._pending: list[tuple[Any, ...]] = []
+
+    def write(self, items: list[BaseModel]) -> None:
+        self._pending.extend(_row(self.resource, item) for item in items)
+        if len(self._pending) >= _ROW_GROUP:
+            self._write_group()
+
+    def _write_group(self) -> None:
+        if not self._pending:
+            return
+        columns = list(zip(*self._pending, strict=True))
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+        self._pending.clear()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._write_group()
+        self._writer.close()
+        self._file.close()
+
+
+_WRITERS: dict[Format, type[_Writer]] = {
+    "ndjson": _NdjsonWriter,
+    "csv": _CsvWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+async def _pages(
+    client: Client, resource: Resource, position: dict[str, Any], page_size: int
+) -> AsyncIterator[tuple[list[Any], dict[str, Any]]]:
+    """Yield ``(new items, position)`` per page, where the position resumes after it.
+
+    Events resume after the last id. Transactions and requests are paged by
+    number, newest first, so every row added while an export runs (or
+    between a run and its resume) pushes older rows onto later pages. Rows
+    are therefore kept only while their ids keep moving past the last one
+    written: a shifted row read a second time is skipped, and none is missed.
+    The direction is taken from the first page of two or more rows, so an
+    oldest-first listing is exported correctly too. Paging ends at the first
+    empty page: the server may cap ``limit``, so a short page proves nothing.
+    """
+    from . import _endpoints as api
+
+    cursor = position["cursor"]
+    if resource == "events":
+        while True:
+            page = await client._call(api.events_page(cursor, limit=page_size))
+            if page.events:
+                cursor = page.events[-1].id
+            yield page.events, {"cursor": cursor}
+            if not page.has_more or not page.events:
+                return
+    fetch = client.get_transactions if resource == "transactions" else client.get_requests
+    last_id, descending = position["last_id"], position["descending"]
+    while True:
+        items = await fetch(page=cursor, limit=page_size)
+        if descending is None and len(items) >= 2:
+            descending = items[0].id > items[-1].id
+        if last_id is None:
+            new = items
+        elif descending is False:
+            new = [item for item in items if item.id > last_id]
+        else:
+            new = [item for item in items if item.id < last_id]
+        if new:
+            last_id = new[-1].id
+        if items:
+            cursor += 1
+        yield new, {"cursor": cursor, "last_id": last_id, "descending": descending}
+        if not items:
+            return
+
+
+def _save_checkpoint(path: str, state: dict[str, Any]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+async def export(
+    client: Client,
+    resource: Resource,
+    path: str,
+    *,
+    format: Format | None = None,
+    cursor: int | None = None,
+    resume: bool = False,
+    page_size: int = 500,
+    progress: Callable[[ExportProgress], None] | None = None,
+) -> ExportProgress:
+    """Write every ``resource`` item after ``cursor`` to ``path``, one page at a time.
+
+    ``cursor`` is the event id to start after for events, or the page number
+    to start at for transactions and requests (default: the beginning).
+    With ``resume=True`` a checkpoint left by an earlier run to the same path
+    takes precedence: the output is truncated to it and appended to, which
+    also makes a finished event export incremental. ``progress`` is called
+    after each page is written.
+    """
+    if resource not in RESOURCES:
+        raise ValueError(f"unknown resource {resource!r}")
+    fmt = format or format_for(path)
+    checkpoint_path = f"{path}.cursor"
+    writer_class = _WRITERS[fmt]
+    state = {
+        "version": _CHECKPOINT_VERSION,
+        "resource": resource,
+        "format": fmt,
+        "cursor": cursor if cursor is not None else (0 if resource == "events" else 1),
+        "last_id": None,
+        "descending": None,
+        "rows": 0,
+        "bytes": None,
+    }
+    if resume:
+        if not writer_class.resumable:
+            raise ValueError(f"{fmt} output cannot be resumed; start a new file with a cursor")
+        try:
+            with open(checkpoint_path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = None
+        if saved is not None:
+            if (saved.get("version"), saved.get("resource"), saved.get("format")) != (
+                _CHECKPOINT_VERSION,
+                resource,
+                fmt,
+            ):
+                raise ValueError(f"{checkpoint_path} is for a different export")
+            state = saved
+
+    writer = writer_class(path, resource, state["bytes"])
+    started = time.perf_counter()
+    new_rows = 0
+    report = ExportProgress(resource, state["rows"], 0, writer.tell(), 0.0, state["cursor"])
+    try:
+        async for items, position in _pages(client, resource, state, page_size):
+            writer.write(items)
+            writer.flush()
+            new_rows += len(items)
+            state.update(position, rows=state["rows"] + len(items), bytes=writer.tell())
+            if writer.resumable:
+                _save_checkpoint(checkpoint_path, state)
+            report = ExportProgress(
+                resource,
+                state["rows"],
+                new_rows,
+                writer.tell(),
+                time.perf_counter() - started,
+                state["cursor"],
+            )
+            if progress is not None:
+                progress(report)
+    finally:
+        writer.close()
+    size = os.path.getsize(path)
+    return ExportProgress(
+        resource, report.rows, new_rows, size, time.perf_counter() - started, report.cursor
+    )
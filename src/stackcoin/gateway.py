@@ -5,23 +5,49 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from collections.abc import Awaitable, Callable
-from typing import Any, TypeVar
-
-from .client import AnyEvent, Client
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from ._dispatch import EventDispatcher, EventHandler
+from ._endpoints import AnyEvent
+from ._reorder import ReorderBuffer, ReorderStats
+from .handlers import DeadLetterSink, HandlerPolicy
 from .models import Event
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .client import Client
+    from .profiling import Profiler
+    from .replay import Recorder
+
+__all__ = ["EventHandler", "Gateway"]
+
 logger = logging.getLogger(__name__)
 
-# Internal handler type — accepts the full union at runtime.
-EventHandler = Callable[[AnyEvent], Awaitable[None]]
+# Frames read off the socket but not yet decoded, per pending decode batch.
+_QUEUED_BATCHES = 4
+# Decode batches submitted to the executor ahead of the one being dispatched.
+_BATCHES_IN_FLIGHT = 2
 
-# TypeVar for the @gateway.on() decorator so it preserves the caller's
-# narrowed signature (e.g. async def f(event: RequestAcceptedEvent)).
-_F = TypeVar("_F", bound=Callable[..., Awaitable[None]])
 
+def _decode_events(frames: list[str | bytes]) -> list[AnyEvent]:
+    """Parse and validate raw frames, keeping only ``event`` messages.
 
-class Gateway:
+    Runs in the gateway's ``decode_executor``; module-level so process pools
+    can pickle it.
+    """
+    events: list[AnyEvent] = []
+    for raw in frames:
+        msg = json.loads(raw)
+        if len(msg) >= 5 and msg[3] == "event":
+            events.append(Event.model_validate(msg[4]).root)
+    return events
+
+
+class Gateway(EventDispatcher):
     """WebSocket gateway for receiving real-time StackCoin events.
 
     Usage::
@@ -39,8 +65,42 @@ class Gateway:
     were missed and a ``client`` is provided, the gateway automatically catches
     up via the REST API before reconnecting. Without a ``client``, a
     ``TooManyMissedEventsError`` is raised.
+
+    With a ``client`` and ``fallback_after=N``, the gateway switches to REST
+    polling (see :class:`PollingEventSource`) after ``N`` consecutive failed
+    connection attempts, for example behind proxies that drop WebSockets. It
+    probes the WebSocket again every ``probe_interval`` seconds and goes back
+    to it as soon as a join succeeds. Handlers and the cursor are shared, so
+    the switch is invisible to them.
+
+    Set ``reorder_wait`` (seconds) to guarantee handlers see events in strictly
+    increasing id order: frames arriving ahead of the next expected id are held
+    for up to that long, then any gap is backfilled via ``client.get_events``
+    before the held events are released. Gap and backfill counters are exposed
+    as :attr:`reorder_stats`. When a bot's event ids are sparse, every gap costs
+    one wait (and one REST call with a ``client``), so keep the wait short.
+
+    A :class:`~stackcoin.replay.Recorder` passed as ``recorder`` captures every
+    received frame for later replay.
+
+    Pass a :class:`concurrent.futures.Executor` as ``decode_executor`` to keep
+    bursts, such as the replay after a join, from starving heartbeats and
+    other tasks on the loop. Frames are then read by a separate task, and
+    once ``decode_threshold`` of them are waiting they are decoded in
+    batches of up to ``decode_batch`` in the executor. Events are still
+    dispatched in arrival order, and below the threshold frames are decoded
+    inline as usual. A thread pool keeps the loop responsive; a process pool
+    also decodes in parallel, at the cost of pickling events back.
+
+    With a :class:`~stackcoin.profiling.Profiler` as ``profiler``, the time
+    spent decoding, validating and dispatching each frame (per handler, and
+    in ``on_event_id``) is recorded under ``gateway;...`` stages, but not the
+    wait for the frame to arrive. Decode and validate are timed on the
+    inline path only.
     """
 
+    _profile_root = "gateway"
+
     def __init__(
         self,
         token: str,
@@ -49,35 +109,64 @@ class Gateway:
         client: Client | None = None,
         last_event_id: int | None = None,
         on_event_id: Callable[[int], None] | None = None,
+        dedup_window: int | None = 65_536,
+        dedup_path: str | None = None,
+        handler_policy: HandlerPolicy | None = None,
+        dead_letter: DeadLetterSink | None = None,
+        fallback_after: int | None = None,
+        probe_interval: float = 60.0,
+        poll_min_interval: float = 1.0,
+        poll_max_interval: float = 30.0,
+        reorder_wait: float | None = None,
+        recorder: Recorder | None = None,
+        decode_executor: Executor | None = None,
+        decode_threshold: int = 64,
+        decode_batch: int = 256,
+        profiler: Profiler | None = None,
     ):
+        super().__init__(
+            last_event_id=last_event_id,
+            on_event_id=on_event_id,
+            dedup_window=dedup_window,
+            dedup_path=dedup_path,
+            handler_policy=handler_policy,
+            dead_letter=dead_letter,
+            profiler=profiler,
+        )
         self._ws_url = ws_url.rstrip("/")
         self._token = token
         self._client = client
-        self._handlers: dict[str, list[EventHandler]] = {}
-        self._last_event_id = last_event_id
-        self._on_event_id = on_event_id  # callback to persist cursor position
+        self._recorder = recorder
+        if decode_threshold < 1 or decode_batch < 1:
+            raise ValueError("decode_threshold and decode_batch must be at least 1")
+        self._decode_executor = decode_executor
+        self._decode_threshold = decode_threshold
+        self._decode_batch = decode_batch
         self._ws = None
-        self._running = False
         self._ref_counter = 0
+        self._fallback_after = fallback_after
+        self._probe_interval = probe_interval
+        self._poll_intervals = (poll_min_interval, poll_max_interval)
+        self._failures = 0  # consecutive failed connection attempts
+        self._transport = "websocket"
+        self._reorder: ReorderBuffer | None = None
+        if reorder_wait is not None:
+            self._reorder = ReorderBuffer(
+                self._dispatch_event,
+                wait=reorder_wait,
+                backfill=self._backfill if client is not None else None,
+                last_id=last_event_id,
+            )
 
     @property
-    def last_event_id(self) -> int | None:
-        return self._last_event_id
-
-    def on(self, event_type: str) -> Callable[[_F], _F]:
-        """Decorator to register an event handler."""
+    def transport(self) -> str:
+        """The transport currently delivering events: ``"websocket"`` or ``"polling"``."""
+        return self._transport
 
-        def decorator(func: _F) -> _F:
-            self.register_handler(event_type, func)  # type: ignore[arg-type]
-            return func
-
-        return decorator
-
-    def register_handler(self, event_type: str, handler: EventHandler) -> None:
-        """Register an event handler programmatically."""
-        if event_type not in self._handlers:
-            self._handlers[event_type] = []
-        self._handlers[event_type].append(handler)
+    @property
+    def reorder_stats(self) -> ReorderStats | None:
+        """Gap detection and backfill counters, when ``reorder_wait`` is set."""
+        return self._reorder.stats if self._reorder is not None else None
 
     async def connect(self) -> None:
         """Connect and listen for events. Reconnects automatically on failure.
@@ -92,7 +181,7 @@ class Gateway:
 
         from .errors import TooManyMissedEventsError
 
-        self._running = True
+        self._start()
 
         while self._running:
             try:
@@ -101,12 +190,20 @@ class Gateway:
                 async with websockets.connect(url) as ws:
                     self._ws = ws
                     await self._join_channel(ws)
+                    self._failures = 0
 
                     heartbeat_task = asyncio.create_task(self._heartbeat(ws))
                     try:
-                        async for raw_msg in ws:
-                            msg = json.loads(raw_msg)
-                            await self._handle_message(msg)
+                        if self._decode_executor is not None:
+                            await self._receive_offloaded(ws, self._decode_executor)
+                        elif self._profiler is not None:
+                            await self._receive_profiled(ws, self._profiler)
+                        else:
+                            async for raw_msg in ws:
+                                if self._recorder is not None:
+                                    self._recorder.frame(raw_msg)
+                                msg = json.loads(raw_msg)
+                                await self._handle_message(msg)
                     finally:
                         heartbeat_task.cancel()
 
@@ -121,10 +218,126 @@ class Gateway:
                 asyncio.TimeoutError,
                 websockets.exceptions.WebSocketException,
             ) as exc:
-                if self._running:
+                if not self._running:
+                    break
+                self._failures += 1
+                if self._should_fall_back():
+                    logger.warning(
+                        "Gateway connection failed %d times (%s). Polling REST for %ss...",
+                        self._failures,
+                        exc,
+                        self._probe_interval,
+                    )
+                    await self._poll_for(self._probe_interval)
+                else:
                     logger.warning("Gateway connection lost: %s. Reconnecting in 5s...", exc)
                     await asyncio.sleep(5)
 
+        if self._reorder is not None:
+            await self._reorder.flush()
+
+    async def _receive_profiled(self, ws: Any, profiler: Profiler) -> None:
+        """The inline receive loop, timing each stage of sampled frames.
+
+        Timing starts once a frame has arrived: waiting on an idle socket is
+        not work, and would otherwise dwarf every other stage.
+        """
+        async for raw_msg in ws:
+            if self._recorder is not None:
+                self._recorder.frame(raw_msg)
+            received = time.perf_counter_ns()
+            msg = json.loads(raw_msg)
+            decoded = time.perf_counter_ns()
+            if len(msg) < 5 or msg[3] != "event":
+                continue
+            typed_event = Event.model_validate(msg[4]).root
+            if profiler.sampled():
+                profiler.add(("gateway", "decode"), decoded - received)
+                profiler.add(("gateway", "validate"), time.perf_counter_ns() - decoded)
+            await self._ingest(typed_event)
+
+    async def _receive_offloaded(self, ws: Any, executor: Executor) -> None:
+        """Receive loop that moves decoding of frame backlogs off the event loop."""
+        loop = asyncio.get_running_loop()
+        frames: asyncio.Queue[str | bytes | None] = asyncio.Queue(
+            self._decode_batch * _QUEUED_BATCHES
+        )
+
+        async def read() -> Exception | None:
+            error = None
+            try:
+                async for raw_msg in ws:
+                    if self._recorder is not None:
+                        self._recorder.frame(raw_msg)
+                    await frames.put(raw_msg)
+            except Exception as exc:  # raised once the frames before it are handled
+                error = exc
+            await frames.put(None)
+            return error
+
+        reader = asyncio.create_task(read())
+        batches: deque[asyncio.Future[list[AnyEvent]]] = deque()
+        closed = False
+        try:
+            while not closed or batches:
+                backlog = frames.qsize()
+                if not batches and backlog < self._decode_threshold and not closed:
+                    raw_msg = await frames.get()
+                    if raw_msg is None:
+                        closed = True
+                    else:
+                        await self._handle_message(json.loads(raw_msg))
+                    continue
+                while not closed and len(batches) < _BATCHES_IN_FLIGHT and frames.qsize():
+                    batch: list[str | bytes] = []
+                    while len(batch) < self._decode_batch and frames.qsize():
+                        raw_msg = frames.get_nowait()
+                        if raw_msg is None:
+                            closed = True
+                            break
+                        batch.append(raw_msg)
+                    if batch:
+                        batches.append(loop.run_in_executor(executor, _decode_events, batch))
+                if batches:
+                    for event in await batches.popleft():
+                        await self._ingest(event)
+                    # Awaiting a finished batch does not suspend, so yield to the
+                    # reader, heartbeats and other tasks between batches.
+                    await asyncio.sleep(0)
+        finally:
+            reader.cancel()
+            for pending in batches:
+                pending.cancel()
+        error = await reader
+        if error is not None:
+            raise error
+
+    def _should_fall_back(self) -> bool:
+        return (
+            self._client is not None
+            and self._fallback_after is not None
+            and self._failures >= self._fallback_after
+        )
+
+    async def _poll_for(self, duration: float) -> None:
+        """Deliver events via REST polling for ``duration`` seconds."""
+        from .polling import _Poller
+
+        assert self._client is not None
+        min_interval, max_interval = self._poll_intervals
+        poller = _Poller(
+            self,
+            self._client,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            backoff=2.0,
+        )
+        self._transport = "polling"
+        try:
+            await poller.run(self._stopped, duration=duration)
+        finally:
+            self._transport = "websocket"
+
     async def _catch_up_via_rest(self) -> None:
         """Paginate through missed events via the REST API.
 
@@ -135,28 +348,24 @@ class Gateway:
             raise RuntimeError("Cannot catch up via REST without a client")
         # _last_event_id is always an int here — TooManyMissedEventsError only
         # fires when a last_event_id was sent in the join payload.
-        events = await self._client.get_events(since_id=self._last_event_id or 0)
+        since_id = self._last_event_id or 0
+        events = await self._client.get_events(since_id=since_id)
+        if self._reorder is not None:
+            await self._reorder.push_complete(events, since_id)
+            return
         for event in events:
             await self._dispatch_event(event)
 
-    async def _dispatch_event(self, typed_event: AnyEvent) -> None:
-        """Dispatch a typed event to registered handlers and update the cursor."""
-        if self._last_event_id is None or typed_event.id > self._last_event_id:
-            self._last_event_id = typed_event.id
-
-        for handler in self._handlers.get(typed_event.type, []):
-            try:
-                await handler(typed_event)
-            except Exception:
-                logger.exception(
-                    "Error in %s handler for event %s", typed_event.type, typed_event.id
-                )
+    async def _backfill(self, since_id: int) -> list[AnyEvent]:
+        assert self._client is not None
+        return await self._client.get_events(since_id=since_id)
 
-        if typed_event.id > 0 and self._on_event_id:
-            try:
-                self._on_event_id(typed_event.id)
-            except Exception:
-                logger.exception("Error in on_event_id callback for event %s", typed_event.id)
+    async def _ingest(self, typed_event: AnyEvent) -> None:
+        """Route a live event through the reorder stage, if enabled, to dispatch."""
+        if self._reorder is None:
+            await self._dispatch_event(typed_event)
+        else:
+            await self._reorder.push(typed_event)
 
     async def _join_channel(self, ws: Any) -> None:
         """Join the user:self channel with event replay."""
@@ -211,10 +420,10 @@ class Gateway:
         if event_name == "event":
             # Parse via discriminated union RootModel, then unwrap
             typed_event = Event.model_validate(payload).root
-            await self._dispatch_event(typed_event)
+            await self._ingest(typed_event)
 
     def stop(self) -> None:
         """Signal the gateway to stop and close the WebSocket connection."""
-        self._running = False
+        super().stop()
         if self._ws is not None:
             asyncio.ensure_future(self._ws.close())
@@ -0,0 +1,184 @@
+"""Per-handler isolation for event dispatch: timeouts, circuit breaking and stats."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Literal
+
+from ._endpoints import AnyEvent
+
+logger = logging.getLogger("stackcoin.gateway")
+
+# Internal handler type — accepts the full union at runtime.
+EventHandler = Callable[[AnyEvent], Awaitable[None]]
+
+# Receives events a handler failed on, timed out on, or skipped while its
+# circuit was open, along with the handler's name and the exception.
+DeadLetterSink = Callable[[AnyEvent, str, BaseException], Awaitable[None] | None]
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class HandlerTimeoutError(TimeoutError):
+    """A handler exceeded its :attr:`HandlerPolicy.timeout`."""
+
+
+class CircuitOpenError(RuntimeError):
+    """An event was not delivered because the handler's circuit is open."""
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerPolicy:
+    """How a handler is isolated from the rest of the dispatch pipeline.
+
+    Attributes:
+        timeout: Seconds a single invocation may run before it is cancelled,
+            or ``None`` for no limit. Events are dispatched one after
+            another, so this also bounds how long one handler can hold up
+            the next event for every other handler.
+        failure_threshold: Consecutive failures (errors or timeouts) that open
+            the handler's circuit, or ``None`` to never open it.
+        reset_after: Seconds an open circuit stays open before one trial
+            event is let through (half-open); success closes it again.
+    """
+
+    timeout: float | None = 30.0
+    failure_threshold: int | None = 5
+    reset_after: float = 30.0
+
+
+@dataclass
+class HandlerStats:
+    """Latency and error counters for one registered handler."""
+
+    name: str
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    skipped: int = 0  # events diverted while the circuit was open
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    state: CircuitState = "closed"
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+def handler_name(event_type: str, handler: Callable[..., object]) -> str:
+    return f"{event_type}:{getattr(handler, '__qualname__', repr(handler))}"
+
+
+class HandlerRunner:
+    """Wraps one handler with its :class:`HandlerPolicy`; never raises.
+
+    Only the first failure of a streak is logged with a traceback; repeats are
+    one-line warnings, so a persistently broken handler cannot flood the logs.
+    """
+
+    def __init__(
+        self,
+        event_type: str,
+        handler: EventHandler,
+        policy: HandlerPolicy,
+        dead_letter: DeadLetterSink | None,
+    ) -> None:
+        self.handler = handler
+        self.policy = policy
+        self.stats = HandlerStats(handler_name(event_type, handler))
+        self._dead_letter = dead_letter
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+
+    async def __call__(self, event: AnyEvent) -> None:
+        if self.stats.state == "open":
+            if time.monotonic() - self._opened_at < self.policy.reset_after:
+                self.stats.skipped += 1
+                await self._divert(event, CircuitOpenError(f"circuit open for {self.stats.name}"))
+                return
+            self.stats.state = "half_open"
+
+        start = time.perf_counter()
+        deadline = asyncio.timeout(self.policy.timeout)
+        try:
+            async with deadline:
+                await self.handler(event)
+        except TimeoutError as e:
+            exc: BaseException = e
+            if deadline.expired():
+                self.stats.timeouts += 1
+                exc = HandlerTimeoutError(
+                    f"{self.stats.name} exceeded {self.policy.timeout}s on event {event.id}"
+                )
+            else:  # raised by the handler's own code, e.g. an inner wait_for
+                self.stats.errors += 1
+            self._record(time.perf_counter() - start)
+            await self._failed(event, exc)
+        except Exception as e:
+            self.stats.errors += 1
+            self._record(time.perf_counter() - start)
+            await self._failed(event, e)
+        else:
+            self._record(time.perf_counter() - start)
+            self._consecutive_failures = 0
+            if self.stats.state == "half_open":
+                logger.info("Handler %s recovered; circuit closed", self.stats.name)
+            self.stats.state = "closed"
+
+    def _record(self, elapsed: float) -> None:
+        self.stats.calls += 1
+        self.stats.total_seconds += elapsed
+        if elapsed > self.stats.max_seconds:
+            self.stats.max_seconds = elapsed
+
+    async def _failed(self, event: AnyEvent, exc: BaseException) -> None:
+        self._consecutive_failures += 1
+        if self._consecutive_failures == 1:
+            logger.error(
+                "Error in %s handler for event %s",
+                self.stats.name,
+                event.id,
+                exc_info=exc,
+            )
+        else:
+            logger.warning(
+                "Handler %s failed again on event %s (%d in a row): %r",
+                self.stats.name,
+                event.id,
+                self._consecutive_failures,
+                exc,
+            )
+
+        threshold = self.policy.failure_threshold
+        if self.stats.state == "half_open" or (
+            threshold is not None and self._consecutive_failures >= threshold
+        ):
+            if self.stats.state == "half_open":
+                logger.warning(
+                    "Handler %s failed its trial event; circuit reopened", self.stats.name
+                )
+            elif self.stats.state != "open":
+                logger.warning(
+                    "Opening circuit for handler %s for %ss after %d consecutive failures",
+                    self.stats.name,
+                    self.policy.reset_after,
+                    self._consecutive_failures,
+                )
+            self.stats.state = "open"
+            self._opened_at = time.monotonic()
+        await self._divert(event, exc)
+
+    async def _divert(self, event: AnyEvent, exc: BaseException) -> None:
+        if self._dead_letter is None:
+            return
+        try:
+            result = self._dead_letter(event, self.stats.name, exc)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("Dead-letter sink failed for event %s", event.id)
@@ -0,0 +1,564 @@
+"""Local, indexed SQLite copy of transaction and request history.
+
+:class:`HistoryStore` mirrors what :meth:`Client.get_transactions` and
+:meth:`Client.get_requests` return into a local database and keeps it current
+from gateway events, so questions such as "every transfer between users A and
+B labelled ``rent`` last month" are answered from secondary indexes instead of
+by downloading and filtering the full history.
+
+Queries return iterators that read the database in keyset-paginated chunks:
+the first results arrive after one index seek, memory stays flat however many
+rows match, and no lock is held between chunks, so event handlers can keep
+writing while a long query is consumed.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from .models import Request, Transaction
+
+if TYPE_CHECKING:
+    from ._dispatch import EventDispatcher
+    from .client import Client
+    from .models import (
+        RequestAcceptedEvent,
+        RequestCreatedEvent,
+        RequestDeniedEvent,
+        TransferCompletedEvent,
+    )
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    from_id INTEGER,
+    from_username TEXT,
+    to_id INTEGER,
+    to_username TEXT,
+    amount INTEGER NOT NULL,
+    label TEXT,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_pair ON transactions (from_id, to_id, time);
+CREATE INDEX IF NOT EXISTS transactions_from ON transactions (from_id, time);
+CREATE INDEX IF NOT EXISTS transactions_to ON transactions (to_id, time);
+CREATE INDEX IF NOT EXISTS transactions_time ON transactions (time);
+CREATE INDEX IF NOT EXISTS transactions_label ON transactions (label, time);
+
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    requester_id INTEGER,
+    requester_username TEXT,
+    responder_id INTEGER,
+    responder_username TEXT,
+    amount INTEGER NOT NULL,
+    label TEXT,
+    status TEXT NOT NULL,
+    requested_at REAL NOT NULL,
+    resolved_at REAL,
+    transaction_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS requests_pair ON requests (requester_id, responder_id, requested_at);
+CREATE INDEX IF NOT EXISTS requests_requester ON requests (requester_id, requested_at);
+CREATE INDEX IF NOT EXISTS requests_responder ON requests (responder_id, requested_at);
+CREATE INDEX IF NOT EXISTS requests_time ON requests (requested_at);
+CREATE INDEX IF NOT EXISTS requests_label ON requests (label, requested_at);
+CREATE INDEX IF NOT EXISTS requests_status ON requests (status, requested_at);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+"""
+
+_TRANSACTION_COLUMNS = "id, from_id, from_username, to_id, to_username, amount, label, time"
+_REQUEST_COLUMNS = (
+    "id, requester_id, requester_username, responder_id, responder_username, amount, label,"
+    " status, requested_at, resolved_at, transaction_id"
+)
+
+# Upserts only count as a change when a column actually differs, so an
+# incremental sync can stop at the first page it already has.
+_UPSERT_TRANSACTION = (
+    f"INSERT INTO transactions ({_TRANSACTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (id) DO UPDATE SET from_id = excluded.from_id,"
+    " from_username = excluded.from_username, to_id = excluded.to_id,"
+    " to_username = excluded.to_username, amount = excluded.amount, label = excluded.label,"
+    " time = excluded.time"
+    " WHERE (from_id, from_username, to_id, to_username, amount, label, time)"
+    " IS NOT (excluded.from_id, excluded.from_username, excluded.to_id, excluded.to_username,"
+    " excluded.amount, excluded.label, excluded.time)"
+)
+_UPSERT_REQUEST = (
+    f"INSERT INTO requests ({_REQUEST_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (id) DO UPDATE SET requester_id = excluded.requester_id,"
+    " requester_username = excluded.requester_username, responder_id = excluded.responder_id,"
+    " responder_username = excluded.responder_username, amount = excluded.amount,"
+    " label = excluded.label, status = excluded.status, requested_at = excluded.requested_at,"
+    " resolved_at = excluded.resolved_at, transaction_id = excluded.transaction_id"
+    " WHERE (requester_id, requester_username, responder_id, responder_username, amount, label,"
+    " status, requested_at, resolved_at, transaction_id)"
+    " IS NOT (excluded.requester_id, excluded.requester_username, excluded.responder_id,"
+    " excluded.responder_username, excluded.amount, excluded.label, excluded.status,"
+    " excluded.requested_at, excluded.resolved_at, excluded.transaction_id)"
+)
+
+# Rows fetched per query chunk while an iterator is consumed.
+_CHUNK = 500
+
+type _Clause = tuple[str, list[Any]]
+
+
+@dataclass(frozen=True, slots=True)
+class SyncResult:
+    """Rows added or changed by :meth:`HistoryStore.sync`."""
+
+    transactions: int = 0
+    requests: int = 0
+
+
+def _ts(value: datetime | float) -> float:
+    """Seconds since the epoch; naive datetimes are UTC, like the server's timestamps."""
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+def _dt(value: float | None) -> datetime | None:
+    return None if value is None else datetime.fromtimestamp(value, UTC)
+
+
+def _transaction_row(t: Transaction) -> tuple[Any, ...]:
+    return (
+        t.id,
+        t.from_.id,
+        t.from_.username,
+        t.to.id,
+        t.to.username,
+        t.amount,
+        t.label,
+        _ts(t.time),
+    )
+
+
+def _request_row(r: Request) -> tuple[Any, ...]:
+    return (
+        r.id,
+        r.requester.id,
+        r.requester.username,
+        r.responder.id,
+        r.responder.username,
+        r.amount,
+        r.label,
+        r.status,
+        _ts(r.requested_at),
+        None if r.resolved_at is None else _ts(r.resolved_at),
+        r.transaction_id,
+    )
+
+
+def _transaction(row: tuple[Any, ...]) -> Transaction:
+    return Transaction.model_validate(
+        {
+            "id": row[0],
+            "from": {"id": row[1], "username": row[2]},
+            "to": {"id": row[3], "username": row[4]},
+            "amount": row[5],
+            "label": row[6],
+            "time": _dt(row[7]),
+        }
+    )
+
+
+def _request(row: tuple[Any, ...]) -> Request:
+    return Request.model_validate(
+        {
+            "id": row[0],
+            "requester": {"id": row[1], "username": row[2]},
+            "responder": {"id": row[3], "username": row[4]},
+            "amount": row[5],
+            "label": row[6],
+            "status": row[7],
+            "requested_at": _dt(row[8]),
+            "resolved_at": _dt(row[9]),
+            "transaction_id": row[10],
+        }
+    )
+
+
+def _newest_first(rows: list[Transaction] | list[Request]) -> bool:
+    """Whether a page is in the server's newest-first order (or too short to tell)."""
+    return len(rows) < 2 or rows[0].id > rows[-1].id
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class HistoryStore:
+    """Transactions and requests in a local SQLite database, indexed for queries.
+
+    Usage::
+
+        history = stackcoin.HistoryStore("history.db")
+        await history.sync(client)  # backfill, then only what changed
+        gateway = stackcoin.Gateway(token="...", last_event_id=history.last_event_id)
+        history.attach(gateway)
+
+        for tx in history.transactions(user=a, counterparty=b, label_prefix="rent",
+                                       since=datetime(2026, 9, 1, tzinfo=UTC),
+                                       until=datetime(2026, 10, 1, tzinfo=UTC)):
+            ...
+
+    Each query filter maps onto an index: the user pair (in either direction),
+    one user as sender or recipient, time range, label prefix and, for
+    requests, status. Results are newest first unless ``newest_first=False``.
+
+    Events carry less than the REST models: transactions added from
+    ``transfer.completed`` have no usernames or label until the next
+    :meth:`sync` fills them in, and ``request.accepted``/``request.denied``
+    only update requests the store already holds.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> HistoryStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.execute("PRAGMA optimize")
+            self._db.close()
+
+    @property
+    def last_event_id(self) -> int | None:
+        """Highest event id applied, to resume an event source from."""
+        return self._get_meta("last_event_id")
+
+    def _get_meta(self, key: str) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    # -- Writing --------------------------------------------------------------
+
+    def add_transactions(self, transactions: Iterable[Transaction]) -> int:
+        """Insert or update transactions; return how many rows changed."""
+        return self._upsert(_UPSERT_TRANSACTION, [_transaction_row(t) for t in transactions])
+
+    def add_requests(self, requests: Iterable[Request]) -> int:
+        """Insert or update requests; return how many rows changed."""
+        return self._upsert(_UPSERT_REQUEST, [_request_row(r) for r in requests])
+
+    def _upsert(self, sql: str, rows: list[tuple[Any, ...]]) -> int:
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(sql, rows)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return self._db.total_changes - before
+
+    async def sync(self, client: Client, *, full: bool = False, page_size: int = 100) -> SyncResult:
+        """Page through the account's transactions and requests into the store.
+
+        The server lists both newest first, so new rows are on the first
+        pages and, once the store holds the whole history, a page that
+        changes nothing ends the walk: a sync then costs a page or two per
+        table. A page that comes back oldest first never ends it early.
+
+        The first sync is a backfill of every page, and its progress is saved
+        after each one: if it is interrupted, the next sync picks up new rows
+        at the head and then carries on from the page it reached. Paging ends
+        at an empty page, as the server may cap ``limit`` below
+        ``page_size``. ``full=True`` reads every page, e.g. to pick up edits
+        to old rows.
+        """
+        transactions = await self._sync_table(
+            "transactions", client.get_transactions, self.add_transactions, full, page_size
+        )
+        requests = await self._sync_table(
+            "requests", client.get_requests, self.add_requests, full, page_size
+        )
+        with self._lock:
+            self._db.execute("PRAGMA optimize")
+        return SyncResult(transactions, requests)
+
+    async def _sync_table(
+        self,
+        table: str,
+        fetch: Callable[..., Awaitable[Any]],
+        add: Callable[[Any], int],
+        full: bool,
+        page_size: int,
+    ) -> int:
+        key = f"{table}_backfill_page"
+        # Next page of an unfinished backfill; 0 once one has reached the end.
+        pending: int | None = self._get_meta(key)
+        walk_all = full or pending != 0
+        total = 0
+        page = 1
+        while True:
+            rows = await fetch(page=page, limit=page_size)
+            if not rows:
+                break
+            changed = add(rows)
+            total += changed
+            caught_up = not changed and _newest_first(rows)  # older rows are stored too
+            if not walk_all:
+                if caught_up:
+                    return total
+            else:
+                if page >= (pending or 1):
+                    self._set_meta(key, page + 1)
+                elif caught_up and not full and pending:
+                    # New rows only push older ones onto later pages, so every
+                    # row the interrupted backfill had not reached is still on
+                    # its next page or after.
+                    page = pending
+                    continue
+            page += 1
+        if walk_all:
+            self._set_meta(key, 0)
+        return total
+
+    def attach(self, source: EventDispatcher) -> None:
+        """Keep the store current from a gateway or polling source."""
+        source.register_handler("transfer.completed", self.on_transfer)  # type: ignore[arg-type]
+        source.register_handler("request.created", self.on_request_created)  # type: ignore[arg-type]
+        source.register_handler("request.accepted", self.on_request_resolved)  # type: ignore[arg-type]
+        source.register_handler("request.denied", self.on_request_resolved)  # type: ignore[arg-type]
+
+    async def on_transfer(self, event: TransferCompletedEvent) -> None:
+        data = event.data
+        self._apply(
+            event.id,
+            "INSERT INTO transactions (id, from_id, to_id, amount, time) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (id) DO NOTHING",
+            (data.transaction_id, data.from_id, data.to_id, data.amount, _ts(event.inserted_at)),
+        )
+
+    async def on_request_created(self, event: RequestCreatedEvent) -> None:
+        data = event.data
+        self._apply(
+            event.id,
+            "INSERT INTO requests (id, requester_id, responder_id, amount, label, status,"
+            " requested_at) VALUES (?, ?, ?, ?, ?, 'pending', ?) ON CONFLICT (id) DO NOTHING",
+            (
+                data.request_id,
+                data.requester_id,
+                data.responder_id,
+                data.amount,
+                data.label,
+                _ts(event.inserted_at),
+            ),
+        )
+
+    async def on_request_resolved(self, event: RequestAcceptedEvent | RequestDeniedEvent) -> None:
+        data = event.data
+        self._apply(
+            event.id,
+            "UPDATE requests SET status = ?, resolved_at = ?,"
+            " transaction_id = coalesce(?, transaction_id) WHERE id = ?",
+            (
+                data.status,
+                _ts(event.inserted_at),
+                getattr(data, "transaction_id", None),
+                data.request_id,
+            ),
+        )
+
+    def _apply(self, event_id: int, sql: str, args: tuple[Any, ...]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute(sql, args)
+                self._db.execute(
+                    "INSERT INTO meta (key, value) VALUES ('last_event_id', ?)"
+                    " ON CONFLICT (key) DO UPDATE SET value = max(value, excluded.value)",
+                    (event_id,),
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    # -- Querying -------------------------------------------------------------
+
+    def transactions(
+        self,
+        *,
+        user: int | None = None,
+        counterparty: int | None = None,
+        from_id: int | None = None,
+        to_id: int | None = None,
+        since: datetime | float | None = None,
+        until: datetime | float | None = None,
+        label_prefix: str | None = None,
+        newest_first: bool = True,
+        limit: int | None = None,
+    ) -> Iterator[Transaction]:
+        """Stored transactions matching every given filter.
+
+        ``user`` matches either side of a transfer; with ``counterparty`` it
+        matches transfers between the two in either direction. ``from_id``
+        and ``to_id`` match one direction. ``since`` is inclusive and
+        ``until`` exclusive; naive datetimes are read as UTC.
+        """
+        branches = _party_branches("from_id", "to_id", user, counterparty)
+        filters = _filters(
+            [("from_id", from_id), ("to_id", to_id)], "time", since, until, label_prefix
+        )
+        rows = self._select(
+            "transactions", _TRANSACTION_COLUMNS, "time", branches, filters, newest_first, limit
+        )
+        return map(_transaction, rows)
+
+    def requests(
+        self,
+        *,
+        user: int | None = None,
+        counterparty: int | None = None,
+        requester_id: int | None = None,
+        responder_id: int | None = None,
+        status: str | None = None,
+        since: datetime | float | None = None,
+        until: datetime | float | None = None,
+        label_prefix: str | None = None,
+        newest_first: bool = True,
+        limit: int | None = None,
+    ) -> Iterator[Request]:
+        """Stored requests matching every given filter, by ``requested_at``.
+
+        ``user`` and ``counterparty`` work as in :meth:`transactions`, over
+        requester and responder.
+        """
+        branches = _party_branches("requester_id", "responder_id", user, counterparty)
+        filters = _filters(
+            [("requester_id", requester_id), ("responder_id", responder_id), ("status", status)],
+            "requested_at",
+            since,
+            until,
+            label_prefix,
+        )
+        rows = self._select(
+            "requests", _REQUEST_COLUMNS, "requested_at", branches, filters, newest_first, limit
+        )
+        return map(_request, rows)
+
+    def count_transactions(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def count_requests(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
+
+    def _select(
+        self,
+        table: str,
+        columns: str,
+        order: str,
+        branches: list[_Clause],
+        filters: _Clause,
+        newest_first: bool,
+        limit: int | None,
+    ) -> Iterator[tuple[Any, ...]]:
+        # Each chunk is its own query resuming after the last row seen, so no
+        # cursor stays open between chunks. Party filters with an OR become a
+        # UNION ALL of index range scans, which SQLite merges in order.
+        direction, after = ("DESC", "<") if newest_first else ("ASC", ">")
+        remaining = limit
+        cursor: tuple[float, int] | None = None
+        while remaining is None or remaining > 0:
+            size = _CHUNK if remaining is None else min(_CHUNK, remaining)
+            parts, args = [], []
+            for clause, branch_args in branches:
+                where = [part for part in (clause, filters[0]) if part]
+                args += branch_args + filters[1]
+                if cursor is not None:
+                    where.append(f"({order}, id) {after} (?, ?)")
+                    args += cursor
+                select = f"SELECT {columns} FROM {table}"
+                parts.append(f"{select} WHERE {' AND '.join(where)}" if where else select)
+            order_column = columns.split(", ").index(order) + 1
+            sql = f"{' UNION ALL '.join(parts)} ORDER BY {order_column} {direction}, 1 {direction}"
+            sql += f" LIMIT {size}"
+            with self._lock:
+                rows = self._db.execute(sql, args).fetchall()
+            yield from rows
+            if len(rows) < size:
+                return
+            if remaining is not None:
+                remaining -= len(rows)
+            last = rows[-1]
+            cursor = (last[order_column - 1], last[0])
+
+
+def _party_branches(
+    first: str, second: str, user: int | None, counterparty: int | None
+) -> list[_Clause]:
+    if counterparty is not None and user is None:
+        raise ValueError("counterparty requires user")
+    if user is None:
+        return [("", [])]
+    if counterparty is None:
+        return [(f"{first} = ?", [user]), (f"{second} = ? AND {first} IS NOT ?", [user, user])]
+    if counterparty == user:
+        return [(f"{first} = ? AND {second} = ?", [user, user])]
+    return [
+        (f"{first} = ? AND {second} = ?", [user, counterparty]),
+        (f"{first} = ? AND {second} = ?", [counterparty, user]),
+    ]
+
+
+def _filters(
+    equal: list[tuple[str, Any]],
+    time_column: str,
+    since: datetime | float | None,
+    until: datetime | float | None,
+    label_prefix: str | None,
+) -> _Clause:
+    clauses: list[str] = []
+    args: list[Any] = []
+    for column, value in equal:
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            args.append(value)
+    if since is not None:
+        clauses.append(f"{time_column} >= ?")
+        args.append(_ts(since))
+    if until is not None:
+        clauses.append(f"{time_column} < ?")
+        args.append(_ts(until))
+    if label_prefix:
+        # A range rather than LIKE, so the label index applies whatever the
+        # case_sensitive_like setting.
+        clauses.append("label >= ? AND label < ?")
+        args += [label_prefix, _prefix_end(label_prefix)]
+    return " AND ".join(clauses), args
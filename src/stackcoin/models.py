@@ -8,10 +8,12 @@ from datetime import datetime
 from enum import StrEnum
 from typing import Literal
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import Field, RootModel
 
+from stackcoin._model import StackCoinModel
 
-class User(BaseModel):
+
+class User(StackCoinModel):
     admin: bool = Field(..., description="Whether user is an admin")
     balance: int = Field(..., description="User's STK balance")
     banned: bool = Field(..., description="Whether user is banned")
@@ -21,17 +23,17 @@ class User(BaseModel):
     username: str = Field(..., description="Username")
 
 
-class From(BaseModel):
+class From(StackCoinModel):
     id: int | None = Field(None, description="From user ID")
     username: str | None = Field(None, description="From username")
 
 
-class To(BaseModel):
+class To(StackCoinModel):
     id: int | None = Field(None, description="To user ID")
     username: str | None = Field(None, description="To username")
 
 
-class TransactionResponse(BaseModel):
+class TransactionResponse(StackCoinModel):
     amount: int = Field(..., description="Transaction amount")
     from_: From = Field(..., alias="from")
     id: int = Field(..., description="Transaction ID")
@@ -40,13 +42,13 @@ class TransactionResponse(BaseModel):
     to: To
 
 
-class RequestDeniedData(BaseModel):
+class RequestDeniedData(StackCoinModel):
     denied_by_id: int = Field(..., description="User ID that denied the request")
     request_id: int = Field(..., description="Request ID")
     status: str = Field(..., description="New request status")
 
 
-class Transaction(BaseModel):
+class Transaction(StackCoinModel):
     amount: int = Field(..., description="Transaction amount")
     from_: From = Field(..., alias="from")
     id: int = Field(..., description="Transaction ID")
@@ -55,7 +57,7 @@ class Transaction(BaseModel):
     to: To
 
 
-class TransferCompletedData(BaseModel):
+class TransferCompletedData(StackCoinModel):
     amount: int = Field(..., description="Amount transferred")
     from_id: int = Field(..., description="Sender user ID")
     role: str = Field(..., description="Role of the event recipient (sender or receiver)")
@@ -67,24 +69,24 @@ class Type(StrEnum):
     transfer_completed = "transfer.completed"
 
 
-class TransferCompletedEvent(BaseModel):
+class TransferCompletedEvent(StackCoinModel):
     data: TransferCompletedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
     type: Literal["transfer.completed"] = Field(..., description="Event type")
 
 
-class Requester(BaseModel):
+class Requester(StackCoinModel):
     id: int | None = Field(None, description="Requester user ID")
     username: str | None = Field(None, description="Requester username")
 
 
-class Responder(BaseModel):
+class Responder(StackCoinModel):
     id: int | None = Field(None, description="Responder user ID")
     username: str | None = Field(None, description="Responder username")
 
 
-class Request(BaseModel):
+class Request(StackCoinModel):
     amount: int = Field(..., description="Requested amount")
     id: int = Field(..., description="Request ID")
     label: str | None = Field(None, description="Request label")
@@ -96,14 +98,14 @@ class Request(BaseModel):
     transaction_id: int | None = Field(None, description="Associated transaction ID")
 
 
-class Pagination(BaseModel):
+class Pagination(StackCoinModel):
     limit: int | None = Field(None, description="Items per page")
     page: int | None = Field(None, description="Current page")
     total: int | None = Field(None, description="Total items")
     total_pages: int | None = Field(None, description="Total pages")
 
 
-class RequestAcceptedData(BaseModel):
+class RequestAcceptedData(StackCoinModel):
     amount: int = Field(..., description="Request amount")
     request_id: int = Field(..., description="Request ID")
     status: str = Field(..., description="New request status")
@@ -114,14 +116,14 @@ class Type1(StrEnum):
     request_accepted = "request.accepted"
 
 
-class RequestAcceptedEvent(BaseModel):
+class RequestAcceptedEvent(StackCoinModel):
     data: RequestAcceptedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
     type: Literal["request.accepted"] = Field(..., description="Event type")
 
 
-class PreauthApprovedData(BaseModel):
+class PreauthApprovedData(StackCoinModel):
     bot_user_id: int = Field(..., description="Bot user ID")
     preauth_id: int = Field(..., description="Preauthorization ID")
     user_id: int = Field(..., description="Target user ID")
@@ -131,7 +133,7 @@ class Type2(StrEnum):
     preauth_revoked = "preauth.revoked"
 
 
-class TransactionsResponse(BaseModel):
+class TransactionsResponse(StackCoinModel):
     pagination: Pagination | None = None
     transactions: list[Transaction] | None = Field(None, description="The transactions list")
 
@@ -140,19 +142,19 @@ class Type3(StrEnum):
     request_denied = "request.denied"
 
 
-class RequestDeniedEvent(BaseModel):
+class RequestDeniedEvent(StackCoinModel):
     data: RequestDeniedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
     type: Literal["request.denied"] = Field(..., description="Event type")
 
 
-class SendStkParams(BaseModel):
+class SendStkParams(StackCoinModel):
     amount: int = Field(..., description="Amount of STK to send")
     label: str | None = Field(None, description="Optional transaction label")
 
 
-class RequestResponse(BaseModel):
+class RequestResponse(StackCoinModel):
     amount: int = Field(..., description="Requested amount")
     id: int = Field(..., description="Request ID")
     label: str | None = Field(None, description="Request label")
@@ -164,12 +166,12 @@ class RequestResponse(BaseModel):
     transaction_id: int | None = Field(None, description="Associated transaction ID")
 
 
-class RequestsResponse(BaseModel):
+class RequestsResponse(StackCoinModel):
     pagination: Pagination | None = None
     requests: list[Request] | None = Field(None, description="The requests list")
 
 
-class PreauthCreatedData(BaseModel):
+class PreauthCreatedData(StackCoinModel):
     bot_user_id: int = Field(..., description="Bot user ID")
     max_amount: int = Field(..., description="Max amount per window")
     preauth_id: int = Field(..., description="Preauthorization ID")
@@ -181,18 +183,18 @@ class Type4(StrEnum):
     preauth_approved = "preauth.approved"
 
 
-class PreauthApprovedEvent(BaseModel):
+class PreauthApprovedEvent(StackCoinModel):
     data: PreauthApprovedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
     type: Literal["preauth.approved"] = Field(..., description="Event type")
 
 
-class DiscordBotResponse(BaseModel):
+class DiscordBotResponse(StackCoinModel):
     discord_id: str = Field(..., description="The Discord snowflake ID of the StackCoin bot")
 
 
-class DiscordGuild(BaseModel):
+class DiscordGuild(StackCoinModel):
     designated_channel_snowflake: str | None = Field(
         None, description="Designated channel snowflake ID"
     )
@@ -202,13 +204,13 @@ class DiscordGuild(BaseModel):
     snowflake: str = Field(..., description="Discord guild snowflake ID")
 
 
-class PreauthRevokedData(BaseModel):
+class PreauthRevokedData(StackCoinModel):
     bot_user_id: int = Field(..., description="Bot user ID")
     preauth_id: int = Field(..., description="Preauthorization ID")
     user_id: int = Field(..., description="Target user ID")
 
 
-class DiscordGuildResponse(BaseModel):
+class DiscordGuildResponse(StackCoinModel):
     designated_channel_snowflake: str | None = Field(
         None, description="Designated channel snowflake ID"
     )
@@ -218,7 +220,7 @@ class DiscordGuildResponse(BaseModel):
     snowflake: str = Field(..., description="Discord guild snowflake ID")
 
 
-class SendStkResponse(BaseModel):
+class SendStkResponse(StackCoinModel):
     amount: int = Field(..., description="Amount sent")
     from_new_balance: int = Field(..., description="Sender's new balance")
     success: bool = Field(..., description="Whether the operation succeeded")
@@ -226,7 +228,7 @@ class SendStkResponse(BaseModel):
     transaction_id: int = Field(..., description="Created transaction ID")
 
 
-class RequestCreatedData(BaseModel):
+class RequestCreatedData(StackCoinModel):
     amount: int = Field(..., description="Requested amount")
     label: str | None = Field(None, description="Request label")
     request_id: int = Field(..., description="Request ID")
@@ -234,7 +236,7 @@ class RequestCreatedData(BaseModel):
     responder_id: int = Field(..., description="Responder user ID")
 
 
-class CreateRequestParams(BaseModel):
+class CreateRequestParams(StackCoinModel):
     amount: int = Field(..., description="Amount of STK to request")
     label: str | None = Field(None, description="Optional request label")
 
@@ -243,18 +245,18 @@ class Type5(StrEnum):
     request_created = "request.created"
 
 
-class RequestCreatedEvent(BaseModel):
+class RequestCreatedEvent(StackCoinModel):
     data: RequestCreatedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
     type: Literal["request.created"] = Field(..., description="Event type")
 
 
-class ErrorResponse(BaseModel):
+class ErrorResponse(StackCoinModel):
     error: str = Field(..., description="Error message")
 
 
-class UserResponse(BaseModel):
+class UserResponse(StackCoinModel):
     admin: bool = Field(..., description="Whether user is an admin")
     balance: int = Field(..., description="User's STK balance")
     banned: bool = Field(..., description="Whether user is banned")
@@ -264,12 +266,12 @@ class UserResponse(BaseModel):
     username: str = Field(..., description="Username")
 
 
-class UsersResponse(BaseModel):
+class UsersResponse(StackCoinModel):
     pagination: Pagination | None = None
     users: list[User] | None = Field(None, description="The users list")
 
 
-class CreateRequestResponse(BaseModel):
+class CreateRequestResponse(StackCoinModel):
     amount: int = Field(..., description="Requested amount")
     request_id: int = Field(..., description="Created request ID")
     requested_at: datetime = Field(..., description="Request timestamp")
@@ -282,7 +284,7 @@ class CreateRequestResponse(BaseModel):
     )
 
 
-class RequestActionResponse(BaseModel):
+class RequestActionResponse(StackCoinModel):
     request_id: int = Field(..., description="Request ID")
     resolved_at: datetime = Field(..., description="Resolution timestamp")
     status: str = Field(..., description="New request status")
@@ -294,19 +296,19 @@ class Type6(StrEnum):
     preauth_created = "preauth.created"
 
 
-class PreauthCreatedEvent(BaseModel):
+class PreauthCreatedEvent(StackCoinModel):
     data: PreauthCreatedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
     type: Literal["preauth.created"] = Field(..., description="Event type")
 
 
-class DiscordGuildsResponse(BaseModel):
+class DiscordGuildsResponse(StackCoinModel):
     guilds: list[DiscordGuild] | None = Field(None, description="The guilds list")
     pagination: Pagination | None = None
 
 
-class PreauthRevokedEvent(BaseModel):
+class PreauthRevokedEvent(StackCoinModel):
     data: PreauthRevokedData
     id: int = Field(..., description="Event ID")
     inserted_at: datetime = Field(..., description="Event timestamp")
@@ -340,6 +342,6 @@ class Event(
     )
 
 
-class EventsResponse(BaseModel):
+class EventsResponse(StackCoinModel):
     events: list[Event] = Field(..., description="The events list")
     has_more: bool = Field(..., description="Whether more events exist beyond this page")
@@ -0,0 +1,159 @@
+"""REST polling event source, for deployments where WebSockets are unavailable."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from . import _endpoints as api
+from ._dispatch import EventDispatcher
+from .errors import StackCoinError
+from .handlers import DeadLetterSink, HandlerPolicy
+
+if TYPE_CHECKING:
+    from .client import Client
+
+logger = logging.getLogger(__name__)
+
+
+class _Poller:
+    """Adaptive ``/api/events`` polling loop feeding an :class:`EventDispatcher`.
+
+    The interval drops to ``min_interval`` as soon as a poll returns events and
+    grows by ``backoff`` on every idle (or failed) poll, up to ``max_interval``.
+    The first page of each poll is fetched conditionally, so with a
+    ``Client(conditional=True)`` an idle poll costs a ``304`` and no parsing.
+    """
+
+    def __init__(
+        self,
+        source: EventDispatcher,
+        client: Client,
+        *,
+        min_interval: float,
+        max_interval: float,
+        backoff: float,
+    ) -> None:
+        self._source = source
+        self._client = client
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self.interval = min_interval
+
+    async def seed_cursor(self) -> None:
+        """Move the cursor to the newest event without dispatching history.
+
+        Mirrors the gateway, which delivers only live events when started
+        without a ``last_event_id``.
+        """
+        self._source._last_event_id = await self._client._run(api.latest_event_id(0))
+
+    async def poll_once(self) -> int:
+        """Fetch and dispatch every event after the cursor; return how many."""
+        if self._source._last_event_id is None:
+            await self.seed_cursor()
+        events = await self._client._run(
+            api.get_events(
+                self._source._last_event_id or 0,
+                revalidate_first=True,
+                pages=self._client._pages,
+            )
+        )
+        for event in events:
+            await self._source._dispatch_event(event)
+        return len(events)
+
+    async def run(self, stopped: asyncio.Event, *, duration: float | None = None) -> None:
+        """Poll until ``stopped`` is set or ``duration`` seconds have passed."""
+        loop = asyncio.get_running_loop()
+        deadline = None if duration is None else loop.time() + duration
+        while not stopped.is_set():
+            try:
+                count = await self.poll_once()
+            except StackCoinError as exc:
+                logger.warning("Event poll failed: %s", exc)
+                count = 0
+            if count:
+                self.interval = self._min_interval
+            else:
+                self.interval = min(self.interval * self._backoff, self._max_interval)
+
+            timeout = self.interval
+            if deadline is not None:
+                timeout = min(timeout, deadline - loop.time())
+                if timeout <= 0:
+                    return
+            try:
+                await asyncio.wait_for(stopped.wait(), timeout)
+            except TimeoutError:
+                pass
+
+
+class PollingEventSource(EventDispatcher):
+    """Receives StackCoin events by polling the REST API instead of a WebSocket.
+
+    Has the same ``on()``/``register_handler`` interface, cursor handling
+    (``last_event_id``/``on_event_id``) and handler semantics as
+    :class:`Gateway`, so the two are interchangeable::
+
+        async with stackcoin.Client(token="...", conditional=True) as client:
+            source = stackcoin.PollingEventSource(client, last_event_id=saved_cursor)
+
+            @source.on("transfer.completed")
+            async def on_transfer(event: stackcoin.TransferCompletedEvent):
+                ...
+
+            await source.connect()
+
+    Polls every ``min_interval`` seconds while events keep arriving and backs
+    off by ``backoff`` per idle poll, up to ``max_interval``. Without a
+    ``last_event_id`` the first poll only positions the cursor at the newest
+    event; history is not dispatched.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        *,
+        last_event_id: int | None = None,
+        on_event_id: Callable[[int], None] | None = None,
+        dedup_window: int | None = 65_536,
+        dedup_path: str | None = None,
+        handler_policy: HandlerPolicy | None = None,
+        dead_letter: DeadLetterSink | None = None,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 2.0,
+    ):
+        super().__init__(
+            last_event_id=last_event_id,
+            on_event_id=on_event_id,
+            dedup_window=dedup_window,
+            dedup_path=dedup_path,
+            handler_policy=handler_policy,
+            dead_letter=dead_letter,
+        )
+        self._poller = _Poller(
+            self,
+            client,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            backoff=backoff,
+        )
+
+    @property
+    def interval(self) -> float:
+        """The current polling interval in seconds."""
+        return self._poller.interval
+
+    async def connect(self) -> None:
+        """Poll for events until :meth:`stop` is called."""
+        self._start()
+        await self._poller.run(self._stopped)
+
+    async def poll_once(self) -> int:
+        """Fetch and dispatch any new events once; return how many were dispatched."""
+        return await self._poller.poll_once()
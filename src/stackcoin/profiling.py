@@ -0,0 +1,188 @@
+"""Per-stage timing for the gateway and clients.
+
+Pass one :class:`Profiler` as ``profiler=`` to :class:`Gateway`,
+:class:`Client` or :class:`SyncClient` and each stage of their hot paths is
+timed: decoding and validating frames, dispatching to each handler,
+persisting the cursor, and the send, receive and parse phases of every HTTP
+request. Time spent waiting for the next frame is not counted. Spans are
+kept as aggregated stacks such as
+``gateway;dispatch;transfer.completed:on_transfer``, so memory does not
+grow with traffic.
+
+Without a profiler nothing is timed: the gateway uses its normal receive
+loop and the other stages check one attribute. With ``sample_rate`` below 1
+only that fraction of frames, dispatches and requests are timed, and
+reported counts and totals are scaled back up to estimates.
+
+:meth:`Profiler.breakdown` renders a per-stage table, logged every
+``report_interval`` seconds for the interval just ended when that is set.
+:meth:`Profiler.write_collapsed` writes the collapsed-stack format read by
+``flamegraph.pl``, speedscope and inferno.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+type Stack = tuple[str, ...]
+
+_IDS = re.compile(r"/\d+")
+
+
+# httpx response extension holding when the response headers arrived.
+HEADERS_AT = "stackcoin.headers_at"
+
+
+def route(method: str, url: str) -> str:
+    """Span name for an HTTP request, with numeric path segments folded to ``{id}``."""
+    return f"{method} {_IDS.sub('/{id}', url.partition('?')[0])}"
+
+
+@dataclass(frozen=True, slots=True)
+class StageStats:
+    """Estimated calls and wall time of one stage."""
+
+    calls: float
+    seconds: float
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+class Profiler:
+    """Aggregates timing spans from the components it is passed to.
+
+    Usage::
+
+        profiler = stackcoin.Profiler(sample_rate=0.1, report_interval=60)
+        client = stackcoin.Client(token, profiler=profiler)
+        gateway = stackcoin.Gateway(token, client=client, profiler=profiler)
+        ...
+        print(profiler.breakdown())
+        profiler.write_collapsed("gateway.folded")  # flamegraph.pl gateway.folded > out.svg
+
+    Spans measure wall time, so a handler's span includes everything it
+    awaits and concurrent handlers may add up to more than their dispatch.
+    Periodic reports go to the ``stackcoin.profiling`` logger at INFO.
+    """
+
+    def __init__(self, *, sample_rate: float = 1.0, report_interval: float | None = None) -> None:
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.sample_rate = sample_rate
+        self._always = sample_rate >= 1
+        self._spans: dict[Stack, list[int]] = {}  # stack -> [count, nanoseconds]
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reporter: threading.Thread | None = None
+        if report_interval is not None:
+            self._reporter = threading.Thread(
+                target=self._report_every,
+                args=(report_interval,),
+                name="stackcoin-profiler",
+                daemon=True,
+            )
+            self._reporter.start()
+
+    def sampled(self) -> bool:
+        """Whether to time the unit of work about to start."""
+        return self._always or random.random() < self.sample_rate
+
+    def add(self, stack: Stack, nanoseconds: int) -> None:
+        """Record one span of ``nanoseconds`` under ``stack``."""
+        with self._lock:
+            span = self._spans.get(stack)
+            if span is None:
+                self._spans[stack] = [1, nanoseconds]
+            else:
+                span[0] += 1
+                span[1] += nanoseconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def close(self) -> None:
+        """Stop periodic reports."""
+        self._closed.set()
+
+    def stats(self) -> dict[str, StageStats]:
+        """Estimated calls and seconds per stage, keyed by ``;``-joined stack."""
+        return self._stats(self._snapshot())
+
+    def breakdown(self) -> str:
+        """Per-stage table of calls, total and mean time and share of the root."""
+        return self._render(self._snapshot())
+
+    def collapsed(self) -> str:
+        """Spans in collapsed-stack format: ``a;b;c <self microseconds>`` per line.
+
+        Each stack is weighted by its self time (its total minus its
+        children's), so a flamegraph shows where the time was spent.
+        """
+        spans = self._snapshot()
+        children: dict[Stack, int] = {}
+        for stack, (_, ns) in spans.items():
+            if len(stack) > 1:
+                children[stack[:-1]] = children.get(stack[:-1], 0) + ns
+        lines = []
+        for stack, (_, ns) in sorted(spans.items()):
+            own = ns - children.get(stack, 0)
+            if own > 0:
+                lines.append(f"{';'.join(stack)} {round(own / self.sample_rate / 1000)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+
+    def _snapshot(self) -> dict[Stack, tuple[int, int]]:
+        with self._lock:
+            return {stack: (count, ns) for stack, (count, ns) in self._spans.items()}
+
+    def _stats(self, spans: dict[Stack, tuple[int, int]]) -> dict[str, StageStats]:
+        scale = 1 / self.sample_rate
+        return {
+            ";".join(stack): StageStats(count * scale, ns * scale / 1e9)
+            for stack, (count, ns) in sorted(spans.items())
+        }
+
+    def _render(self, spans: dict[Stack, tuple[int, int]]) -> str:
+        stats = self._stats(spans)
+        roots: dict[str, float] = {}
+        for stack in spans:
+            if stack[:-1] not in spans:  # outermost stages of each component
+                stage = stats[";".join(stack)]
+                roots[stack[0]] = roots.get(stack[0], 0.0) + stage.seconds
+        width = max((len(name) for name in stats), default=5)
+        lines = [f"{'stage':<{width}}  {'calls':>10}  {'total ms':>10}  {'mean us':>9}  share"]
+        if self.sample_rate < 1:
+            lines[0] += f"  (sampled {self.sample_rate:g}, scaled)"
+        for name, stage in stats.items():
+            root_seconds = roots.get(name.partition(";")[0], 0.0)
+            share = stage.seconds / root_seconds * 100 if root_seconds else 0.0
+            lines.append(
+                f"{name:<{width}}  {stage.calls:>10,.0f}  {stage.seconds * 1e3:>10,.1f}"
+                f"  {stage.mean_seconds * 1e6:>9,.1f}  {share:5.1f}%"
+            )
+        return "\n".join(lines)
+
+    def _report_every(self, interval: float) -> None:
+        previous: dict[Stack, tuple[int, int]] = {}
+        while not self._closed.wait(interval):
+            current = self._snapshot()
+            delta = {}
+            for stack, (count, ns) in current.items():
+                before = previous.get(stack, (0, 0))
+                if count > before[0]:
+                    delta[stack] = (count - before[0], ns - before[1])
+            previous = current
+            if delta:
+                logger.info("stage breakdown, last %ss:\n%s", interval, self._render(delta))
@@ -0,0 +1,382 @@
+"""Record live traffic and replay or synthesize it offline.
+
+A :class:`Recorder` passed to :class:`Client` (``recorder=``) or
+:class:`Gateway` (``recorder=``) appends every REST exchange and every
+WebSocket frame received to a newline-delimited JSON file, gzip-compressed
+when the path ends in ``.gz``. :class:`Replayer` reads such a file back and
+serves it through an ``httpx`` transport and a local Phoenix-protocol
+WebSocket server (:class:`ReplayServer`), at recorded speed, ``N`` times
+faster, or as fast as the client can read. :func:`synthesize` produces event
+frames at a chosen rate for load tests of handlers that never saw production.
+
+The ``stackcoin replay`` and ``stackcoin loadgen`` commands wrap these.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import httpx
+
+_FORMAT = "stackcoin-recording"
+_VERSION = 1
+
+# Response headers worth keeping; bodies are stored decoded, so transfer
+# encodings are dropped.
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+EVENT_TYPES = ("transfer.completed", "request.created", "request.accepted", "request.denied")
+
+
+@dataclass(frozen=True, slots=True)
+class Exchange:
+    """One recorded REST request and its response."""
+
+    at: float  # seconds since recording started
+    method: str
+    target: str  # path and query string
+    status: int
+    headers: dict[str, str]
+    body: str
+    elapsed: float  # round-trip time in seconds
+
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """One WebSocket frame received by the gateway."""
+
+    at: float
+    data: str
+    event_id: int | None = None  # set for Phoenix "event" frames
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _event_id(data: str) -> int | None:
+    try:
+        message = json.loads(data)
+        if message[3] == "event":
+            return int(message[4]["id"])
+    except (ValueError, TypeError, LookupError):
+        pass
+    return None
+
+
+class Recorder:
+    """Appends REST exchanges and WebSocket frames to a recording file.
+
+    Safe to share between a client and a gateway, and across threads.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.exchanges = 0
+        self.frames = 0
+        header = {"format": _FORMAT, "version": _VERSION, "started": datetime.now(UTC).isoformat()}
+        self._write(header)
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def exchange(self, resp: httpx.Response) -> None:
+        """Record a completed response together with its request."""
+        request = resp.request
+        headers = {k: v for k in _KEPT_HEADERS if (v := resp.headers.get(k)) is not None}
+        try:
+            elapsed = resp.elapsed.total_seconds()
+        except RuntimeError:  # transports that never stream the body, e.g. MockTransport
+            elapsed = 0.0
+        record = {
+            "t": round(time.monotonic() - self._start, 6),
+            "http": [
+                request.method,
+                request.url.raw_path.decode("ascii"),
+                resp.status_code,
+                headers,
+                resp.text,
+                round(elapsed, 6),
+            ],
+        }
+        self._write(record)
+
+    def frame(self, data: str | bytes, *, at: float | None = None) -> None:
+        """Record a frame as received from the WebSocket, ``at`` seconds in (default: now)."""
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        if at is None:
+            at = round(time.monotonic() - self._start, 6)
+        self._write({"t": at, "ws": data})
+
+    def _write(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            if "ws" in record:
+                self.frames += 1
+            elif "http" in record:
+                self.exchanges += 1
+
+
+def read_recording(path: str) -> tuple[list[Exchange], list[Frame]]:
+    """Load a file written by :class:`Recorder`."""
+    exchanges: list[Exchange] = []
+    frames: list[Frame] = []
+    with _open(path, "r") as file:
+        header = json.loads(next(file, "{}"))
+        if header.get("format") != _FORMAT:
+            raise ValueError(f"{path} is not a stackcoin recording")
+        for line in file:
+            record = json.loads(line)
+            if "ws" in record:
+                data = record["ws"]
+                frames.append(Frame(record["t"], data, _event_id(data)))
+            elif "http" in record:
+                exchanges.append(Exchange(record["t"], *record["http"]))
+    return exchanges, frames
+
+
+def write_frames(path: str, frames: Iterable[Frame]) -> int:
+    """Write ``frames`` (e.g. from :func:`synthesize`) as a recording; return the count."""
+    with Recorder(path) as recorder:
+        for frame in frames:
+            recorder.frame(frame.data, at=frame.at)
+        return recorder.frames
+
+
+class Replayer:
+    """Serves a recording back to a :class:`Client` and :class:`Gateway`.
+
+    ``speed`` scales recorded timing: ``1.0`` reproduces it, ``10.0`` runs
+    ten times faster and ``None`` sends everything as fast as it is read.
+
+    Usage::
+
+        replayer = Replayer("outage.ndjson.gz", speed=10)
+        client = stackcoin.Client("t", transport=replayer.transport())
+        async with replayer.serve() as server:
+            gateway = stackcoin.Gateway("t", ws_url=server.ws_url, client=client)
+
+    REST requests are answered with the recorded response for the same method,
+    path and query, in recorded order; once those are used up the last one is
+    repeated. Unrecorded requests get a ``404``.
+    """
+
+    def __init__(self, path: str, *, speed: float | None = 1.0) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive, or None for no delays")
+        self.exchanges, self.frames = read_recording(path)
+        self.speed = speed
+
+    def transport(self, *, sync: bool = False) -> httpx.MockTransport:
+        """An ``httpx`` transport answering from the recording.
+
+        Pass ``sync=True`` for a :class:`SyncClient`.
+        """
+        import httpx
+
+        queues: dict[tuple[str, str], deque[Exchange]] = defaultdict(deque)
+        for exchange in self.exchanges:
+            queues[exchange.method, exchange.target].append(exchange)
+        lock = threading.Lock()
+
+        def answer(request: httpx.Request) -> tuple[httpx.Response, float]:
+            with lock:
+                queue = queues.get((request.method, request.url.raw_path.decode("ascii")))
+                if not queue:
+                    body = {"error": "not_recorded", "message": str(request.url)}
+                    return httpx.Response(404, json=body), 0.0
+                exchange = queue.popleft() if len(queue) > 1 else queue[0]
+            response = httpx.Response(
+                exchange.status, headers=exchange.headers, content=exchange.body.encode()
+            )
+            delay = exchange.elapsed / self.speed if self.speed is not None else 0.0
+            return response, delay
+
+        if sync:
+
+            def handle(request: httpx.Request) -> httpx.Response:
+                response, delay = answer(request)
+                if delay:
+                    time.sleep(delay)
+                return response
+
+            return httpx.MockTransport(handle)
+
+        async def handle_async(request: httpx.Request) -> httpx.Response:
+            response, delay = answer(request)
+            if delay:
+                await asyncio.sleep(delay)
+            return response
+
+        return httpx.MockTransport(handle_async)
+
+    def serve(self, *, host: str = "127.0.0.1", port: int = 0) -> ReplayServer:
+        """A WebSocket stand-in streaming the recorded frames to each connection."""
+        return ReplayServer(lambda: self.frames, speed=self.speed, host=host, port=port)
+
+
+class ReplayServer:
+    """Local WebSocket server speaking enough of the Phoenix protocol for a Gateway.
+
+    Each connection that joins a channel receives the frames returned by
+    ``frames()`` on their recorded schedule, scaled by ``speed``. The
+    connection then stays open until the client leaves. ``finished`` is set
+    once a connection has been sent every frame, and ``last_event_id`` is the
+    highest event id sent so far.
+    """
+
+    def __init__(
+        self,
+        frames: Callable[[], Iterable[Frame]],
+        *,
+        speed: float | None = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self._frames = frames
+        self._speed = speed
+        self._host = host
+        self._port = port
+        self._server: Any = None
+        self.frames_sent = 0
+        self.last_event_id = 0
+        self.finished = asyncio.Event()
+
+    @property
+    def ws_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://{self._host}:{port}/ws"
+
+    async def __aenter__(self) -> ReplayServer:
+        from websockets.asyncio.server import serve
+
+        self._server = await serve(self._handle, self._host, self._port)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws: Any) -> None:
+        from websockets.exceptions import ConnectionClosed
+
+        try:
+            async for raw in ws:
+                join_ref, ref, topic, event, _ = json.loads(raw)
+                if event == "heartbeat":
+                    reply = {"status": "ok", "response": {}}
+                    await ws.send(json.dumps([None, ref, "phoenix", "phx_reply", reply]))
+                elif event == "phx_join":
+                    reply = {"status": "ok", "response": {}}
+                    await ws.send(json.dumps([join_ref, ref, topic, "phx_reply", reply]))
+                    await self._stream(ws)
+        except ConnectionClosed:
+            pass
+
+    async def _stream(self, ws: Any) -> None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        first: float | None = None
+        for frame in self._frames():
+            if self._speed is not None:
+                if first is None:
+                    first = frame.at
+                due = start + (frame.at - first) / self._speed
+                if due > loop.time():
+                    await asyncio.sleep(due - loop.time())
+            await ws.send(frame.data)
+            self.frames_sent += 1
+            if frame.event_id is not None and frame.event_id > self.last_event_id:
+                self.last_event_id = frame.event_id
+        self.finished.set()
+
+
+def _synthetic_payload(event_type: str, event_id: int, rng: random.Random) -> dict[str, Any]:
+    amount = rng.randint(1, 500)
+    if event_type == "transfer.completed":
+        return {
+            "amount": amount,
+            "from_id": rng.randint(1, 1000),
+            "to_id": rng.randint(1, 1000),
+            "role": rng.choice(("sender", "receiver")),
+            "transaction_id": event_id,
+        }
+    if event_type == "request.created":
+        return {
+            "amount": amount,
+            "label": f"synthetic {event_id}",
+            "request_id": event_id,
+            "requester_id": rng.randint(1, 1000),
+            "responder_id": rng.randint(1, 1000),
+        }
+    if event_type == "request.accepted":
+        return {
+            "amount": amount,
+            "request_id": event_id,
+            "status": "accepted",
+            "transaction_id": event_id,
+        }
+    if event_type == "request.denied":
+        return {"denied_by_id": rng.randint(1, 1000), "request_id": event_id, "status": "denied"}
+    raise ValueError(f"cannot synthesize {event_type!r} events")
+
+
+def synthesize(
+    rate: float,
+    duration: float,
+    *,
+    types: Iterable[str] = EVENT_TYPES,
+    start_id: int = 1,
+    seed: int = 0,
+) -> Iterator[Frame]:
+    """Yield Phoenix event frames at ``rate`` per second for ``duration`` seconds.
+
+    Event types are drawn uniformly from ``types`` with a seeded generator,
+    so the same arguments always produce the same stream.
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    rng = random.Random(seed)
+    types = tuple(types)
+    epoch = datetime.now(UTC)
+    for index in itertools.count():
+        at = index / rate
+        if at >= duration:
+            return
+        event_id = start_id + index
+        event_type = rng.choice(types)
+        event = {
+            "id": event_id,
+            "type": event_type,
+            "inserted_at": (epoch + timedelta(seconds=at)).isoformat(),
+            "data": _synthetic_payload(event_type, event_id, rng),
+        }
+        data = json.dumps([None, None, "user:self", "event", event], separators=(",", ":"))
+        yield Frame(at, data, event_id)
@@ -0,0 +1,256 @@
+"""Balance-aware scheduling of outgoing transfers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from .errors import InsufficientFundsError, StackCoinError
+from .models import SendStkResponse, TransferCompletedEvent
+
+if TYPE_CHECKING:
+    from ._dispatch import EventDispatcher
+    from .client import Client
+
+logger = logging.getLogger(__name__)
+
+OnOverdraw = Literal["queue", "reject"]
+
+
+@dataclass
+class SchedulerStats:
+    """Counters describing how sends were admitted."""
+
+    sent: int = 0
+    failed: int = 0  # rejected by the server after being admitted
+    rejected: int = 0  # refused locally with InsufficientFundsError
+    queued: int = 0  # had to wait for funds before being sent
+    max_queue_depth: int = 0
+
+
+class TransferScheduler:
+    """Sends STK without overdrawing, by tracking the bot's balance locally.
+
+    The balance is seeded from :meth:`Client.get_me` (see :meth:`refresh`)
+    and kept current from two sources: ``from_new_balance`` on each send
+    response, and ``transfer.completed`` events once :meth:`attach` has
+    registered the scheduler with a gateway or polling source. Each send
+    first reserves its amount; while in flight, reservations are subtracted
+    from :attr:`available`.
+
+    A send that does not fit either raises :class:`InsufficientFundsError`
+    (``on_overdraw="reject"``) or waits in a FIFO queue until incoming
+    transfers or finished sends free enough funds (``"queue"``, at most
+    ``max_queue`` waiters, each for up to ``timeout`` seconds). Queued sends
+    are admitted strictly in order, so a large send holds back smaller ones
+    behind it.
+
+    Usage::
+
+        scheduler = stackcoin.TransferScheduler(client)
+        scheduler.attach(gateway)
+        await scheduler.send(user_id, 50, label="payout")
+
+    The tracking is exact for sends made through the scheduler and for
+    transfers reported by events; if the balance is also spent elsewhere,
+    call :meth:`refresh` periodically.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        *,
+        on_overdraw: OnOverdraw = "queue",
+        max_queue: int = 1000,
+        timeout: float | None = None,
+    ) -> None:
+        if on_overdraw not in ("queue", "reject"):
+            raise ValueError(f"unknown overdraw policy {on_overdraw!r}")
+        self._client = client
+        self._on_overdraw = on_overdraw
+        self._max_queue = max_queue
+        self._timeout = timeout
+        self._balance: int | None = None
+        # Transaction id the balance snapshot reflects, and changes from events
+        # for later transactions that a newer snapshot must not lose.
+        self._snapshot_txn = 0
+        self._deltas: dict[int, int] = {}
+        # Transactions up to this id may or may not be in the last get_me()
+        # balance; incoming ones among them are not added.
+        self._unsure_through = 0
+        self._reserved = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+        self._seeding: asyncio.Task[None] | None = None
+        self.stats = SchedulerStats()
+
+    @property
+    def balance(self) -> int | None:
+        """Last known balance, or ``None`` before the first :meth:`refresh`."""
+        return self._balance
+
+    @property
+    def available(self) -> int:
+        """Balance not reserved by in-flight sends."""
+        return (self._balance or 0) - self._reserved
+
+    @property
+    def queued(self) -> int:
+        """Number of sends waiting for funds."""
+        return len(self._waiters)
+
+    def attach(self, source: EventDispatcher) -> None:
+        """Track ``transfer.completed`` events from a gateway or polling source."""
+        source.register_handler("transfer.completed", self.on_transfer)  # type: ignore[arg-type]
+
+    async def refresh(self) -> int:
+        """Re-read the balance from :meth:`Client.get_me`; return it.
+
+        ``get_me`` does not say which transactions its balance includes, so
+        the newest transaction id is read just before and just after it.
+        Events up to the first id are already counted and skipped. For
+        transactions between the two ids it cannot tell: outgoing ones are
+        subtracted and incoming ones left out, so the balance may be
+        understated until the next send response, but never overstated.
+        """
+        before = await self._newest_transaction()
+        me = await self._client.get_me()
+        after = await self._newest_transaction()
+        if self._balance is not None and self._snapshot_txn > before:
+            return self._balance  # a send response during the call is newer and exact
+        self._snapshot_txn = before
+        self._unsure_through = after
+        self._deltas = {
+            txn: d for txn, d in self._deltas.items() if txn > after or (txn > before and d < 0)
+        }
+        self._balance = me.balance + sum(self._deltas.values())
+        self._wake()
+        return self._balance
+
+    async def send(
+        self,
+        to_user_id: int,
+        amount: int,
+        *,
+        label: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> SendStkResponse:
+        """Reserve ``amount`` and send it; see :meth:`Client.send`."""
+        if self._balance is None:
+            await self._seed()
+        await self._reserve(amount)
+        try:
+            response = await self._client.send(
+                to_user_id, amount, label=label, idempotency_key=idempotency_key
+            )
+        except StackCoinError as exc:
+            self.stats.failed += 1
+            self._release(amount)
+            if 400 <= exc.status_code < 500:
+                # Our view of the balance may be wrong; re-read it before
+                # admitting more sends on top of it.
+                try:
+                    await self.refresh()
+                except StackCoinError:
+                    logger.warning(
+                        "Could not re-read the balance after a failed send", exc_info=True
+                    )
+            raise
+        self.stats.sent += 1
+        self._reserved -= amount
+        self._apply_snapshot(response.transaction_id, response.from_new_balance)
+        return response
+
+    async def on_transfer(self, event: TransferCompletedEvent) -> None:
+        """Event handler applying a completed transfer to the balance."""
+        data = event.data
+        if self._balance is None or data.transaction_id <= self._snapshot_txn:
+            return  # the current snapshot already includes it
+        if data.transaction_id in self._deltas:
+            return
+        delta = data.amount if data.role == "receiver" else -data.amount
+        if delta > 0 and data.transaction_id <= self._unsure_through:
+            return  # may be in the get_me() balance already; never overstate
+        self._deltas[data.transaction_id] = delta
+        self._balance += delta
+        if delta > 0:
+            self._wake()
+
+    async def _seed(self) -> None:
+        # Concurrent first sends share one get_me() call.
+        if self._seeding is None:
+            self._seeding = asyncio.ensure_future(self.refresh())
+        seeding = self._seeding
+        try:
+            await asyncio.shield(seeding)
+        finally:
+            if seeding.done() and self._seeding is seeding:
+                self._seeding = None
+
+    async def _newest_transaction(self) -> int:
+        # The server lists transactions newest first.
+        transactions = await self._client.get_transactions(page=1, limit=1)
+        return transactions[0].id if transactions else 0
+
+    def _apply_snapshot(self, transaction_id: int, balance: int) -> None:
+        """Adopt a server-reported balance unless a newer one was already seen."""
+        if transaction_id <= self._snapshot_txn:
+            return
+        self._snapshot_txn = transaction_id
+        self._deltas = {txn: d for txn, d in self._deltas.items() if txn > transaction_id}
+        self._balance = balance + sum(self._deltas.values())
+        self._wake()
+
+    async def _reserve(self, amount: int) -> None:
+        if not self._waiters and amount <= self.available:
+            self._reserved += amount
+            return
+        if self._on_overdraw == "reject" or len(self._waiters) >= self._max_queue:
+            self.stats.rejected += 1
+            raise InsufficientFundsError(
+                amount, self.available, f"sending {amount} would overdraw {self.available}"
+            )
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (amount, future)
+        self._waiters.append(entry)
+        self.stats.queued += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._waiters))
+        try:
+            # _wake() reserves the amount before resolving the future.
+            await asyncio.wait_for(asyncio.shield(future), self._timeout)
+        except BaseException as exc:
+            if future.done() and not future.cancelled():
+                self._release(amount)  # admitted just as we gave up
+            else:
+                future.cancel()
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    self._wake()  # the head may have left; let the next one through
+            if isinstance(exc, TimeoutError):
+                self.stats.rejected += 1
+                raise InsufficientFundsError(
+                    amount,
+                    self.available,
+                    f"no funds for {amount} within {self._timeout}s (available {self.available})",
+                ) from None
+            raise
+
+    def _release(self, amount: int) -> None:
+        self._reserved -= amount
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit queued sends, in order, while the head fits."""
+        while self._waiters:
+            amount, future = self._waiters[0]
+            if future.done():  # timed out or cancelled
+                self._waiters.popleft()
+                continue
+            if amount > self.available:
+                return
+            self._waiters.popleft()
+            self._reserved += amount
+            future.set_result(None)
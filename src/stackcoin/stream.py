@@ -0,0 +1,182 @@
+"""Async-iterator consumption of gateway events, as an alternative to callbacks."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from collections import deque
+from collections.abc import Iterable
+from typing import IO, Literal
+
+from ._endpoints import AnyEvent
+from .models import Event
+
+Overflow = Literal["block", "drop_oldest", "spill"]
+
+
+class EventStream[T]:
+    """A bounded queue of events fed by an event source, consumed with ``async for``.
+
+    Created by :meth:`Gateway.events` (or any other event source); events are
+    queued from the moment the stream is created. Iteration yields single
+    events, or lists of up to ``batch_size`` events when batching is enabled.
+    A batch is yielded as soon as it is full or ``max_latency`` seconds after
+    its first event arrived, whichever comes first.
+
+    When more than ``maxsize`` events are waiting, ``overflow`` decides what
+    happens to the next one:
+
+    * ``"block"`` — the source waits for the consumer (backpressure; other
+      handlers are delayed too).
+    * ``"drop_oldest"`` — the oldest queued event is discarded and counted in
+      :attr:`dropped`.
+    * ``"spill"`` — events are appended to a temporary file (in ``spill_dir``)
+      and read back in order once the consumer catches up.
+
+    The stream ends after the source stops and the queue has drained, or
+    after :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        *,
+        types: Iterable[str] | None = None,
+        batch_size: int | None = None,
+        max_latency: float | None = None,
+        maxsize: int = 10_000,
+        overflow: Overflow = "block",
+        spill_dir: str | None = None,
+    ) -> None:
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if overflow not in ("block", "drop_oldest", "spill"):
+            raise ValueError(f"unknown overflow policy {overflow!r}")
+        self._types = frozenset(types) if types is not None else None
+        self._batch_size = batch_size
+        self._max_latency = max_latency
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._spill_dir = spill_dir
+        self._queue: deque[AnyEvent] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._closed = False
+        self._spill: IO[bytes] | None = None
+        self._spill_pending = 0
+        self._spill_read_pos = 0
+        self.dropped = 0
+        self.spilled = 0
+
+    def __aiter__(self) -> EventStream[T]:
+        return self
+
+    async def __anext__(self) -> T:
+        first = await self._get()
+        if self._batch_size is None:
+            return first  # type: ignore[return-value]
+
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self._max_latency or 0.0)
+        while len(batch) < self._batch_size:
+            if self._queue or self._spill_pending:
+                batch.append(self._pop())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self._closed:
+                break
+            self._not_empty.clear()
+            try:
+                await asyncio.wait_for(self._not_empty.wait(), remaining)
+            except TimeoutError:
+                break
+        return batch  # type: ignore[return-value]
+
+    async def __aenter__(self) -> EventStream[T]:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of events waiting, including spilled ones."""
+        return len(self._queue) + self._spill_pending
+
+    def close(self) -> None:
+        """Stop accepting events; iteration ends once the queue has drained."""
+        self._closed = True
+        self._not_empty.set()
+        self._not_full.set()
+
+    async def put(self, event: AnyEvent) -> None:
+        """Offer an event to the stream, applying the overflow policy when full."""
+        if self._closed or (self._types is not None and event.type not in self._types):
+            return
+        if self._spill_pending:
+            # Once spilling, everything goes to disk until it drains, to keep order.
+            self._write_spill(event)
+        elif len(self._queue) < self._maxsize:
+            self._queue.append(event)
+        elif self._overflow == "drop_oldest":
+            self._queue.popleft()
+            self._queue.append(event)
+            self.dropped += 1
+        elif self._overflow == "spill":
+            self._write_spill(event)
+        else:
+            while len(self._queue) >= self._maxsize and not self._closed:
+                self._not_full.clear()
+                await self._not_full.wait()
+            if self._closed:
+                return
+            self._queue.append(event)
+        self._not_empty.set()
+
+    async def _get(self) -> AnyEvent:
+        while not (self._queue or self._spill_pending):
+            if self._closed:
+                self._discard_spill()
+                raise StopAsyncIteration
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self._pop()
+
+    def _pop(self) -> AnyEvent:
+        if not self._queue:
+            self._read_spill()
+        event = self._queue.popleft()
+        if len(self._queue) < self._maxsize:
+            self._not_full.set()
+        return event
+
+    def _write_spill(self, event: AnyEvent) -> None:
+        if self._spill is None:
+            fd, path = tempfile.mkstemp(prefix="stackcoin-spill-", dir=self._spill_dir)
+            self._spill = os.fdopen(fd, "w+b")
+            os.unlink(path)  # anonymous: the file disappears with the handle
+        self._spill.seek(0, os.SEEK_END)
+        self._spill.write(event.model_dump_json().encode() + b"\n")
+        self._spill_pending += 1
+        self.spilled += 1
+
+    def _read_spill(self) -> None:
+        """Move up to ``maxsize`` spilled events back into the in-memory queue."""
+        assert self._spill is not None
+        self._spill.flush()
+        self._spill.seek(self._spill_read_pos)
+        while self._spill_pending and len(self._queue) < self._maxsize:
+            line = self._spill.readline()
+            self._queue.append(Event.model_validate_json(line).root)
+            self._spill_pending -= 1
+        self._spill_read_pos = self._spill.tell()
+        if not self._spill_pending:
+            self._discard_spill()
+
+    def _discard_spill(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            self._spill_pending = 0
+            self._spill_read_pos = 0
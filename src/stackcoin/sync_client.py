@@ -0,0 +1,276 @@
+"""Synchronous REST client for the StackCoin API."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from . import _endpoints as api
+from ._base import _MISS, _RETRY, BaseClient, ValidationMode
+from ._conditional import last_unchanged
+from ._endpoints import AnyEvent, Call, Flow
+from .cache import CacheBackend
+from .models import (
+    CreateRequestResponse,
+    DiscordGuild,
+    Request,
+    RequestActionResponse,
+    SendStkResponse,
+    Transaction,
+    User,
+)
+
+if TYPE_CHECKING:
+    from .profiling import Profiler
+    from .replay import Recorder
+
+
+class SyncClient(BaseClient):
+    """Blocking client for the StackCoin REST API, for code without an event loop.
+
+    Mirrors :class:`Client` method for method. A single instance keeps one
+    persistent ``httpx.Client`` connection pool and is safe to share across
+    threads, so Django views or Celery tasks can reuse it instead of paying
+    for a new pool and TLS handshake per call.
+
+    Usage::
+
+        with SyncClient(token="sk-...") as client:
+            me = client.get_me()
+            print(me.username, me.balance)
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        base_url: str = "https://stackcoin.world",
+        timeout: float = 10.0,
+        transport: httpx.BaseTransport | None = None,
+        limits: httpx.Limits | None = None,
+        conditional: bool = False,
+        page_size: int | None = None,
+        page_latency_target: float | None = None,
+        compression: bool = True,
+        cache: CacheBackend | None = None,
+        cache_ttl: float = 60.0,
+        validation: ValidationMode = "full",
+        recorder: Recorder | None = None,
+        profiler: Profiler | None = None,
+    ) -> None:
+        super().__init__(
+            token,
+            base_url=base_url,
+            timeout=timeout,
+            conditional=conditional,
+            page_size=page_size,
+            page_latency_target=page_latency_target,
+            compression=compression,
+            cache=cache,
+            cache_ttl=cache_ttl,
+            validation=validation,
+            recorder=recorder,
+            profiler=profiler,
+        )
+        self._http = httpx.Client(
+            **self._http_options(),
+            transport=transport,
+            limits=limits or httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            event_hooks={"response": [self._mark_headers]} if profiler is not None else None,
+        )
+
+    def __enter__(self) -> SyncClient:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: Any,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self._http.close()
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Issue an HTTP request to StackCoin; see :meth:`Client._request`."""
+        started = self._sample_request()
+        try:
+            resp = self._http.request(method, url, params=params, json=json, headers=headers)
+        except httpx.HTTPError as e:
+            raise self._transport_error(e) from e
+        if started:
+            self._profile_request(method, url, started, resp)
+        self._record_transfer(resp)
+        if self._recorder is not None:
+            self._recorder.exchange(resp)
+        self._raise_for_error(resp)
+        return resp
+
+    def _call[T](self, call: Call[T]) -> T:
+        """Execute a single endpoint call and parse its result."""
+        last_unchanged.set(False)  # only a 304 or an identical body sets it again
+        if self._is_cached(call):
+            result = self._cached_result(call)
+            if result is not _MISS:
+                return result
+            resp = self._request(call.method, call.url, params=call.params, headers=call.headers)
+            self._cache_response(call, resp)
+            return self._parse(call, resp)
+        if self._is_conditional(call):
+            resp = self._request(
+                call.method, call.url, params=call.params, headers=self._conditional_headers(call)
+            )
+            result = self._conditional_result(call, resp)
+            if result is not _RETRY:
+                return result
+        resp = self._request(
+            call.method, call.url, params=call.params, json=call.json, headers=call.headers
+        )
+        return self._parse(call, resp)
+
+    def _run[R](self, flow: Flow[R]) -> R:
+        """Drive a multi-request flow to completion."""
+        try:
+            call = next(flow)
+            while True:
+                call = flow.send(self._call(call))
+        except StopIteration as stop:
+            return stop.value
+
+    def get_me(self) -> User:
+        """Return the authenticated user's profile."""
+        return self._call(api.get_me())
+
+    def get_user(self, user_id: int) -> User:
+        """Return a user by their ID."""
+        return self._call(api.get_user(user_id))
+
+    def get_users(self, *, discord_id: str | None = None) -> list[User]:
+        """Return a list of users, optionally filtered by Discord ID."""
+        return self._call(api.get_users(discord_id))
+
+    def send(
+        self,
+        to_user_id: int,
+        amount: int,
+        *,
+        label: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> SendStkResponse:
+        """Send STK to another user."""
+        return self._call(api.send(to_user_id, amount, label, idempotency_key))
+
+    def create_request(
+        self,
+        to_user_id: int,
+        amount: int,
+        *,
+        label: str | None = None,
+        idempotency_key: str | None = None,
+        use_preauth: bool = False,
+    ) -> CreateRequestResponse:
+        """Create a STK request to another user."""
+        return self._call(
+            api.create_request(to_user_id, amount, label, idempotency_key, use_preauth)
+        )
+
+    def create_preauth(
+        self,
+        user_id: int,
+        max_amount: int,
+        window_hours: int,
+    ) -> dict:
+        """Request a preauthorization from a user."""
+        return self._call(api.create_preauth(user_id, max_amount, window_hours))
+
+    def get_preauth(self, preauth_id: int) -> dict:
+        """Get a single preauthorization with remaining budget."""
+        return self._call(api.get_preauth(preauth_id))
+
+    def revoke_preauth(self, preauth_id: int) -> dict:
+        """Revoke an active preauthorization."""
+        return self._call(api.revoke_preauth(preauth_id))
+
+    def get_preauths(self, *, user_id: int | None = None) -> list[dict]:
+        """List preauths for this bot, optionally filtered by user_id."""
+        return self._call(api.get_preauths(user_id))
+
+    def get_request(self, request_id: int) -> Request:
+        """Return a single request by its ID."""
+        return self._call(api.get_request(request_id))
+
+    def get_requests(
+        self, *, status: str | None = None, page: int | None = None, limit: int | None = None
+    ) -> list[Request]:
+        """Return requests for the authenticated user, optionally filtered by status.
+
+        ``page`` and ``limit`` select one page of the server's pagination.
+        """
+        return self._call(api.get_requests(status, page=page, limit=limit))
+
+    def accept_request(self, request_id: int) -> RequestActionResponse:
+        """Accept a pending STK request."""
+        return self._call(api.accept_request(request_id))
+
+    def deny_request(self, request_id: int) -> RequestActionResponse:
+        """Deny a pending STK request."""
+        return self._call(api.deny_request(request_id))
+
+    def get_transactions(
+        self, *, page: int | None = None, limit: int | None = None
+    ) -> list[Transaction]:
+        """Return transactions for the authenticated user.
+
+        ``page`` and ``limit`` select one page of the server's pagination.
+        """
+        return self._call(api.get_transactions(page=page, limit=limit))
+
+    def get_transaction(self, transaction_id: int) -> Transaction:
+        """Return a single transaction by its ID."""
+        return self._call(api.get_transaction(transaction_id))
+
+    def get_events(
+        self, *, since_id: int = 0, head_id: int | None = None, concurrency: int = 8
+    ) -> list[AnyEvent]:
+        """Return typed events since the given ID.
+
+        Automatically paginates through all available events. Pages are
+        fetched one after another, because each cursor is the last id of the
+        previous page. For a large backfill where the newest id is already
+        known (e.g. ``gateway.last_event_id``), pass it as ``head_id``: the
+        range is split into id ranges that are fetched on ``concurrency``
+        threads and stitched back together in order.
+        """
+        if head_id is None or head_id <= since_id or concurrency <= 1:
+            return self._run(api.get_events(since_id, pages=self._pages))
+        ranges = api.event_ranges(since_id, head_id, concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            parts = pool.map(
+                lambda r: self._run(api.get_events_range(*r, pages=self._pages)), ranges
+            )
+            return [event for part in parts for event in part]
+
+    def get_discord_bot_id(self) -> str:
+        """Return the Discord user ID of the StackCoin bot."""
+        return self._call(api.get_discord_bot_id())
+
+    def get_discord_guilds(self) -> list[DiscordGuild]:
+        """Return all Discord guilds."""
+        return self._call(api.get_discord_guilds())
+
+    def get_discord_guild(self, snowflake: str) -> DiscordGuild:
+        """Return a single Discord guild by its snowflake ID."""
+        return self._call(api.get_discord_guild(snowflake))
@@ -0,0 +1,142 @@
+"""Awaitable handles for requests, resolved by gateway events."""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .models import CreateRequestResponse, RequestAcceptedEvent, RequestDeniedEvent
+
+if TYPE_CHECKING:
+    from ._dispatch import EventDispatcher
+    from .client import Client
+
+# Resolutions seen for ids nobody tracks yet: the event can beat create_request's
+# response back to us.
+_EARLY_RESOLUTIONS = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class RequestOutcome:
+    """How a request left the ``pending`` state."""
+
+    request_id: int
+    status: str
+    transaction_id: int | None = None
+    event_id: int | None = None  # None when the outcome came from polling
+
+
+class RequestHandle:
+    """A created request whose resolution can be awaited.
+
+    Returned by :meth:`Client.create_request` when a ``tracker`` is passed, or
+    by :meth:`RequestTracker.track`.
+    """
+
+    def __init__(self, tracker: RequestTracker, response: CreateRequestResponse) -> None:
+        self._tracker = tracker
+        self.response = response
+        self._future: asyncio.Future[RequestOutcome] = asyncio.get_running_loop().create_future()
+
+    def __repr__(self) -> str:
+        return f"<RequestHandle #{self.request_id} {self.status}>"
+
+    @property
+    def request_id(self) -> int:
+        return self.response.request_id
+
+    @property
+    def status(self) -> str:
+        """``"pending"`` until resolved, then the final status."""
+        return self._future.result().status if self.done() else "pending"
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    async def resolved(self, timeout: float | None = None) -> RequestOutcome:
+        """Wait for the request to be accepted or denied.
+
+        Waits for a ``request.accepted``/``request.denied`` event from an
+        attached source without any network traffic. After ``timeout``
+        seconds the request is fetched once with :meth:`Client.get_request`
+        in case the event was missed; if it is still pending,
+        :class:`TimeoutError` is raised and the handle stays tracked, so it
+        can be awaited again. With ``timeout=None`` only events resolve it.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except TimeoutError:
+            if self.done():
+                return self._future.result()
+        request = await self._tracker._client.get_request(self.request_id)
+        if request.status != "pending":
+            self._tracker._resolve(
+                RequestOutcome(request.id, request.status, request.transaction_id)
+            )
+            return self._future.result()
+        raise TimeoutError(f"request #{self.request_id} still pending after {timeout}s")
+
+
+class RequestTracker:
+    """Index of pending requests, resolved from a gateway or polling source.
+
+    Usage::
+
+        tracker = stackcoin.RequestTracker(client)
+        tracker.attach(gateway)
+
+        handle = await client.create_request(user_id, 50, tracker=tracker)
+        outcome = await handle.resolved(timeout=300)
+
+    Handles are held weakly: a handle that is dropped unresolved leaves the
+    index by itself. Waiting costs one dictionary entry per request; events
+    for untracked requests cost one lookup.
+    """
+
+    def __init__(self, client: Client) -> None:
+        self._client = client
+        self._pending: weakref.WeakValueDictionary[int, RequestHandle] = (
+            weakref.WeakValueDictionary()
+        )
+        self._early: OrderedDict[int, RequestOutcome] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of tracked, unresolved requests."""
+        return len(self._pending)
+
+    def attach(self, source: EventDispatcher) -> None:
+        """Resolve handles from ``request.*`` events of a gateway or polling source."""
+        source.register_handler("request.accepted", self.on_event)  # type: ignore[arg-type]
+        source.register_handler("request.denied", self.on_event)  # type: ignore[arg-type]
+
+    def track(self, response: CreateRequestResponse) -> RequestHandle:
+        """Return a handle for a request created elsewhere."""
+        handle = RequestHandle(self, response)
+        early = self._early.pop(response.request_id, None)
+        if early is not None:
+            handle._future.set_result(early)
+        elif response.status != "pending":  # e.g. confirmed through a preauth
+            handle._future.set_result(
+                RequestOutcome(response.request_id, response.status, response.transaction_id)
+            )
+        else:
+            self._pending[response.request_id] = handle
+        return handle
+
+    async def on_event(self, event: RequestAcceptedEvent | RequestDeniedEvent) -> None:
+        """Event handler resolving the matching handle."""
+        data = event.data
+        transaction_id = data.transaction_id if isinstance(event, RequestAcceptedEvent) else None
+        self._resolve(RequestOutcome(data.request_id, data.status, transaction_id, event.id))
+
+    def _resolve(self, outcome: RequestOutcome) -> None:
+        handle = self._pending.pop(outcome.request_id, None)
+        if handle is None:
+            self._early[outcome.request_id] = outcome
+            if len(self._early) > _EARLY_RESOLUTIONS:
+                self._early.popitem(last=False)
+        elif not handle.done():
+            handle._future.set_result(outcome)